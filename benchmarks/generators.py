@@ -0,0 +1,81 @@
+# -*- coding=utf-8 -*-
+
+
+"""Seeded instance generators for the three TP model families."""
+
+
+import sys
+from pathlib import Path
+
+import numpy as np
+from pulp import LpMaximize, LpProblem, LpStatus, LpVariable, lpSum
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT / 'tp2'), str(ROOT / 'tp3')]
+
+from generic_model import generate_org  # noqa: E402
+from instances import generate_instance  # noqa: E402
+
+
+# ============================================================================ #
+#                                 TP1 : RANDOM LP                              #
+# ============================================================================ #
+def random_lp(n, m, density=0.1, seed=0):
+    """Random LP in the tp1 form: max c.x s.t. A x <= b, x >= 0.
+
+    A is nonnegative with at least one nonzero per column, so the problem is
+    feasible (x = 0) and bounded. Returns c (n,), the rows of A as
+    `(columns, values)` pairs and b (m,).
+    """
+    rng = np.random.default_rng(seed)
+    c = rng.integers(1, 20, size=n)
+    mask = rng.random((m, n)) < density
+    mask[rng.integers(0, m, size=n), np.arange(n)] = True
+    rows = []
+    for r in range(m):
+        columns = np.flatnonzero(mask[r])
+        rows.append((columns, rng.integers(1, 10, size=len(columns))))
+    b = rng.integers(10, 100, size=m) * max(1, int(density * n))
+    return c, rows, b
+
+
+def set_lp_model(c, rows, b):
+    """PuLP model of a random LP, written like `tp1/base.py`."""
+    prob = LpProblem(name='maximisation_problem', sense=LpMaximize)
+    x = [LpVariable(f'x_{i}', lowBound=0) for i in range(len(c))]
+    prob += lpSum(int(c[i]) * var for i, var in enumerate(x)), "Objective"
+    for r, (columns, values) in enumerate(rows):
+        prob += lpSum(int(value) * x[i] for i, value in zip(columns, values)) <= int(b[r]), f"Constraint {r + 1}"
+    return prob, x
+
+
+def print_lp_output(prob, x):
+    """Stats and values of a random LP, like `print_log_output` in tp1."""
+    print()
+    print('-' * 40)
+    print('Stats')
+    print('-' * 40)
+    print()
+    print(f'Number variables: {prob.numVariables()}')
+    print(f'Number constraints: {prob.numConstraints()}')
+    print(f'Solve status: {LpStatus[prob.status]}')
+    print(f'Objective value: {prob.objective.value()}')
+    print()
+    for var in x:
+        print(f'{var.name}\t\t{var.varValue}')
+
+
+# ============================================================================ #
+#                          TP2 : PERSONNEL PLANNING                            #
+# ============================================================================ #
+def personnel(levels, years, seed=0):
+    """Org chart with `levels` grades over `years` years (`generic_model` data)."""
+    return generate_org(levels, years, seed=seed)
+
+
+# ============================================================================ #
+#                          TP3 : FACILITY LOCATION                             #
+# ============================================================================ #
+def facility(n, m, tightness=1.5, seed=0):
+    """Capacitated facility location with `n` warehouses and `m` zones."""
+    return generate_instance(n, m, tightness=tightness, seed=seed)
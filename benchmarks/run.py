@@ -0,0 +1,131 @@
+# -*- coding=utf-8 -*-
+
+
+"""Scaling benchmark of the three TP models.
+
+Every size point runs in a fresh process, so that its peak RSS is its own.
+For each point the runner records the model build time, the solve time,
+the output time (`print_log_output` into a buffer) and the peak resident
+memory of the Python process, then writes a CSV file. The CBC subprocess is
+left out: its `ru_maxrss` starts from the parent's high-water mark at fork.
+
+    python benchmarks/run.py --family tp1 tp2 tp3 --output benchmark.csv
+"""
+
+
+import argparse
+import contextlib
+import csv
+import io
+import multiprocessing
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from pulp import PULP_CBC_CMD, LpStatus
+
+import generators
+
+# Points de mesure par famille : (taille, paramètres du générateur)
+SIZES = {
+    'tp1': [(10, 10), (100, 50), (1000, 500), (5000, 2000)],
+    'tp2': [(3, 3), (10, 10), (50, 30), (100, 40)],
+    'tp3': [(5, 3), (20, 15), (50, 30), (100, 60)],
+}
+
+
+# ============================================================================ #
+#                                  ONE POINT                                   #
+# ============================================================================ #
+def build(family, size, seed, tightness, integer):
+    """Return the model, the arguments of its output function and the function."""
+    if family == 'tp1':
+        prob, x = generators.set_lp_model(*generators.random_lp(*size, seed=seed))
+        return prob, (prob, x), generators.print_lp_output
+    if family == 'tp2':
+        from generic_model import set_model
+        from tp2 import print_log_output
+        data = generators.personnel(*size, seed=seed)
+        prob, R, L, S = set_model(**data, cat='Integer' if integer else 'Continuous')
+        return prob, (prob, R, L, S), print_log_output
+    if family == 'tp3':
+        import question3
+        p, c, d, l, _ = (x.tolist() if hasattr(x, 'tolist') else x
+                         for x in generators.facility(*size, tightness=tightness, seed=seed))
+        prob, E, c_ij = question3.set_model(p, c, d, l)
+        return prob, (prob, E, c_ij), question3.print_log_output
+    raise ValueError(f'Famille inconnue : {family}')
+
+
+def run_point(family, size, seed=0, tightness=1.5, integer=False, time_limit=None):
+    """Build, solve and print one instance; meant to run in its own process."""
+    start = time.perf_counter()
+    prob, args, output = build(family, size, seed, tightness, integer)
+    built = time.perf_counter()
+
+    prob.solve(PULP_CBC_CMD(msg=False, timeLimit=time_limit))
+    solved = time.perf_counter()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        output(*args)
+    printed = time.perf_counter()
+
+    # ru_maxrss est en kilo-octets sous Linux, en octets sous macOS
+    unit = 1 if sys.platform == 'darwin' else 1024
+    return {
+        'family': family,
+        'size': 'x'.join(map(str, size)),
+        'seed': seed,
+        'variables': prob.numVariables(),
+        'constraints': prob.numConstraints(),
+        'status': LpStatus[prob.status],
+        'objective': prob.objective.value(),
+        'build_time': built - start,
+        'solve_time': solved - built,
+        'output_time': printed - solved,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit / 2 ** 20,
+    }
+
+
+# ============================================================================ #
+#                                  BENCHMARK                                   #
+# ============================================================================ #
+def benchmark(families, sizes=SIZES, **options):
+    """Run every size point of `families`, each in a new process."""
+    context = multiprocessing.get_context('spawn')
+    rows = []
+    for family in families:
+        for size in sizes[family]:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                row = pool.submit(run_point, family, size, **options).result()
+            rows.append(row)
+            print(f"{row['family']} {row['size']:>9}: build {row['build_time']:8.3f} s  "
+                  f"solve {row['solve_time']:8.3f} s  output {row['output_time']:8.3f} s  "
+                  f"RSS {row['peak_rss_mb']:7.1f} MB  "
+                  f"{row['status']}")
+    return rows
+
+
+def write_table(rows, path):
+    """Write the benchmark results to a CSV file."""
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--family', nargs='+', choices=list(SIZES), default=list(SIZES))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tightness', type=float, default=1.5, help='tp3 capacity / demand ratio')
+    parser.add_argument('--integer', action='store_true', help='integer headcounts for tp2')
+    parser.add_argument('--time-limit', type=float, default=60, help='solver time limit per point (s)')
+    parser.add_argument('--output', type=Path, default=Path('./benchmark.csv'))
+    args = parser.parse_args()
+
+    rows = benchmark(args.family, seed=args.seed, tightness=args.tightness,
+                     integer=args.integer, time_limit=args.time_limit)
+    write_table(rows, args.output)
@@ -0,0 +1 @@
+"""Helpers shared by the tp1, tp2 and tp3 scripts."""
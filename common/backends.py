@@ -0,0 +1,369 @@
+# -*- coding=utf-8 -*-
+
+
+"""Solver backends for PuLP problems.
+
+`PULP_CBC_CMD` writes an `.mps` file, starts the `cbc` executable and reads a
+`.sol` file back; on the small models of the TPs this overhead is nearly all
+of the wall time. `HiGHSArrays` solves in the Python process through the
+HiGHS shared library (package `highspy`): the problem is converted once to
+column-wise arrays and passed with a single `passModel` call, without any
+file. Results are written back on the problem the same way as PuLP solvers
+do (`status`, `sol_status`, `varValue`, `dj`, `pi`, `slack`), so the
+`print_log_output` functions are unchanged.
+
+`get_solver` picks the backend from the PL_BACKEND variable: 'highs',
+'cbc', 'dense' (the in-process dense simplex of `dense_lp`, for continuous
+problems of at most DENSE_LIMIT variables and constraints; it writes no
+log), or 'auto' (default: HiGHS when `highspy` is installed, CBC
+otherwise).
+It applies the shared solve configuration (`solve_config`: threads, limits,
+gaps, presolve, cuts, seed); with a portfolio, it returns a `Portfolio`
+that races one solver per configuration in parallel processes.
+"""
+
+
+import multiprocessing
+import multiprocessing.connection
+import os
+import signal
+import time
+
+import numpy as np
+from pulp import (PULP_CBC_CMD, LpConstraintLE, LpInteger, LpMaximize,
+                  LpSolutionInfeasible, LpSolutionIntegerFeasible,
+                  LpSolutionNoSolutionFound, LpSolutionOptimal,
+                  LpSolutionUnbounded, LpSolver, LpStatusInfeasible,
+                  LpStatusNotSolved, LpStatusOptimal, LpStatusUnbounded,
+                  PulpSolverError)
+
+from common import dense_lp, solve_config
+
+try:
+    import highspy
+except ImportError:
+    highspy = None
+
+# Seconds given to the racers after the time limit before they are killed
+PORTFOLIO_GRACE = 5.0
+
+
+# ============================================================================ #
+#                                    ARRAYS                                    #
+# ============================================================================ #
+def to_arrays(lp):
+    """Return the arrays of `lp` in column-wise (CSC) form.
+
+    Returns the variables, the constraints and a dict with `cost`, `offset`,
+    `col_lower`, `col_upper`, `integer`, `row_lower`, `row_upper`, `start`,
+    `index` and `value`.
+    """
+    variables = lp.variables()
+    constraints = lp.constraints()
+    column = {var.name: k for k, var in enumerate(variables)}
+
+    cost = np.zeros(len(variables))
+    for var, coefficient in lp.objective.items():
+        cost[column[var.name]] = coefficient
+
+    col_lower = np.array([-np.inf if var.lowBound is None else var.lowBound for var in variables], dtype=float)
+    col_upper = np.array([np.inf if var.upBound is None else var.upBound for var in variables], dtype=float)
+    integer = np.array([var.cat == LpInteger for var in variables], dtype=bool)
+
+    rows, cols, values = [], [], []
+    row_lower = np.empty(len(constraints))
+    row_upper = np.empty(len(constraints))
+    for r, constraint in enumerate(constraints):
+        for var, coefficient in constraint.items():
+            if coefficient:
+                rows.append(r)
+                cols.append(column[var.name])
+                values.append(coefficient)
+        lower, upper = constraint.getLb(), constraint.getUb()
+        row_lower[r] = -np.inf if lower is None else lower
+        row_upper[r] = np.inf if upper is None else upper
+
+    # Stable sort by column keeps the rows increasing inside each column
+    rows = np.array(rows, dtype=np.int32)
+    cols = np.array(cols, dtype=np.int32)
+    order = np.argsort(cols, kind='stable')
+    start = np.zeros(len(variables) + 1, dtype=np.int32)
+    np.cumsum(np.bincount(cols, minlength=len(variables)), out=start[1:])
+
+    return variables, constraints, {
+        'cost': cost,
+        'offset': float(lp.objective.constant),
+        'col_lower': col_lower,
+        'col_upper': col_upper,
+        'integer': integer,
+        'row_lower': row_lower,
+        'row_upper': row_upper,
+        'start': start,
+        'index': rows[order],
+        'value': np.array(values, dtype=float)[order],
+    }
+
+
+# ============================================================================ #
+#                                    HIGHS                                     #
+# ============================================================================ #
+class HiGHSArrays(LpSolver):
+    """In-process HiGHS solver fed with arrays."""
+
+    name = 'HiGHSArrays'
+
+    def __init__(self, mip=True, msg=True, timeLimit=None, gapRel=None, gapAbs=None,
+                 threads=None, warmStart=False, logPath=None, **solverParams):
+        super().__init__(mip=mip, msg=msg, timeLimit=timeLimit, gapRel=gapRel, gapAbs=gapAbs,
+                         threads=threads, warmStart=warmStart, logPath=logPath)
+        self.solverParams = solverParams
+
+    def available(self):
+        return highspy is not None
+
+    def actualSolve(self, lp):
+        if highspy is None:
+            raise PulpSolverError('HiGHSArrays: highspy is not installed')
+
+        variables, constraints, arrays = to_arrays(lp)
+        solver = highspy.Highs()
+        self._set_options(solver)
+
+        model = highspy.HighsLp()
+        model.num_col_ = len(variables)
+        model.num_row_ = len(constraints)
+        model.sense_ = highspy.ObjSense.kMaximize if lp.sense == LpMaximize else highspy.ObjSense.kMinimize
+        model.offset_ = arrays['offset']
+        model.col_cost_ = arrays['cost']
+        model.col_lower_ = np.where(np.isinf(arrays['col_lower']), -highspy.kHighsInf, arrays['col_lower'])
+        model.col_upper_ = np.where(np.isinf(arrays['col_upper']), highspy.kHighsInf, arrays['col_upper'])
+        model.row_lower_ = np.where(np.isinf(arrays['row_lower']), -highspy.kHighsInf, arrays['row_lower'])
+        model.row_upper_ = np.where(np.isinf(arrays['row_upper']), highspy.kHighsInf, arrays['row_upper'])
+        model.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+        model.a_matrix_.num_col_ = len(variables)
+        model.a_matrix_.num_row_ = len(constraints)
+        model.a_matrix_.start_ = arrays['start']
+        model.a_matrix_.index_ = arrays['index']
+        model.a_matrix_.value_ = arrays['value']
+        if self.mip and arrays['integer'].any():
+            model.integrality_ = [
+                highspy.HighsVarType.kInteger if integer else highspy.HighsVarType.kContinuous
+                for integer in arrays['integer']
+            ]
+        solver.passModel(model)
+
+        # MIP start from the initial values of the variables
+        if self.optionsDict.get('warmStart'):
+            start = highspy.HighsSolution()
+            start.col_value = [var.varValue or 0.0 for var in variables]
+            solver.setSolution(start)
+
+        solver.run()
+        return self._read_solution(lp, solver, variables, constraints)
+
+    def _set_options(self, solver):
+        solver.setOptionValue('output_flag', bool(self.msg or self.optionsDict.get('logPath')))
+        solver.setOptionValue('log_to_console', bool(self.msg))
+        if self.optionsDict.get('logPath'):
+            solver.setOptionValue('log_file', str(self.optionsDict['logPath']))
+        if self.timeLimit is not None:
+            solver.setOptionValue('time_limit', float(self.timeLimit))
+        for option, name in (('gapRel', 'mip_rel_gap'), ('gapAbs', 'mip_abs_gap'), ('threads', 'threads')):
+            if option in self.optionsDict:
+                solver.setOptionValue(name, self.optionsDict[option])
+        for name, value in self.solverParams.items():
+            solver.setOptionValue(name, value)
+
+    def _read_solution(self, lp, solver, variables, constraints):
+        model_status = solver.getModelStatus()
+        statuses = highspy.HighsModelStatus
+        has_solution = solver.getInfo().primal_solution_status == 2  # kSolutionStatusFeasible
+
+        if model_status == statuses.kOptimal:
+            status, sol_status = LpStatusOptimal, LpSolutionOptimal
+        elif model_status in (statuses.kInfeasible, statuses.kUnboundedOrInfeasible):
+            status, sol_status = LpStatusInfeasible, LpSolutionInfeasible
+        elif model_status == statuses.kUnbounded:
+            status, sol_status = LpStatusUnbounded, LpSolutionUnbounded
+        elif has_solution:
+            # Time or iteration limit, or interruption, with a solution
+            status, sol_status = LpStatusOptimal, LpSolutionIntegerFeasible
+        else:
+            status, sol_status = LpStatusNotSolved, LpSolutionNoSolutionFound
+
+        if has_solution:
+            solution = solver.getSolution()
+            lp.assignVarsVals({var.name: value for var, value in zip(variables, solution.col_value)})
+            if solution.dual_valid:
+                lp.assignVarsDj({var.name: value for var, value in zip(variables, solution.col_dual)})
+                for constraint, dual in zip(constraints, solution.row_dual):
+                    constraint.pi = dual
+            for constraint, activity in zip(constraints, solution.row_value):
+                slack = constraint.constant + activity
+                constraint.slack = -slack if constraint.sense == LpConstraintLE else slack
+        lp.assignStatus(status, sol_status)
+        return status
+
+
+# ============================================================================ #
+#                                  PORTFOLIO                                   #
+# ============================================================================ #
+class Portfolio(LpSolver):
+    """Race of solvers in parallel processes.
+
+    Each racer solves a copy of the problem (forked process, in its own
+    process group with its solver executable). The first racer to prove
+    optimality, infeasibility or unboundedness wins; otherwise the best
+    solution found when every racer has stopped, or at the time limit plus
+    PORTFOLIO_GRACE, is kept. The remaining racers are killed with their
+    process group.
+    """
+
+    name = 'Portfolio'
+
+    def __init__(self, configs, backend=None, **options):
+        super().__init__(msg=options.get('msg', False), timeLimit=options.get('timeLimit'))
+        self.configs = configs
+        self.backend = backend
+        self.racer_options = options
+        self.winner = None
+
+    def available(self):
+        return hasattr(os, 'killpg')
+
+    def actualSolve(self, lp):
+        context = multiprocessing.get_context('fork')
+        pending = {}
+        for k, config in enumerate(self.configs):
+            options = dict(self.racer_options)
+            if options.get('logPath'):
+                options['logPath'] = f'{options["logPath"]}.{k}'
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=_race, args=(lp, self.backend, config, options, sender), daemon=True)
+            process.start()
+            sender.close()
+            pending[receiver] = (k, process)
+
+        time_limits = [config.get('time_limit') or self.racer_options.get('timeLimit') for config in self.configs]
+        deadline = None
+        if all(limit is not None for limit in time_limits):
+            deadline = time.monotonic() + max(time_limits) + PORTFOLIO_GRACE
+
+        best = None
+        processes = [process for _, process in pending.values()]
+        try:
+            while pending:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                ready = multiprocessing.connection.wait(list(pending), timeout)
+                if not ready:
+                    break
+                for receiver in ready:
+                    k, _ = pending.pop(receiver)
+                    try:
+                        result = receiver.recv()
+                    except EOFError:
+                        continue  # racer died without result
+                    if result['proven'] or _better(result, best, lp.sense):
+                        best = {**result, 'racer': k}
+                    if result['proven']:
+                        pending.clear()
+                        break
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    try:
+                        os.killpg(process.pid, signal.SIGKILL)
+                    except ProcessLookupError:
+                        pass
+                process.join()
+
+        self.winner = best
+        if best is None:
+            lp.assignStatus(LpStatusNotSolved, LpSolutionNoSolutionFound)
+            return LpStatusNotSolved
+        if best['values']:
+            lp.assignVarsVals(best['values'])
+        lp.assignStatus(best['status'], best['sol_status'])
+        return best['status']
+
+
+def _race(lp, backend, config, options, sender):
+    """Racer: solve `lp` and send the result (runs in a forked process)."""
+    os.setpgrp()
+    solver = get_solver(backend, config=config, portfolio=False, **options)
+    status = lp.solve(solver)
+    sol_status = getattr(lp, 'sol_status', None)
+    proven = (status == LpStatusOptimal and sol_status == LpSolutionOptimal) or \
+        status in (LpStatusInfeasible, LpStatusUnbounded)
+    has_values = sol_status in (LpSolutionOptimal, LpSolutionIntegerFeasible)
+    sender.send({
+        'status': status,
+        'sol_status': sol_status,
+        'proven': proven,
+        'objective': lp.objective.value() if has_values else None,
+        'values': {var.name: var.varValue for var in lp.variables()} if has_values else None,
+    })
+    sender.close()
+
+
+def _better(result, best, sense):
+    if result['objective'] is None:
+        return best is None
+    return best is None or best['objective'] is None or sense * result['objective'] < sense * best['objective']
+
+
+# ============================================================================ #
+#                                  SELECTION                                   #
+# ============================================================================ #
+def get_solver(backend=None, config=None, portfolio=True, problem=None, **options):
+    """Return a solver built with the PuLP options `options`.
+
+    `backend` is 'highs', 'cbc', 'dense' or 'auto' and defaults to the
+    PL_BACKEND variable. With 'dense', a `DenseLP` is returned unless
+    `problem` is given and is not a small continuous problem (`dense_lp`),
+    in which case the backend is chosen as with 'auto'. With 'auto', or when
+    HiGHS is asked for but `highspy` is not installed, CBC is used as the
+    fallback. The settings of `config`
+    (default: `solve_config.get_config()`) are added to `options`, which take
+    precedence when not None. With a portfolio in `config`, and unless
+    `portfolio` is False, a `Portfolio` of these solvers is returned.
+    """
+    config = solve_config.get_config() if config is None else config
+    backend = (backend or os.environ.get('PL_BACKEND', 'auto')).lower()
+    if backend == 'dense':
+        if problem is None or dense_lp.is_small_lp(problem):
+            return dense_lp.DenseLP(**options)
+        backend = 'auto'
+    if portfolio and solve_config.variants(config):
+        return Portfolio(solve_config.variants(config), backend, **options)
+
+    use_highs = backend in ('highs', 'auto') and highspy is not None
+    merged = solve_config.solver_options(config, 'highs' if use_highs else 'cbc')
+    merged.update({key: value for key, value in options.items() if value is not None})
+    if use_highs:
+        return HiGHSArrays(**merged)
+    return PULP_CBC_CMD(**merged)
+
+
+if __name__ == '__main__':
+    from pulp import LpProblem, LpVariable
+
+    # Small LP of tp1/base.py, solved by every available backend
+    prob = LpProblem(name='maximisation_problem', sense=LpMaximize)
+    x_1 = LpVariable('x_1', lowBound=0)
+    x_2 = LpVariable('x_2', lowBound=0)
+    prob += x_1 + 3 * x_2, 'Objective'
+    prob += x_1 + x_2 <= 2, 'Constraint 1'
+    prob += x_2 <= 1, 'Constraint 2'
+
+    for backend in ('cbc', 'highs', 'dense'):
+        solver = get_solver(backend, msg=False)
+        if backend == 'highs' and not isinstance(solver, HiGHSArrays):
+            print('highs: highspy is not installed')
+            continue
+        repeat = 20
+        start = time.perf_counter()
+        for _ in range(repeat):
+            prob.solve(solver)
+        elapsed = (time.perf_counter() - start) / repeat
+        print(f'{backend}: objective {prob.objective.value()}, {1e6 * elapsed:.0f} us per solve')
@@ -0,0 +1,199 @@
+# -*- coding=utf-8 -*-
+
+
+"""Batched solve of many small LPs sharing the same shape.
+
+The product-mix model of tp1 (`exercice1.py`: max 40 A + 35 B under two
+resource rows) is evaluated for thousands of price and resource vectors;
+one PuLP problem and one CBC process per instance is far too slow. With 2
+or 3 variables, the optimum of a bounded feasible LP is one of the few
+vertices of its polyhedron, so `solve` enumerates them for every instance
+at once with NumPy:
+
+    - the rows are written G x <= h (a '>=' row is negated, an '=' row
+      gives two rows, the bounds lower <= x <= upper give the others);
+    - every choice of n rows is solved as a square system (one inverse per
+      choice when the matrix is shared), the points violating a row are
+      dropped and the best remaining point is kept;
+    - an instance without any vertex is infeasible; a feasible instance is
+      unbounded when an extreme ray d of {G d <= 0} (null vector of n - 1
+      rows) improves the objective.
+
+The lower bounds must be finite (default 0), so that the polyhedron has
+vertices. The number of choices grows like C(rows, n): this is meant for a
+handful of variables and rows, not for general LPs (`dense_lp`).
+"""
+
+
+from itertools import combinations
+
+import numpy as np
+from pulp import (LpConstraintEQ, LpConstraintGE, LpStatus, LpStatusInfeasible,
+                  LpStatusOptimal, LpStatusUnbounded)
+
+from common.dense_lp import SENSES
+
+CHUNK_SIZE = 10_000
+TOLERANCE = 1e-9
+
+
+# ============================================================================ #
+#                                     ROWS                                     #
+# ============================================================================ #
+def _rows(A, b, senses, lower, upper):
+    """G and h of G x <= h; A is (m, n) or (K, m, n), b is (K, m)."""
+    n = A.shape[-1]
+    K = b.shape[0]
+    blocks, rhs = [], []
+    for r, sense in enumerate(senses):
+        if sense in (LpConstraintGE, LpConstraintEQ):
+            blocks.append(-A[..., r:r+1, :])
+            rhs.append(-b[:, r:r+1])
+        if sense != LpConstraintGE:
+            blocks.append(A[..., r:r+1, :])
+            rhs.append(b[:, r:r+1])
+
+    bounded = np.flatnonzero(np.isfinite(upper))
+    identity = np.eye(n)
+    bounds = np.vstack([-identity, identity[bounded]])
+    if A.ndim == 3:
+        bounds = np.broadcast_to(bounds, (A.shape[0],) + bounds.shape)
+    G = np.concatenate(blocks + [bounds], axis=-2)
+    h = np.hstack(rhs + [np.broadcast_to(-lower, (K, n)), np.broadcast_to(upper[bounded], (K, len(bounded)))])
+    return G, h
+
+
+def _solve_square(M, rhs):
+    """Solutions of the square systems M x = rhs and the mask of regular M."""
+    n = M.shape[-1]
+    regular = np.abs(np.linalg.det(M)) > TOLERANCE
+    safe = np.where(regular[..., None, None], M, np.eye(n))
+    return np.linalg.solve(safe, rhs[..., None])[..., 0], regular
+
+
+def _rays(G):
+    """Extreme ray candidates of {G d <= 0}: both null vectors of each
+    choice of n - 1 rows. Returns (…, D, n) and the mask of valid rays."""
+    n = G.shape[-1]
+    if n == 1:
+        rays = np.broadcast_to(np.array([[1.0], [-1.0]]), G.shape[:-2] + (2, 1))
+    else:
+        choices = np.array(list(combinations(range(G.shape[-2]), n - 1)))
+        _, singular, vh = np.linalg.svd(G[..., choices, :])
+        null = np.where((singular[..., -1] > TOLERANCE)[..., None], vh[..., -1, :], 0.0)
+        rays = np.concatenate([null, -null], axis=-2)
+    valid = (np.abs(rays).sum(axis=-1) > 0) & np.all(rays @ np.swapaxes(G, -1, -2) <= TOLERANCE, axis=-1)
+    return rays, valid
+
+
+# ============================================================================ #
+#                                    SOLVE                                     #
+# ============================================================================ #
+def solve(c, A, b, senses=None, lower=None, upper=None, maximize=False, chunk_size=CHUNK_SIZE):
+    """Solve K LPs  min/max c_k x  s.t.  A_k x (senses) b_k,  lower <= x <= upper.
+
+    `c` is (K, n) or (n,), `b` is (K, m) or (m,) and `A` is shared (m, n)
+    or per instance (K, m, n); `senses` holds '<=', '>=' or '=' per row
+    (default '<='); `lower` and `upper` are shared (n,) (default 0 and
+    +inf). Returns a dict of arrays: `status` (K,) with the PuLP status
+    codes (LpStatus[code] gives the text), `objective` (K,) and `x` (K, n),
+    NaN when not optimal.
+    """
+    A = np.asarray(A, dtype=float)
+    m, n = A.shape[-2:]
+    c = np.atleast_2d(np.asarray(c, dtype=float))
+    b = np.atleast_2d(np.asarray(b, dtype=float))
+    K = max(len(c), len(b), A.shape[0] if A.ndim == 3 else 1)
+    c, b = np.broadcast_to(c, (K, n)), np.broadcast_to(b, (K, m))
+    senses = [SENSES[sense] for sense in (senses or ['<='] * m)]
+    lower = np.zeros(n) if lower is None else np.asarray(lower, dtype=float)
+    upper = np.full(n, np.inf) if upper is None else np.asarray(upper, dtype=float)
+    if not np.isfinite(lower).all():
+        raise ValueError('batch_lp.solve needs finite lower bounds')
+
+    result = {
+        'status': np.full(K, LpStatusInfeasible),
+        'objective': np.full(K, np.nan),
+        'x': np.full((K, n), np.nan),
+    }
+    for start in range(0, K, chunk_size):
+        chunk = slice(start, min(start + chunk_size, K))
+        _solve_chunk(c[chunk], A[chunk] if A.ndim == 3 else A, b[chunk], senses, lower, upper,
+                     -1.0 if maximize else 1.0, result, chunk)
+    return result
+
+
+def _solve_chunk(c, A, b, senses, lower, upper, sign, result, chunk):
+    G, h = _rows(A, b, senses, lower, upper)
+    n = G.shape[-1]
+    choices = np.array(list(combinations(range(G.shape[-2]), n)))
+
+    # Vertices: one square system per choice of n rows
+    if G.ndim == 2:
+        M = G[choices]
+        regular = np.abs(np.linalg.det(M)) > TOLERANCE
+        inverse = np.linalg.inv(np.where(regular[:, None, None], M, np.eye(n)))
+        points = np.einsum('cij,kcj->kci', inverse, h[:, choices])
+        activity = np.einsum('rn,kcn->kcr', G, points)
+    else:
+        points, regular = _solve_square(G[:, choices], h[:, choices])
+        activity = np.einsum('krn,kcn->kcr', G, points)
+    scale = 1.0 + np.abs(h)[:, None, :]
+    feasible = regular & np.all(activity <= h[:, None, :] + 1e-7 * scale, axis=-1)
+
+    costs = np.where(feasible, sign * np.einsum('kn,kcn->kc', c, points), np.inf)
+    best = np.argmin(costs, axis=1)
+    found = feasible.any(axis=1)
+
+    # Improving rays of the feasible instances
+    rays, valid = _rays(G)
+    slopes = sign * (c @ rays.T if rays.ndim == 2 else np.einsum('kn,kdn->kd', c, rays))
+    unbounded = found & np.any(valid & (slopes < -TOLERANCE * (1.0 + np.abs(c).sum(axis=1, keepdims=True))), axis=1)
+
+    optimal = found & ~unbounded
+    rows = np.arange(len(c))
+    x = points[rows, best]
+    status = result['status'][chunk]
+    status[optimal] = LpStatusOptimal
+    status[unbounded] = LpStatusUnbounded
+    result['x'][chunk][optimal] = x[optimal]
+    result['objective'][chunk][optimal] = np.einsum('kn,kn->k', c, x)[optimal]
+
+
+def describe(status):
+    """Number of instances per status, e.g. {'Optimal': 99998, 'Infeasible': 2}."""
+    codes, counts = np.unique(status, return_counts=True)
+    return {LpStatus[code]: int(count) for code, count in zip(codes.tolist(), counts.tolist())}
+
+
+if __name__ == '__main__':
+    import time
+
+    from pulp import PULP_CBC_CMD, LpMaximize, LpProblem, LpVariable, value
+
+    # Product-mix model of tp1/exercice1.py for random prices and resources
+    rng = np.random.default_rng(0)
+    K = 100_000
+    A = np.array([[2.0, 4.0], [3.0, 2.0]])
+    prices = np.array([40.0, 35.0]) * rng.uniform(0.5, 1.5, (K, 2))
+    resources = np.array([50.0, 30.0]) * rng.uniform(0.5, 1.5, (K, 2))
+
+    start = time.perf_counter()
+    batch = solve(prices, A, resources, maximize=True)
+    elapsed = time.perf_counter() - start
+    print(f'batch: {K} instances in {elapsed:.3f} s, {describe(batch["status"])}')
+    print(f'nominal instance: {solve([40, 35], A, [50, 30], maximize=True)["objective"][0]}')
+
+    # One PuLP problem and one CBC process per instance, on a sample
+    sample = 50
+    start = time.perf_counter()
+    for k in range(sample):
+        prob = LpProblem('product_mix', LpMaximize)
+        x = [LpVariable(f'x_{j}', lowBound=0) for j in range(2)]
+        prob += prices[k] @ x
+        for r in range(2):
+            prob += A[r] @ x <= resources[k, r]
+        prob.solve(PULP_CBC_CMD(msg=False))
+        assert abs(value(prob.objective) - batch['objective'][k]) <= 1e-5 * batch['objective'][k]
+    per_instance = (time.perf_counter() - start) / sample
+    print(f'PuLP + CBC: {per_instance * 1e3:.1f} ms per instance, {per_instance * K:.0f} s for {K} instances')
@@ -0,0 +1,206 @@
+# -*- coding=utf-8 -*-
+
+
+"""Parser of CBC logs into structured records.
+
+A log file may hold several runs (the solver can append to it); each run
+starts with "Welcome to the CBC MILP Solver" and gives one record with:
+
+    version, rows, columns, elements   problem read by CBC
+    presolve                           LP presolve or Cgl reductions
+    root_lp                            continuous (root LP) objective
+    root_cuts                          objective after the root cuts
+    incumbents                         [{objective, heuristic, iterations,
+                                         nodes, seconds}, ...]
+    result, objective, bound, gap      final status, value and gap
+    nodes, iterations                  search effort
+    cpu_time, wall_time                solver and total times
+
+Missing values are None. Records can be exported as JSON lines.
+"""
+
+
+import json
+import re
+import tempfile
+import time
+from pathlib import Path
+
+RUN_START = 'Welcome to the CBC MILP Solver'
+
+NUMBER = r'(-?[\d.]+(?:e[+-]?\d+)?|-?inf)'
+PATTERNS = {
+    'version': re.compile(r'^Version: (\S+)', re.M),
+    'problem': re.compile(r'Problem \S+ has (\d+) rows, (\d+) columns and (\d+) elements'),
+    'lp_presolve': re.compile(r'^Presolve (\d+) \((-?\d+)\) rows, (\d+) \((-?\d+)\) columns '
+                              r'and (\d+) \((-?\d+)\) elements', re.M),
+    'cgl_presolve': re.compile(r'Cgl0003I (\d+) fixed, (\d+) tightened bounds, '
+                               r'(\d+) strengthened rows, (\d+) substitutions'),
+    'cgl_processed': re.compile(r'Cgl0004I processed model has (\d+) rows, (\d+) columns '
+                                r'\((\d+) integer \((\d+) of which binary\)\) and (\d+) elements'),
+    'root_lp': re.compile(rf'Continuous objective value is {NUMBER} - {NUMBER} seconds'),
+    'root_cuts': re.compile(rf'Cbc0013I At root node, \d+ cuts changed objective from {NUMBER} to {NUMBER}'),
+    'incumbent': re.compile(rf'Cbc00(?:04|12|16)I Integer solution of {NUMBER} found '
+                            rf'(?:by (.+?) )?after (\d+) iterations and (\d+) nodes \({NUMBER} seconds\)'),
+    'result': re.compile(r'^Result - (.+?)\s*$', re.M),
+    'objective': re.compile(rf'^Objective value:\s+{NUMBER}', re.M),
+    'bound': re.compile(rf'^Lower bound:\s+{NUMBER}', re.M),
+    'gap': re.compile(rf'^Gap:\s+{NUMBER}', re.M),
+    'nodes': re.compile(r'^Enumerated nodes:\s+(\d+)', re.M),
+    'iterations': re.compile(r'^Total iterations:\s+(\d+)', re.M),
+    'cpu_time': re.compile(rf'^Time \(CPU seconds\):\s+{NUMBER}', re.M),
+    'wall_time': re.compile(rf'^Time \(Wallclock [Ss]econds\):\s+{NUMBER}', re.M),
+    'total_time': re.compile(rf'Total time \(CPU seconds\):\s+{NUMBER}\s+\(Wallclock seconds\):\s+{NUMBER}'),
+    # Continuous problems: no branch-and-bound summary
+    'lp_status': re.compile(r'^(Optimal|Primal infeasible|Dual infeasible|Stopped)\b.*?- objective value '
+                            rf'{NUMBER}', re.M),
+    'lp_optimal': re.compile(rf'^Optimal objective {NUMBER} - (\d+) iterations', re.M),
+    'lp_infeasible': re.compile(r'^Problem is (infeasible|unbounded)', re.M),
+}
+
+
+# ============================================================================ #
+#                                   PARSING                                    #
+# ============================================================================ #
+def _search(name, text, cast=float):
+    match = PATTERNS[name].search(text)
+    if match is None:
+        return None
+    groups = [cast(group) if group is not None else None for group in match.groups()]
+    return groups[0] if len(groups) == 1 else groups
+
+
+def parse_run(text):
+    """Return the record of one CBC run."""
+    record = {'version': _search('version', text, str)}
+
+    problem = _search('problem', text, int)
+    record['rows'], record['columns'], record['elements'] = problem or (None, None, None)
+
+    # Presolve reductions: LP presolve or Cgl preprocessing of MIPs
+    presolve = {}
+    lp_presolve = _search('lp_presolve', text, int)
+    if lp_presolve:
+        rows, d_rows, columns, d_columns, elements, d_elements = lp_presolve
+        presolve.update({'rows': rows, 'rows_removed': -d_rows, 'columns': columns,
+                         'columns_removed': -d_columns, 'elements': elements,
+                         'elements_removed': -d_elements})
+    cgl_presolve = _search('cgl_presolve', text, int)
+    if cgl_presolve:
+        presolve.update(dict(zip(('fixed', 'tightened_bounds', 'strengthened_rows', 'substitutions'),
+                                 cgl_presolve)))
+    cgl_processed = _search('cgl_processed', text, int)
+    if cgl_processed:
+        presolve.update(dict(zip(('rows', 'columns', 'integers', 'binaries', 'elements'), cgl_processed)))
+        if record['rows'] is not None:
+            presolve['rows_removed'] = record['rows'] - presolve['rows']
+            presolve['columns_removed'] = record['columns'] - presolve['columns']
+    if 'Presolve determined that the problem was infeasible' in text:
+        presolve['infeasible'] = True
+    record['presolve'] = presolve or None
+
+    root_lp = _search('root_lp', text)
+    record['root_lp'] = root_lp[0] if root_lp else None
+    root_cuts = _search('root_cuts', text)
+    record['root_cuts'] = root_cuts[1] if root_cuts else None
+
+    record['incumbents'] = [
+        {'objective': float(objective), 'heuristic': heuristic, 'iterations': int(iterations),
+         'nodes': int(nodes), 'seconds': float(seconds)}
+        for objective, heuristic, iterations, nodes, seconds in PATTERNS['incumbent'].findall(text)
+    ]
+    for incumbent in record['incumbents']:
+        incumbent['heuristic'] = incumbent['heuristic'] or None
+
+    record['result'] = _search('result', text, str)
+    record['objective'] = _search('objective', text)
+    record['bound'] = _search('bound', text)
+    record['gap'] = _search('gap', text)
+    record['nodes'] = _search('nodes', text, int)
+    record['iterations'] = _search('iterations', text, int)
+    record['cpu_time'] = _search('cpu_time', text)
+    record['wall_time'] = _search('wall_time', text)
+
+    # Continuous problems: no branch-and-bound summary
+    if record['result'] is None:
+        lp_status = _search('lp_status', text, str)
+        lp_optimal = _search('lp_optimal', text, str)
+        lp_infeasible = _search('lp_infeasible', text, str)
+        if lp_optimal:
+            record['result'] = 'Optimal'
+            record['objective'] = float(lp_optimal[0])
+            record['iterations'] = int(lp_optimal[1])
+        elif lp_status:
+            record['result'] = lp_status[0]
+            record['objective'] = float(lp_status[1])
+        elif lp_infeasible:
+            record['result'] = f'Problem {lp_infeasible}'
+        if record['root_lp'] is None:
+            record['root_lp'] = record['objective']
+
+    total_time = _search('total_time', text)
+    if total_time:
+        record['total_cpu_time'], record['total_wall_time'] = total_time
+    else:
+        record['total_cpu_time'] = record['total_wall_time'] = None
+
+    # CBC only prints the gap when it stops before proving optimality
+    if record['gap'] is None and record['result'] and record['result'].startswith('Optimal'):
+        record['gap'] = 0.0
+    return record
+
+
+def parse_text(text):
+    """Return one record per CBC run found in `text`."""
+    runs = text.split(RUN_START)[1:]
+    return [parse_run(RUN_START + run) for run in runs]
+
+
+def parse_file(source):
+    """Return the records of a log given as a path or an open file."""
+    if hasattr(source, 'read'):
+        return parse_text(source.read())
+    return parse_text(Path(source).read_text(errors='replace'))
+
+
+# ============================================================================ #
+#                                   CAPTURE                                    #
+# ============================================================================ #
+def solve_and_parse(prob, solver_class, **options):
+    """Solve `prob` with a CBC solver writing its log to a temporary file.
+
+    Returns the status and the record of the run; nothing is left on disk.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        log_path = Path(directory) / 'cbc.log'
+        status = prob.solve(solver_class(logPath=log_path, **options))
+        records = parse_file(log_path) if log_path.exists() else []
+    return status, records[-1] if records else None
+
+
+# ============================================================================ #
+#                                    EXPORT                                    #
+# ============================================================================ #
+def export_jsonl(records, path, **fields):
+    """Append the records to a JSON lines file, each with the extra `fields`
+    (run label, instance name...) and a timestamp."""
+    with open(path, 'a') as f:
+        for record in records:
+            f.write(json.dumps({'timestamp': time.time(), **fields, **record}) + '\n')
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Parse CBC logs into JSON lines.')
+    parser.add_argument('logs', nargs='+', type=Path, help='CBC log files')
+    parser.add_argument('--output', type=Path, help='JSON lines file (default: standard output)')
+    args = parser.parse_args()
+
+    for log in args.logs:
+        records = parse_file(log)
+        if args.output:
+            export_jsonl(records, args.output, source=str(log))
+        else:
+            for record in records:
+                print(json.dumps({'source': str(log), **record}))
@@ -0,0 +1,300 @@
+# -*- coding=utf-8 -*-
+
+
+"""Dense simplex in NumPy for tiny continuous problems.
+
+The models of tp1 have a handful of variables and constraints: writing an
+`.mps` file and starting CBC takes far longer than the solve itself. `solve`
+takes the model in matrix form (c, A, b, row senses, bounds, objective
+sense) and runs a two-phase tableau simplex in the Python process, with
+Bland's rule so that degenerate problems do not cycle.
+
+Variables are brought to y >= 0 (x = lower + y, x = upper - y or, for free
+variables, x = y1 - y2); finite upper bounds of variables with a finite
+lower bound become rows y <= upper - lower. The result has the values, the
+duals of the rows, the reduced costs and the optimal basis (`basis`,
+`B_inv` and the standard form) for sensitivity analysis.
+
+`DenseLP` is the PuLP solver around `solve`. It is opt-in:
+`backends.get_solver` returns it with PL_BACKEND=dense, for continuous
+problems of at most DENSE_LIMIT variables and constraints. It writes no
+log file.
+"""
+
+
+import numpy as np
+from pulp import (LpConstraintEQ, LpConstraintGE, LpConstraintLE, LpInteger,
+                  LpMaximize, LpSolutionInfeasible, LpSolutionOptimal,
+                  LpSolutionUnbounded, LpSolver, LpStatusInfeasible,
+                  LpStatusOptimal, LpStatusUnbounded, PulpSolverError)
+
+DENSE_LIMIT = 50
+TOLERANCE = 1e-9
+
+# Options of the other PuLP solvers accepted by DenseLP and ignored: no log
+# file, no MIP start, one thread, no gap (the simplex is exact)
+IGNORED_OPTIONS = {'logPath', 'warmStart', 'keepFiles', 'threads', 'gapRel', 'gapAbs', 'presolve', 'cuts'}
+
+SENSES = {'<=': LpConstraintLE, '>=': LpConstraintGE, '=': LpConstraintEQ,
+          LpConstraintLE: LpConstraintLE, LpConstraintGE: LpConstraintGE, LpConstraintEQ: LpConstraintEQ}
+
+
+# ============================================================================ #
+#                                STANDARD FORM                                 #
+# ============================================================================ #
+def standard_form(c, A, b, senses, lower, upper):
+    """Return the standard form min c_s y, A_s y = b_s, y >= 0 and the map
+    x = offset + T y[:T.shape[1]] back to the original variables.
+
+    The rows of A_s are the original rows followed by the upper-bound rows;
+    `flip[r]` is -1 when row r was negated to make b_s[r] >= 0.
+    """
+    m, n = A.shape
+    columns, offset = [], np.zeros(n)
+    bound_rows = []
+    for j in range(n):
+        column = np.zeros(n)
+        if np.isfinite(lower[j]):
+            offset[j] = lower[j]
+            column[j] = 1.0
+            columns.append(column)
+            if np.isfinite(upper[j]):
+                bound_rows.append((len(columns) - 1, upper[j] - lower[j]))
+        elif np.isfinite(upper[j]):
+            offset[j] = upper[j]
+            column[j] = -1.0
+            columns.append(column)
+        else:
+            column[j] = 1.0
+            columns.append(column)
+            columns.append(-column)
+    T = np.array(columns).T.reshape(n, len(columns))
+    k = T.shape[1]
+
+    # Lignes d'origine puis bornes supérieures ; une variable d'écart par
+    # inégalité
+    rows = m + len(bound_rows)
+    inequalities = [r for r in range(m) if senses[r] != LpConstraintEQ] + list(range(m, rows))
+    A_s = np.zeros((rows, k + len(inequalities)))
+    b_s = np.zeros(rows)
+    A_s[:m, :k] = A @ T
+    b_s[:m] = b - A @ offset
+    for row, (column, bound) in enumerate(bound_rows, start=m):
+        A_s[row, column] = 1.0
+        b_s[row] = bound
+    for slack, r in enumerate(inequalities, start=k):
+        A_s[r, slack] = -1.0 if r < m and senses[r] == LpConstraintGE else 1.0
+
+    flip = np.where(b_s < 0, -1.0, 1.0)
+    A_s *= flip[:, None]
+    b_s *= flip
+    c_s = np.zeros(A_s.shape[1])
+    c_s[:k] = c @ T
+    return c_s, A_s, b_s, flip, T, offset
+
+
+# ============================================================================ #
+#                                   SIMPLEX                                    #
+# ============================================================================ #
+def _pivot(tableau, basis, row, column):
+    tableau[row] /= tableau[row, column]
+    for r in range(tableau.shape[0]):
+        if r != row and tableau[r, column] != 0:
+            tableau[r] -= tableau[r, column] * tableau[row]
+    basis[row] = column
+
+
+def _iterate(tableau, basis, allowed, max_iterations):
+    """Simplex iterations on the last row as objective; Bland's rule.
+
+    Returns 'Optimal', 'Unbounded' or 'Not Solved' (iteration limit).
+    """
+    m = tableau.shape[0] - 1
+    for _ in range(max_iterations):
+        costs = tableau[-1, :-1]
+        entering = np.flatnonzero((costs < -TOLERANCE) & allowed)
+        if not entering.size:
+            return 'Optimal'
+        column = entering[0]
+        ratios = np.full(m, np.inf)
+        positive = tableau[:m, column] > TOLERANCE
+        ratios[positive] = tableau[:m, -1][positive] / tableau[:m, column][positive]
+        if not np.isfinite(ratios).any():
+            return 'Unbounded'
+        # Bland : plus petit indice de base parmi les rapports minimaux
+        candidates = np.flatnonzero(ratios <= ratios.min() + TOLERANCE)
+        row = candidates[np.argmin(np.asarray(basis)[candidates])]
+        _pivot(tableau, basis, row, column)
+    return 'Not Solved'
+
+
+def solve(c, A, b, senses, lower=None, upper=None, maximize=False, max_iterations=10_000):
+    """Solve the LP in matrix form.
+
+    `senses` holds '<=', '>=' or '=' (or the PuLP constants) per row;
+    `lower` and `upper` default to 0 and +inf. Returns a dict with
+    `status` ('Optimal', 'Infeasible', 'Unbounded' or 'Not Solved'),
+    `objective`, `x`, `duals` and `slacks` of the rows (b - Ax), reduced
+    costs `dj`, and for an optimal solution the basis (`basis`, `B_inv`) of
+    the standard form (`standard`: c, A, b, flip, T, offset).
+    """
+    c = np.asarray(c, dtype=float)
+    A = np.asarray(A, dtype=float).reshape(-1, len(c))
+    b = np.asarray(b, dtype=float)
+    m, n = A.shape
+    senses = [SENSES[sense] for sense in senses]
+    lower = np.zeros(n) if lower is None else np.asarray(lower, dtype=float)
+    upper = np.full(n, np.inf) if upper is None else np.asarray(upper, dtype=float)
+    sign = -1.0 if maximize else 1.0
+
+    c_s, A_s, b_s, flip, T, offset = standard_form(sign * c, A, b, senses, lower, upper)
+    rows, columns = A_s.shape
+    result = {'status': None, 'objective': None, 'x': None, 'duals': None, 'slacks': None, 'dj': None,
+              'basis': None, 'B_inv': None, 'standard': (c_s, A_s, b_s, flip, T, offset)}
+
+    # ------------------------------------------------------------------------ #
+    # Phase I : une variable artificielle par ligne
+    # ------------------------------------------------------------------------ #
+    tableau = np.zeros((rows + 1, columns + rows + 1))
+    tableau[:rows, :columns] = A_s
+    tableau[:rows, columns:columns + rows] = np.eye(rows)
+    tableau[:rows, -1] = b_s
+    tableau[-1, :columns] = -A_s.sum(axis=0)
+    tableau[-1, -1] = -b_s.sum()
+    basis = list(range(columns, columns + rows))
+
+    status = _iterate(tableau, basis, np.ones(columns + rows, dtype=bool), max_iterations)
+    if status == 'Not Solved' or -tableau[-1, -1] > 1e-7 * max(1.0, np.abs(b_s).max(initial=0)):
+        result['status'] = 'Not Solved' if status == 'Not Solved' else 'Infeasible'
+        return result
+
+    # Artificielles restées en base (à zéro) : les sortir, ou retirer la
+    # ligne redondante
+    kept = []
+    for row in range(rows):
+        if basis[row] >= columns:
+            candidates = np.flatnonzero(np.abs(tableau[row, :columns]) > TOLERANCE)
+            if not candidates.size:
+                continue
+            _pivot(tableau, basis, row, candidates[0])
+        kept.append(row)
+    tableau = np.vstack([tableau[kept], tableau[-1:]])
+    basis = [basis[row] for row in kept]
+
+    # ------------------------------------------------------------------------ #
+    # Phase II
+    # ------------------------------------------------------------------------ #
+    tableau[-1] = 0.0
+    tableau[-1, :columns] = c_s
+    for row, column in enumerate(basis):
+        tableau[-1] -= c_s[column] * tableau[row]
+    allowed = np.zeros(columns + rows, dtype=bool)
+    allowed[:columns] = True
+    status = _iterate(tableau, basis, allowed, max_iterations)
+    result['status'] = status
+    if status != 'Optimal':
+        return result
+
+    # ------------------------------------------------------------------------ #
+    # Solution, duaux et base
+    # ------------------------------------------------------------------------ #
+    y = np.zeros(columns)
+    y[basis] = tableau[:-1, -1]
+    x = offset + T @ y[:T.shape[1]]
+
+    B_inv = np.linalg.inv(A_s[kept][:, basis])
+    duals_s = np.zeros(rows)
+    duals_s[kept] = c_s[basis] @ B_inv
+    duals = sign * (duals_s * flip)[:m]
+
+    result.update({
+        'objective': float(c @ x),
+        'x': x,
+        'duals': duals,
+        'slacks': b - A @ x,
+        'dj': c - A.T @ duals,
+        'basis': basis,
+        'B_inv': B_inv,
+        'kept_rows': kept,
+    })
+    return result
+
+
+# ============================================================================ #
+#                                 PULP SOLVER                                  #
+# ============================================================================ #
+def to_dense(lp):
+    """Matrix form of a PuLP problem: variables, constraints, c, A, b,
+    senses, lower, upper and objective constant."""
+    variables = lp.variables()
+    constraints = lp.constraints()
+    column = {var.name: k for k, var in enumerate(variables)}
+
+    c = np.zeros(len(variables))
+    for var, coefficient in lp.objective.items():
+        c[column[var.name]] = coefficient
+    A = np.zeros((len(constraints), len(variables)))
+    for r, constraint in enumerate(constraints):
+        for var, coefficient in constraint.items():
+            A[r, column[var.name]] = coefficient
+    b = np.array([-constraint.constant for constraint in constraints], dtype=float)
+    senses = [constraint.sense for constraint in constraints]
+    lower = np.array([-np.inf if var.lowBound is None else var.lowBound for var in variables], dtype=float)
+    upper = np.array([np.inf if var.upBound is None else var.upBound for var in variables], dtype=float)
+    return variables, constraints, c, A, b, senses, lower, upper, float(lp.objective.constant)
+
+
+def is_small_lp(lp, limit=DENSE_LIMIT):
+    """Whether `lp` is continuous with at most `limit` variables and rows."""
+    return (lp.numVariables() <= limit and lp.numConstraints() <= limit
+            and not any(var.cat == LpInteger for var in lp.variables()))
+
+
+class DenseLP(LpSolver):
+    """PuLP solver running `solve` in the Python process.
+
+    The result of `solve` is kept in `lp.dense_result`, in the order of
+    `to_dense`, for the sensitivity analysis (tp1/sensitivity.py).
+
+    `timeLimit` is not checked: `max_iterations` bounds the solve instead.
+    The options of IGNORED_OPTIONS are accepted, so that the arguments of
+    the other solvers can be passed unchanged, and ignored; in particular
+    no `logPath` file is written. Any other option raises a TypeError.
+    """
+
+    name = 'DenseLP'
+
+    def __init__(self, mip=True, msg=False, timeLimit=None, max_iterations=10_000, **options):
+        unknown = set(options) - IGNORED_OPTIONS
+        if unknown:
+            raise TypeError(f'DenseLP: unknown options {", ".join(sorted(unknown))}')
+        super().__init__(mip=mip, msg=msg, timeLimit=timeLimit)
+        self.max_iterations = max_iterations
+
+    def available(self):
+        return True
+
+    def actualSolve(self, lp):
+        if any(var.cat == LpInteger for var in lp.variables()):
+            raise PulpSolverError('DenseLP: the problem has integer variables')
+
+        variables, constraints, c, A, b, senses, lower, upper, _ = to_dense(lp)
+        result = solve(c, A, b, senses, lower, upper, maximize=lp.sense == LpMaximize,
+                       max_iterations=self.max_iterations)
+        lp.dense_result = result
+
+        statuses = {
+            'Optimal': (LpStatusOptimal, LpSolutionOptimal),
+            'Infeasible': (LpStatusInfeasible, LpSolutionInfeasible),
+            'Unbounded': (LpStatusUnbounded, LpSolutionUnbounded),
+        }
+        if result['status'] not in statuses:
+            raise PulpSolverError(f'DenseLP: {result["status"]} (iteration limit)')
+        status, sol_status = statuses[result['status']]
+        if result['status'] == 'Optimal':
+            lp.assignVarsVals({var.name: value for var, value in zip(variables, result['x'].tolist())})
+            lp.assignVarsDj({var.name: value for var, value in zip(variables, result['dj'].tolist())})
+            for constraint, pi, slack in zip(constraints, result['duals'].tolist(), result['slacks'].tolist()):
+                constraint.pi, constraint.slack = pi, slack
+        lp.assignStatus(status, sol_status)
+        return status
@@ -0,0 +1,150 @@
+# -*- coding=utf-8 -*-
+
+
+"""Opt-in timing and memory instrumentation of the solve phases.
+
+Enabled by the PL_PROFILE environment variable (any value but '', '0' or
+'off') or by a `--profile` argument on the command line. When disabled,
+`phase` is a no-op context manager and `instrument` returns the solver
+unchanged.
+
+Phases used by the scripts:
+    data, variables, objective, constraints   inside set_model
+    write_mps                                 PuLP writes the problem file
+    solver                                    rest of the solve call
+    read_solution                             PuLP reads the solution back
+    report                                    print_log_output
+
+Each phase records its wall time and its tracemalloc peak (bytes allocated
+above the memory in use when it started). With PL_PROFILE_CPROFILE=<file>,
+the `build` phase is also profiled by cProfile and dumped to that file. With
+PL_PROFILE_OUTPUT=<file>, `export` appends the record as a JSON line.
+"""
+
+
+import contextlib
+import cProfile
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+
+def _enabled():
+    return os.environ.get('PL_PROFILE', '') not in ('', '0', 'off') or '--profile' in sys.argv
+
+
+# ============================================================================ #
+#                                   PROFILER                                   #
+# ============================================================================ #
+class Profiler:
+    """Nested phase timer with tracemalloc peaks."""
+
+    def __init__(self, enabled=None):
+        self.enabled = _enabled() if enabled is None else enabled
+        self.phases = {}
+        self._stack = []
+
+    def reset(self):
+        self.phases = {}
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Time the enclosed block and record its memory peak under `name`."""
+        if not self.enabled:
+            yield
+            return
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        # The tracemalloc peak is global: the parent keeps the peak reached
+        # so far, and gets the child peak back when the child ends
+        if self._stack:
+            self._stack[-1]['peak'] = max(self._stack[-1]['peak'], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        frame = {'start_memory': tracemalloc.get_traced_memory()[0], 'peak': 0}
+        self._stack.append(frame)
+
+        profile = None
+        if name == 'build' and os.environ.get('PL_PROFILE_CPROFILE'):
+            profile = cProfile.Profile()
+            profile.enable()
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if profile is not None:
+                profile.disable()
+                profile.dump_stats(os.environ['PL_PROFILE_CPROFILE'])
+
+            self._stack.pop()
+            peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+            if self._stack:
+                self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+
+            entry = self.phases.setdefault(name, {'time': 0.0, 'memory_peak': 0, 'calls': 0})
+            entry['time'] += elapsed
+            entry['memory_peak'] = max(entry['memory_peak'], peak - frame['start_memory'])
+            entry['calls'] += 1
+
+    def instrument(self, prob, solver):
+        """Time PuLP's file writing and solution reading for this solve only.
+
+        The methods are wrapped on the instances, so other problems and
+        solvers are left untouched. Returns the solver.
+        """
+        if not self.enabled:
+            return solver
+        if hasattr(prob, 'writeMPS'):
+            prob.writeMPS = self._wrap('write_mps', prob.writeMPS)
+        if hasattr(solver, 'readsol_MPS'):
+            solver.readsol_MPS = self._wrap('read_solution', solver.readsol_MPS)
+        return solver
+
+    def _wrap(self, name, method):
+        def wrapped(*args, **kwargs):
+            with self.phase(name):
+                return method(*args, **kwargs)
+        return wrapped
+
+    def record(self, **fields):
+        """Machine-readable record: the phases, with `solver` made exclusive
+        of the file writing and reading done during `solve`."""
+        phases = {name: dict(entry) for name, entry in self.phases.items()}
+        if 'solve' in phases:
+            io_time = sum(phases[name]['time'] for name in ('write_mps', 'read_solution') if name in phases)
+            phases['solver'] = {'time': phases['solve']['time'] - io_time,
+                                'memory_peak': phases['solve']['memory_peak'], 'calls': phases['solve']['calls']}
+        return {**fields, 'phases': phases}
+
+    def print_stats(self):
+        """Print the time and memory peak of each phase (nothing when
+        disabled); called after the last phase is closed."""
+        if not self.enabled:
+            return
+        print()
+        print('Phases:')
+        for name, entry in self.record()['phases'].items():
+            print(f'- ({name}) {entry["time"]:.6f} s, peak {entry["memory_peak"] / 1024:.1f} KiB')
+
+    def export(self, **fields):
+        """Append the record to PL_PROFILE_OUTPUT, if set, and return it."""
+        if not self.enabled:
+            return None
+        record = self.record(timestamp=time.time(), **fields)
+        path = os.environ.get('PL_PROFILE_OUTPUT')
+        if path:
+            with open(path, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+        return record
+
+
+# Profiler shared by the scripts
+PROFILER = Profiler()
+phase = PROFILER.phase
+instrument = PROFILER.instrument
+print_stats = PROFILER.print_stats
+export = PROFILER.export
@@ -0,0 +1,174 @@
+# -*- coding=utf-8 -*-
+
+
+"""Detection of integer variables that can be solved as continuous ones.
+
+An integer variable is relaxable when, whatever integer values the other
+integer variables take, the polytope left over the relaxable variables has
+integral vertices. The sufficient condition checked here is:
+
+    - the columns of the relaxable variables have entries in {-1, 0, +1} and
+      at most two nonzeros, and their rows can be split into two groups such
+      that two nonzeros of the same sign in a column are in different groups
+      and two of opposite signs in the same group (Heller-Tompkins): the
+      block is totally unimodular, like a network or transportation matrix;
+    - every other variable in these rows is an integer variable that stays
+      integer, with an integral coefficient, and the right-hand sides and
+      bounds are integral.
+
+In tp3, the truck variables c_ij form a transportation block once the
+warehouses E_i are fixed: they are relaxed and only E stays integer. The
+relaxed problem is solved, its values are checked to be integral (a solver
+may stop on a non-vertex solution) and the MIP is solved as a fallback.
+
+Environment switch:
+    PL_INTEGRALITY  'auto' (default) relaxes detected variables, 'off' always
+                    solves the MIP
+"""
+
+
+import os
+from collections import deque
+
+from pulp import LpContinuous, LpInteger
+
+from common import solution_cache
+
+TOLERANCE = 1e-6
+
+
+# ============================================================================ #
+#                                  DETECTION                                   #
+# ============================================================================ #
+def _integral(x):
+    return x is None or abs(x - round(x)) <= TOLERANCE
+
+
+def relaxable_variables(prob):
+    """Return `(variables, reason)`: the integer variables that can be relaxed
+    and a short explanation when none can."""
+    integers = [var for var in prob.variables() if var.cat == LpInteger]
+    if not integers:
+        return [], 'no integer variable'
+
+    # Columns of the integer variables: {name: [(row index, coefficient)]}
+    constraints = prob.constraints()
+    columns = {var.name: [] for var in integers}
+    for row, constraint in enumerate(constraints):
+        for var, coefficient in constraint.items():
+            if var.name in columns and coefficient:
+                columns[var.name].append((row, coefficient))
+
+    candidates = {
+        var.name for var in integers
+        if len(columns[var.name]) <= 2
+        and all(abs(coefficient) == 1 for _, coefficient in columns[var.name])
+        and _integral(var.lowBound) and _integral(var.upBound)
+    }
+
+    # Rows of the block: every other variable must stay integer with an
+    # integral coefficient, and the right-hand side must be integral
+    changed = True
+    while changed and candidates:
+        changed = False
+        for constraint in constraints:
+            block = [var for var in constraint if var.name in candidates]
+            if not block:
+                continue
+            valid = _integral(constraint.constant) and all(
+                var.cat == LpInteger and _integral(coefficient)
+                for var, coefficient in constraint.items() if var.name not in candidates
+            )
+            if not valid:
+                candidates -= {var.name for var in block}
+                changed = True
+
+    if not candidates:
+        return [], 'no totally unimodular block'
+    if not _two_groups(candidates, columns):
+        return [], 'block rows cannot be split into two groups'
+    return [var for var in integers if var.name in candidates], None
+
+
+def _two_groups(candidates, columns):
+    """Heller-Tompkins partition of the rows of the candidate columns."""
+    # Row graph: an edge per column with two nonzeros, labelled 1 when the
+    # rows must be in different groups (same sign), 0 otherwise
+    edges = {}
+    for name in candidates:
+        if len(columns[name]) == 2:
+            (row_a, a), (row_b, b) = columns[name]
+            if row_a == row_b:
+                return False
+            different = int((a > 0) == (b > 0))
+            edges.setdefault(row_a, []).append((row_b, different))
+            edges.setdefault(row_b, []).append((row_a, different))
+
+    group = {}
+    for root in edges:
+        if root in group:
+            continue
+        group[root] = 0
+        queue = deque([root])
+        while queue:
+            row = queue.popleft()
+            for other, different in edges[row]:
+                expected = group[row] ^ different
+                if other not in group:
+                    group[other] = expected
+                    queue.append(other)
+                elif group[other] != expected:
+                    return False
+    return True
+
+
+# ============================================================================ #
+#                                    SOLVE                                     #
+# ============================================================================ #
+def solve(prob, solver, mode=None, cache_mode=None):
+    """Solve `prob`, relaxing the detected variables when possible.
+
+    `mode` is 'auto' or 'off' and defaults to the PL_INTEGRALITY variable;
+    `cache_mode` is passed to `solution_cache.solve`. The decision is stored
+    in `prob.integrality` (see `describe`). Returns the status, like
+    `prob.solve`.
+    """
+    mode = (mode or os.environ.get('PL_INTEGRALITY', 'auto')).lower()
+    if mode == 'off':
+        prob.integrality = {'relaxed': 0, 'integral': None, 'fallback': False, 'reason': 'disabled'}
+        return solution_cache.solve(prob, solver, mode=cache_mode)
+
+    variables, reason = relaxable_variables(prob)
+    report = {'relaxed': len(variables), 'integral': None, 'fallback': False, 'reason': reason}
+    prob.integrality = report
+    if not variables:
+        return solution_cache.solve(prob, solver, mode=cache_mode)
+
+    for var in variables:
+        var.cat = LpContinuous
+    try:
+        status = solution_cache.solve(prob, solver, mode=cache_mode)
+    finally:
+        for var in variables:
+            var.cat = LpInteger
+
+    report['integral'] = all(_integral(var.varValue) for var in variables)
+    if report['integral']:
+        for var in variables:
+            if var.varValue is not None:
+                var.varValue = round(var.varValue)
+        return status
+
+    report['fallback'] = True
+    return solution_cache.solve(prob, solver, mode=cache_mode)
+
+
+def describe(report):
+    """One line of the decision, for the stats output."""
+    if report is None:
+        return 'not checked'
+    if not report['relaxed']:
+        return f'MIP ({report["reason"]})'
+    if report['fallback']:
+        return f'{report["relaxed"]} variables relaxed, fractional solution, MIP solved again'
+    return f'{report["relaxed"]} variables relaxed, integral solution'
@@ -0,0 +1,190 @@
+# -*- coding=utf-8 -*-
+
+
+"""Persistent solution cache for PuLP problems.
+
+A solution is stored in an SQLite database under a key that hashes the
+canonical form of the model (objective, constraints, variable bounds and
+types) together with the solver options. Options that do not change the
+result (log file, console output, temporary files, MIP start) are left out.
+
+The cache is opt-in: without PL_CACHE=on every solve runs the solver, so
+timings and solver logs are never those of a cache hit by accident.
+
+Environment switches:
+    PL_CACHE       'off' (default) to bypass the cache, 'on' to use it,
+                   'refresh' to solve again and overwrite the stored solution
+    PL_CACHE_PATH  database file (default ~/.cache/pl_tp/solutions.sqlite)
+    PL_CACHE_SIZE  maximum size of the stored solutions in bytes (default
+                   64 MiB), least recently used entries are evicted first
+
+A change to the model or to the solver options changes the key, so stale
+entries are never returned; they are evicted once the size limit is
+reached. To empty the cache, run `python -m common.solution_cache --clear`
+from the repository root or delete the database file.
+"""
+
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+from pulp import LpSolutionOptimal, LpStatus
+
+DEFAULT_PATH = Path.home() / '.cache' / 'pl_tp' / 'solutions.sqlite'
+DEFAULT_SIZE = 64 * 1024 * 1024
+
+# Solver attributes that change neither the status nor the solution (the
+# winner of a portfolio is the state of its last solve)
+IGNORED_OPTIONS = {'msg', 'logPath', 'keepFiles', 'tmpDir', 'path', 'warmStart', 'winner'}
+
+
+# ============================================================================ #
+#                                     KEY                                      #
+# ============================================================================ #
+def problem_key(prob, solver):
+    """Return the hex digest identifying `prob` solved by `solver`."""
+    model = prob.toDict()
+    model['parameters'] = {'sense': model['parameters']['sense']}
+    for var in model['variables']:
+        del var['varValue'], var['dj']
+    for constraint in model['constraints']:
+        del constraint['pi']
+
+    options = _relevant({key: value for key, value in vars(solver).items() if key != 'optionsDict'})
+    options.update(_relevant(getattr(solver, 'optionsDict', {})))
+    options['solver'] = type(solver).__name__
+
+    payload = json.dumps({'model': model, 'solver': options}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _relevant(options):
+    """`options` without IGNORED_OPTIONS, also in nested dicts and lists
+    (options of the racers of a `Portfolio`)."""
+    if isinstance(options, dict):
+        return {key: _relevant(value) for key, value in options.items() if key not in IGNORED_OPTIONS}
+    if isinstance(options, (list, tuple)):
+        return [_relevant(value) for value in options]
+    return options
+
+
+# ============================================================================ #
+#                                    STORE                                     #
+# ============================================================================ #
+class SolutionCache:
+    """SQLite store of solutions with size-based LRU eviction."""
+
+    def __init__(self, path=None, max_size=None):
+        self.path = Path(path or os.environ.get('PL_CACHE_PATH', DEFAULT_PATH))
+        self.max_size = int(max_size or os.environ.get('PL_CACHE_SIZE', DEFAULT_SIZE))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS solutions ('
+            ' key TEXT PRIMARY KEY, status INTEGER, sol_status INTEGER,'
+            ' objective REAL, solution_time REAL, solution BLOB,'
+            ' size INTEGER, last_used REAL)'
+        )
+
+    def get(self, key):
+        """Return `(status, sol_status, objective, solution_time, values)` or None."""
+        row = self.connection.execute(
+            'SELECT status, sol_status, objective, solution_time, solution FROM solutions WHERE key = ?',
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        with self.connection:
+            self.connection.execute('UPDATE solutions SET last_used = ? WHERE key = ?', (time.time(), key))
+        *head, solution = row
+        return (*head, json.loads(solution))
+
+    def put(self, key, status, sol_status, objective, solution_time, values):
+        """Store a solution, then evict the least recently used ones."""
+        solution = json.dumps(values).encode()
+        with self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, status, sol_status, objective, solution_time, solution, len(solution), time.time()),
+            )
+            self._evict()
+
+    def _evict(self):
+        total = self.connection.execute('SELECT COALESCE(SUM(size), 0) FROM solutions').fetchone()[0]
+        rows = self.connection.execute('SELECT key, size FROM solutions ORDER BY last_used').fetchall()
+        for key, size in rows:
+            if total <= self.max_size:
+                break
+            self.connection.execute('DELETE FROM solutions WHERE key = ?', (key,))
+            total -= size
+
+    def invalidate(self, key=None):
+        """Remove one solution, or every solution when `key` is None."""
+        with self.connection:
+            if key is None:
+                self.connection.execute('DELETE FROM solutions')
+            else:
+                self.connection.execute('DELETE FROM solutions WHERE key = ?', (key,))
+
+    def close(self):
+        self.connection.close()
+
+
+# ============================================================================ #
+#                                    SOLVE                                     #
+# ============================================================================ #
+def solve(prob, solver, mode=None, cache=None):
+    """Solve `prob` with `solver` unless its solution is already cached.
+
+    `mode` is 'on', 'off' or 'refresh' and defaults to the PL_CACHE variable
+    ('off' when unset).
+    On a hit the status, the objective and the variable values are set on
+    `prob` as if the solver had run, and `prob.solutionTime` is the lookup
+    time. Returns the status, like `prob.solve`.
+    """
+    mode = (mode or os.environ.get('PL_CACHE') or 'off').lower()
+    if mode == 'off':
+        return prob.solve(solver)
+
+    start = time.perf_counter()
+    key = problem_key(prob, solver)
+    store = cache or SolutionCache()
+    try:
+        hit = store.get(key) if mode != 'refresh' else None
+        if hit is not None:
+            prob.status, prob.sol_status, _, _, values = hit
+            prob.assignVarsVals(values)
+            prob.solutionTime = prob.solutionCpuTime = time.perf_counter() - start
+            return prob.status
+
+        status = prob.solve(solver)
+        # Only finished solves are stored: a run stopped by a time limit
+        # could find a better solution next time
+        proven = LpStatus[status] == 'Optimal' and prob.sol_status == LpSolutionOptimal
+        if proven or LpStatus[status] in ('Infeasible', 'Unbounded'):
+            values = {var.name: var.varValue for var in prob.variables()}
+            store.put(key, prob.status, prob.sol_status, prob.objective.value(),
+                      prob.solutionTime, values)
+        return status
+    finally:
+        if cache is None:
+            store.close()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Inspect or clear the solution cache.')
+    parser.add_argument('--clear', action='store_true', help='remove every stored solution')
+    args = parser.parse_args()
+
+    store = SolutionCache()
+    if args.clear:
+        store.invalidate()
+    count, size = store.connection.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM solutions').fetchone()
+    print(f'{store.path}: {count} solutions, {size} bytes')
+    store.close()
@@ -0,0 +1,161 @@
+# -*- coding=utf-8 -*-
+
+
+"""Sparse, streaming export of solutions.
+
+Only the variables with a nonzero value are written, chunk by chunk, so a
+model with millions of variables is exported without building the whole
+table in memory and without one `print` per variable. The format follows
+the file suffix:
+
+    .csv      name,value
+    .jsonl    {"name": ..., "value": ...} per line
+    .parquet  columns name and value (package `pyarrow`)
+
+`breakdown` splits the objective value by groups of variables (rent and
+transport, or salaries, recruitments and layoffs) with vectorized sums.
+
+Environment switches:
+    PL_EXPORT   file where the scripts write the nonzero values (unset: no
+                export)
+    PL_SUMMARY  'on' to print every variable value, 'off' to print only the
+                stats and the objective breakdown, 'auto' (default) to print
+                the values of models up to SUMMARY_LIMIT variables
+"""
+
+
+import csv
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+CHUNK_SIZE = 100_000
+SUMMARY_LIMIT = 1000
+TOLERANCE = 1e-9
+
+
+# ============================================================================ #
+#                                    VALUES                                    #
+# ============================================================================ #
+def flatten(variables):
+    """Yield the variables of a dict, a list or nested lists of variables."""
+    if isinstance(variables, dict):
+        variables = variables.values()
+    for item in variables:
+        if isinstance(item, (list, tuple, dict)):
+            yield from flatten(item)
+        else:
+            yield item
+
+
+def values(variables):
+    """Array of the values of `variables` (None, for unsolved, gives 0)."""
+    variables = list(flatten(variables))
+    return np.fromiter((var.varValue or 0.0 for var in variables), dtype=float, count=len(variables))
+
+
+def nonzeros(variables, tolerance=TOLERANCE, chunk_size=CHUNK_SIZE):
+    """Yield `(names, values)` chunks of the variables whose |value| > tolerance."""
+    chunk = []
+    for var in flatten(variables):
+        chunk.append(var)
+        if len(chunk) == chunk_size:
+            yield _select(chunk, tolerance)
+            chunk = []
+    if chunk:
+        yield _select(chunk, tolerance)
+
+
+def _select(chunk, tolerance):
+    chunk_values = values(chunk)
+    kept = np.flatnonzero(np.abs(chunk_values) > tolerance)
+    return [chunk[k].name for k in kept], chunk_values[kept]
+
+
+def breakdown(objective, groups):
+    """Return `{group name: cost}` of the objective for each group of variables.
+
+    `groups` maps a name to the variables of the group (dict or nested
+    lists); variables absent from the objective cost nothing.
+    """
+    result = {}
+    for name, variables in groups.items():
+        variables = list(flatten(variables))
+        costs = np.fromiter((objective.get(var, 0.0) for var in variables), dtype=float, count=len(variables))
+        result[name] = float(costs @ values(variables))
+    return result
+
+
+# ============================================================================ #
+#                                    WRITE                                     #
+# ============================================================================ #
+def write(variables, path, tolerance=TOLERANCE, chunk_size=CHUNK_SIZE):
+    """Write the nonzero values of `variables` to `path`; returns their count."""
+    path = Path(path)
+    writers = {'.csv': _write_csv, '.jsonl': _write_jsonl, '.parquet': _write_parquet}
+    if path.suffix not in writers:
+        raise ValueError(f'{path}: unknown export format (expected {", ".join(writers)})')
+    return writers[path.suffix](nonzeros(variables, tolerance, chunk_size), path)
+
+
+def _write_csv(chunks, path):
+    count = 0
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(('name', 'value'))
+        for names, chunk_values in chunks:
+            writer.writerows(zip(names, chunk_values.tolist()))
+            count += len(names)
+    return count
+
+
+def _write_jsonl(chunks, path):
+    count = 0
+    with open(path, 'w') as f:
+        for names, chunk_values in chunks:
+            f.writelines(json.dumps({'name': name, 'value': value}) + '\n'
+                         for name, value in zip(names, chunk_values.tolist()))
+            count += len(names)
+    return count
+
+
+def _write_parquet(chunks, path):
+    if pyarrow is None:
+        raise ImportError(f'{path}: the Parquet export needs pyarrow, which is not installed')
+    schema = pyarrow.schema([('name', pyarrow.string()), ('value', pyarrow.float64())])
+    count = 0
+    with pyarrow.parquet.ParquetWriter(path, schema) as writer:
+        for names, chunk_values in chunks:
+            writer.write_table(pyarrow.table({'name': names, 'value': chunk_values}, schema=schema))
+            count += len(names)
+    return count
+
+
+# ============================================================================ #
+#                                   SCRIPTS                                    #
+# ============================================================================ #
+def summary_enabled(prob):
+    """Whether the scripts print every variable value of `prob` (PL_SUMMARY)."""
+    mode = os.environ.get('PL_SUMMARY', 'auto').lower()
+    if mode == 'auto':
+        return prob.numVariables() <= SUMMARY_LIMIT
+    return mode not in ('0', 'off')
+
+
+def save(prob, path=None):
+    """Write the nonzero values of `prob` to `path` or PL_EXPORT, if set.
+
+    Returns the number of values written, or None without a file.
+    """
+    path = path or os.environ.get('PL_EXPORT')
+    if not path:
+        return None
+    return write(prob.variables(), path)
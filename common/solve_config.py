@@ -0,0 +1,157 @@
+# -*- coding=utf-8 -*-
+
+
+"""Solve configuration shared by every entry point.
+
+Settings (None keeps the solver default):
+    threads      number of solver threads
+    time_limit   seconds
+    gap_rel      relative MIP gap at which the search stops
+    gap_abs      absolute MIP gap at which the search stops
+    presolve     True / False
+    cuts         True / False (CBC only)
+    seed         random seed of the solver
+    portfolio    number of configurations raced in parallel processes (one
+                 seed each), or a list of settings dicts, one per racer
+
+They are read, by increasing priority, from a JSON or TOML file (given by
+`--solver-config FILE` or the PL_SOLVE_CONFIG variable) and from the
+command line: --threads, --time-limit, --gap-rel, --gap-abs, --presolve
+on|off, --cuts on|off, --solver-seed, --portfolio. Scripts without an
+argument parser take them from `sys.argv` directly; scripts with one call
+`add_arguments` so that their parser accepts them. `get_config` reads them
+at its first call, not at import.
+
+`backends.get_solver` applies the configuration to the solvers it builds.
+"""
+
+
+import argparse
+import functools
+import json
+import os
+import sys
+from pathlib import Path
+
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
+SETTINGS = ('threads', 'time_limit', 'gap_rel', 'gap_abs', 'presolve', 'cuts', 'seed', 'portfolio')
+
+
+def _switch(text):
+    if text.lower() not in ('on', 'off'):
+        raise argparse.ArgumentTypeError(f"expected 'on' or 'off', got {text!r}")
+    return text.lower() == 'on'
+
+
+def _portfolio(text):
+    return int(text) if text.isdigit() else json.loads(text)
+
+
+# (option, setting, type, help)
+ARGUMENTS = (
+    ('--threads', 'threads', int, 'number of solver threads'),
+    ('--time-limit', 'time_limit', float, 'solver time limit (s)'),
+    ('--gap-rel', 'gap_rel', float, 'relative MIP gap'),
+    ('--gap-abs', 'gap_abs', float, 'absolute MIP gap'),
+    ('--presolve', 'presolve', _switch, 'solver presolve (on or off)'),
+    ('--cuts', 'cuts', _switch, 'CBC cuts (on or off)'),
+    ('--solver-seed', 'seed', int, 'random seed of the solver'),
+    ('--portfolio', 'portfolio', _portfolio, 'configurations raced in parallel (count or JSON list)'),
+    ('--solver-config', 'config_file', Path, 'JSON or TOML solve configuration'),
+)
+
+
+# ============================================================================ #
+#                                   LOADING                                    #
+# ============================================================================ #
+def add_arguments(parser):
+    """Add the solve options missing from `parser` (an option the script
+    already defines, like --time-limit, keeps the script's definition)."""
+    group = parser.add_argument_group('solve configuration')
+    for option, setting, kind, help_text in ARGUMENTS:
+        try:
+            group.add_argument(option, dest=f'solve_{setting}', type=kind, help=help_text)
+        except argparse.ArgumentError:
+            pass  # option already defined by the script
+    return parser
+
+
+def read_file(path):
+    """Settings of a JSON or TOML file."""
+    path = Path(path)
+    if path.suffix == '.toml':
+        if tomllib is None:
+            raise ImportError(f'{path}: reading TOML needs Python 3.11 or later')
+        with open(path, 'rb') as f:
+            settings = tomllib.load(f)
+    else:
+        with open(path) as f:
+            settings = json.load(f)
+    unknown = set(settings) - set(SETTINGS)
+    if unknown:
+        raise ValueError(f'{path}: unknown settings {", ".join(sorted(unknown))}')
+    return settings
+
+
+def load(argv=None):
+    """Configuration from the file and the command line `argv` (default
+    `sys.argv`); arguments that are not solve options are ignored."""
+    parser = add_arguments(argparse.ArgumentParser(add_help=False, allow_abbrev=False))
+    args, _ = parser.parse_known_args(sys.argv[1:] if argv is None else argv)
+
+    config = dict.fromkeys(SETTINGS)
+    path = args.solve_config_file or os.environ.get('PL_SOLVE_CONFIG')
+    if path:
+        config.update(read_file(path))
+    for _, setting, _, _ in ARGUMENTS:
+        value = getattr(args, f'solve_{setting}', None)
+        if value is not None and setting in config:
+            config[setting] = value
+    return config
+
+
+# ============================================================================ #
+#                                   OPTIONS                                    #
+# ============================================================================ #
+def solver_options(config, solver='cbc'):
+    """PuLP keyword arguments of `config` for a 'cbc' or 'highs' solver."""
+    options = {}
+    for setting, name in (('threads', 'threads'), ('time_limit', 'timeLimit'),
+                          ('gap_rel', 'gapRel'), ('gap_abs', 'gapAbs')):
+        if config.get(setting) is not None:
+            options[name] = config[setting]
+
+    if solver == 'highs':
+        if config.get('presolve') is not None:
+            options['presolve'] = 'on' if config['presolve'] else 'off'
+        if config.get('seed') is not None:
+            options['random_seed'] = config['seed']
+    else:
+        for setting in ('presolve', 'cuts'):
+            if config.get(setting) is not None:
+                options[setting] = config[setting]
+        if config.get('seed') is not None:
+            options['options'] = [f'randomCbcSeed {config["seed"]}', f'randomSeed {config["seed"]}']
+    return options
+
+
+def variants(config):
+    """Settings of each racer of the portfolio (empty without portfolio)."""
+    portfolio = config.get('portfolio')
+    if not portfolio:
+        return []
+    base = {key: value for key, value in config.items() if key != 'portfolio'}
+    if isinstance(portfolio, int):
+        first = base.get('seed') or 0
+        return [{**base, 'seed': first + k} for k in range(portfolio)]
+    return [{**base, **variant} for variant in portfolio]
+
+
+@functools.cache
+def get_config():
+    """Configuration of the running script, loaded at the first call."""
+    return load()
@@ -0,0 +1,20 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# `common` is imported as a package from the repository root; the tp1 and
+# tp3 scripts import each other as top-level modules
+for path in (ROOT, ROOT / 'tp1', ROOT / 'tp3'):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+
+@pytest.fixture(autouse=True)
+def work_dir(tmp_path, monkeypatch):
+    """Run each test in its own directory: the solvers write their logs to
+    the working directory."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,63 @@
+"""Random and hand-written LPs, and their CBC solve, shared by the tests
+of the dense and batched LP solvers."""
+
+import numpy as np
+from pulp import PULP_CBC_CMD, LpMaximize, LpMinimize, LpProblem, LpStatus, LpVariable, lpSum, value
+
+SENSES = ('<=', '>=', '=')
+
+
+def build(c, A, b, senses, lower, upper, maximize):
+    """PuLP problem of the LP in matrix form."""
+    prob = LpProblem('lp', LpMaximize if maximize else LpMinimize)
+    x = [LpVariable(f'x_{j}', lowBound=float(lower[j]),
+                    upBound=None if np.isinf(upper[j]) else float(upper[j]))
+         for j in range(len(c))]
+    prob += lpSum(float(c[j]) * x[j] for j in range(len(c)))
+    for r, sense in enumerate(senses):
+        row = lpSum(float(A[r, j]) * x[j] for j in range(len(c)))
+        prob += {'<=': row <= b[r], '>=': row >= b[r], '=': row == b[r]}[sense], f'row_{r}'
+    return prob
+
+
+def solve_cbc(*lp):
+    prob = build(*lp)
+    prob.solve(PULP_CBC_CMD(msg=False))
+    # An objective without any term has the value None
+    return LpStatus[prob.status], value(prob.objective) or 0.0
+
+
+def random_lp(rng, n, m):
+    """Random LP with some upper bounds and some '=' rows; feasible or not,
+    bounded or not.
+
+    CBC gets some problems wrong that both solvers handle: free variables,
+    empty rows (0 <= -1 is reported optimal) and variables in no row (an
+    unbounded problem is reported infeasible). The lower bounds are finite
+    and every row and column of A has a nonzero.
+    """
+    c = rng.integers(-5, 6, n).astype(float)
+    A = rng.integers(-4, 5, (m, n)).astype(float)
+    while not (A.any(axis=0).all() and A.any(axis=1).all()):
+        A = rng.integers(-4, 5, (m, n)).astype(float)
+    b = rng.integers(-10, 20, m).astype(float)
+    senses = list(rng.choice(SENSES, m, p=[0.6, 0.3, 0.1]))
+    lower = rng.integers(-3, 2, n).astype(float)
+    upper = np.where(rng.random(n) < 0.3, lower + rng.integers(1, 8, n), np.inf)
+    return c, A, b, senses, lower, upper, bool(rng.integers(2))
+
+
+# Small LPs with a known status: (c, A, b, senses, maximize, status)
+EDGE_CASES = [
+    ([1, 1], [[1, 1]], [-1], ['<='], False, 'Infeasible'),
+    ([1, 1], [[1, 1], [1, 1]], [2, 3], ['<=', '>='], False, 'Infeasible'),
+    ([1, 1], [[1, -1]], [1], ['<='], True, 'Unbounded'),
+    ([-1, 2], [[1, -1]], [-2], ['>='], False, 'Unbounded'),
+    ([40, 35], [[2, 4], [3, 2]], [50, 30], ['<=', '<='], True, 'Optimal'),
+]
+
+
+def edge_case(c, A, b, senses, maximize):
+    n = len(c)
+    return (np.array(c, float), np.array(A, float), np.array(b, float), senses,
+            np.zeros(n), np.full(n, np.inf), maximize)
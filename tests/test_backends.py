@@ -0,0 +1,29 @@
+import numpy as np
+from pulp import LpMaximize, LpProblem, LpVariable
+
+from common import backends
+
+
+def test_to_arrays():
+    prob = LpProblem('arrays', LpMaximize)
+    a = LpVariable('a', lowBound=0)
+    b = LpVariable('b', lowBound=0, upBound=4, cat='Integer')
+    prob += 40 * a + 35 * b + 5
+    prob += 2 * a + 4 * b <= 50, 'resource'
+    prob += 3 * a + 2 * b >= 6  # unnamed row
+    prob += a - b == 1, 'balance'
+
+    variables, constraints, arrays = backends.to_arrays(prob)
+    assert [var.name for var in variables] == ['a', 'b']
+    assert len(constraints) == 3
+    assert arrays['cost'].tolist() == [40, 35] and arrays['offset'] == 5
+    assert arrays['integer'].tolist() == [False, True]
+    assert arrays['col_upper'].tolist() == [np.inf, 4]
+    assert arrays['row_lower'].tolist() == [-np.inf, 6, 1]
+    assert arrays['row_upper'].tolist() == [50, np.inf, 1]
+
+    dense = np.zeros((3, 2))
+    for k in range(2):
+        for position in range(arrays['start'][k], arrays['start'][k + 1]):
+            dense[arrays['index'][position], k] = arrays['value'][position]
+    assert dense.tolist() == [[2, 4], [3, 2], [1, -1]]
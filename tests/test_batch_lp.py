@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from pulp import LpStatus
+
+from common import batch_lp
+from lp_cases import EDGE_CASES, edge_case, random_lp, solve_cbc
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_batch_lp_matches_cbc(seed):
+    rng = np.random.default_rng(seed)
+    n, m = rng.integers(1, 4), rng.integers(1, 4)
+    instances = [random_lp(rng, n, m) for _ in range(5)]
+    _, A, _, senses, lower, upper, maximize = instances[0]
+    c = np.array([lp[0] for lp in instances])
+    b = np.array([lp[2] for lp in instances])
+    batch = batch_lp.solve(c, A, b, senses, lower, upper, maximize=maximize)
+
+    for k in range(len(instances)):
+        status, objective = solve_cbc(c[k], A, b[k], senses, lower, upper, maximize)
+        assert LpStatus[batch['status'][k]] == status
+        if status == 'Optimal':
+            assert batch['objective'][k] == pytest.approx(objective, rel=1e-6, abs=1e-6)
+
+
+@pytest.mark.parametrize('c, A, b, senses, maximize, status', EDGE_CASES)
+def test_batch_lp_edge_cases(c, A, b, senses, maximize, status):
+    lp = edge_case(c, A, b, senses, maximize)
+    assert LpStatus[batch_lp.solve(*lp[:6], maximize=maximize)['status'][0]] == status
+
+
+def test_batch_lp_per_instance_matrix():
+    A = np.array([[[1.0, 1.0]], [[1.0, -1.0]]])
+    result = batch_lp.solve([1.0, 1.0], A, [[4.0], [1.0]], maximize=True)
+    assert batch_lp.describe(result['status']) == {'Optimal': 1, 'Unbounded': 1}
+    assert result['objective'][0] == pytest.approx(4.0)
+    assert np.isnan(result['objective'][1])
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from pulp import PULP_CBC_CMD, value
+
+import benders
+import question3
+from instances import default_instance, generate_instance
+
+
+@pytest.fixture(autouse=True)
+def cbc_backend(monkeypatch):
+    monkeypatch.delenv('PL_BACKEND', raising=False)
+
+
+def cbc_optimum(p, c, d, l, C):
+    prob = question3.set_model(*(np.asarray(x).tolist() for x in (p, c, d, l)))[0]
+    prob.solve(PULP_CBC_CMD(msg=False))
+    return value(prob.objective)
+
+
+def check_solution(result, p, c, d, l, C):
+    E, trucks, lower_bound, upper_bound, _ = result
+    cap, dem = np.asarray(c) // C, np.asarray(d) // C
+    assert (trucks.sum(axis=1) <= cap * E).all()
+    assert (trucks.sum(axis=0) >= dem).all()
+    assert np.asarray(p) @ E + (np.asarray(l) * trucks).sum() == pytest.approx(upper_bound)
+    assert lower_bound == pytest.approx(upper_bound, rel=1e-6)
+
+
+@pytest.mark.parametrize('pareto', [False, True])
+def test_default_instance(pareto):
+    instance = default_instance()
+    result = benders.solve(*instance, pareto=pareto, verbose=False)
+    check_solution(result, *instance)
+    assert result[3] == 10345
+
+
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('pareto', [False, True])
+def test_same_optimum_as_cbc(seed, pareto):
+    instance = generate_instance(8, 6, seed=seed)
+    result = benders.solve(*instance, pareto=pareto, verbose=False)
+    check_solution(result, *instance)
+    assert result[3] == pytest.approx(cbc_optimum(*instance))
+
+
+def test_not_enough_capacity():
+    # The feasibility cut makes the master infeasible
+    p, c, d, l, C = default_instance()
+    with pytest.raises(ValueError):
+        benders.solve(p, np.asarray(c) // 10, d, l, C, verbose=False)
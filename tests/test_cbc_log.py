@@ -0,0 +1,86 @@
+import json
+
+import pytest
+from pulp import PULP_CBC_CMD, LpProblem, LpVariable, value
+
+import exercice1
+import question3
+from common import cbc_log
+from instances import default_instance, generate_instance
+
+
+def mip(seed=None):
+    data = default_instance() if seed is None else generate_instance(12, 10, seed=seed)
+    return question3.set_model(*(x.tolist() for x in data[:4]))[0]
+
+
+@pytest.mark.parametrize('seed', [None, 0, 1])
+def test_mip_record(seed):
+    prob = mip(seed)
+    status, record = cbc_log.solve_and_parse(prob, PULP_CBC_CMD, msg=False)
+
+    assert status == 1 and record['result'].startswith('Optimal')
+    assert record['objective'] == pytest.approx(value(prob.objective))
+    assert (record['rows'], record['columns']) == (len(prob.constraints()), len(prob.variables()))
+    assert record['gap'] == 0.0 and record['nodes'] >= 0 and record['iterations'] >= 0
+    # Minimisation: the root bounds are below the optimum, the incumbents
+    # decrease down to it
+    assert record['root_lp'] <= record['objective'] + 1e-6
+    if record['root_cuts'] is not None:
+        assert record['root_lp'] - 1e-6 <= record['root_cuts'] <= record['objective'] + 1e-6
+    objectives = [incumbent['objective'] for incumbent in record['incumbents']]
+    assert objectives == sorted(objectives, reverse=True)
+    assert objectives[-1] == pytest.approx(record['objective'])
+
+
+def test_lp_record():
+    prob = exercice1.set_model()[0]
+    status, record = cbc_log.solve_and_parse(prob, PULP_CBC_CMD, msg=False)
+    assert status == 1 and record['result'] == 'Optimal'
+    assert record['objective'] == record['root_lp'] == pytest.approx(493.75)
+    assert record['incumbents'] == [] and record['presolve']['rows'] == 2
+
+
+def test_infeasible_record():
+    prob = LpProblem('infeasible')
+    x = LpVariable('x', lowBound=0, upBound=1)
+    prob += x
+    prob += x >= 2, 'floor'
+    status, record = cbc_log.solve_and_parse(prob, PULP_CBC_CMD, msg=False)
+    assert status == -1
+    assert 'infeasible' in record['result'] and record['objective'] is None
+
+
+def test_several_runs_and_export(tmp_path):
+    for seed in (0, 1):
+        mip(seed).solve(PULP_CBC_CMD(msg=False, logPath=tmp_path / f'run_{seed}.log'))
+    log = tmp_path / 'both.log'
+    log.write_text((tmp_path / 'run_0.log').read_text() + (tmp_path / 'run_1.log').read_text())
+
+    with open(log) as f:
+        records = cbc_log.parse_file(f)
+    assert records == cbc_log.parse_file(tmp_path / 'run_0.log') + cbc_log.parse_file(tmp_path / 'run_1.log')
+
+    output = tmp_path / 'runs.jsonl'
+    cbc_log.export_jsonl(records, output, instance='both')
+    cbc_log.export_jsonl(records[:1], output, instance='first')
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [line['instance'] for line in lines] == ['both', 'both', 'first']
+    assert [line['objective'] for line in lines] == [records[0]['objective'], records[1]['objective'],
+                                                     records[0]['objective']]
+    assert all('timestamp' in line for line in lines)
+
+
+def test_no_run():
+    assert cbc_log.parse_text('') == []
+
+
+def test_incumbent_lines():
+    text = cbc_log.RUN_START + '\n' + '\n'.join([
+        'Cbc0012I Integer solution of 31154 found by DiveCoefficient after 0 iterations and 0 nodes (0.00 seconds)',
+        'Cbc0016I Integer solution of 26222 found by strong branching after 605 iterations and 0 nodes (0.21 seconds)',
+        'Cbc0004I Integer solution of 26000 found after 700 iterations and 3 nodes (0.30 seconds)',
+    ])
+    incumbents = cbc_log.parse_text(text)[0]['incumbents']
+    assert [(i['objective'], i['heuristic'], i['nodes']) for i in incumbents] == [
+        (31154, 'DiveCoefficient', 0), (26222, 'strong branching', 0), (26000, None, 3)]
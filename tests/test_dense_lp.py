@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from pulp import LpStatus, value
+
+from common import backends, dense_lp
+from lp_cases import EDGE_CASES, build, edge_case, random_lp, solve_cbc
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_dense_lp_matches_cbc(seed):
+    rng = np.random.default_rng(seed)
+    lp = random_lp(rng, rng.integers(1, 6), rng.integers(1, 6))
+    result = dense_lp.solve(*lp[:6], maximize=lp[6])
+    status, objective = solve_cbc(*lp)
+
+    assert result['status'] == status
+    if status == 'Optimal':
+        assert result['objective'] == pytest.approx(objective, rel=1e-6, abs=1e-6)
+
+
+@pytest.mark.parametrize('c, A, b, senses, maximize, status', EDGE_CASES)
+def test_dense_lp_edge_cases(c, A, b, senses, maximize, status):
+    lp = edge_case(c, A, b, senses, maximize)
+    assert solve_cbc(*lp)[0] == status
+    assert dense_lp.solve(*lp[:6], maximize=maximize)['status'] == status
+
+
+def test_dense_lp_pulp_solver():
+    rng = np.random.default_rng(0)
+    lp = random_lp(rng, 4, 4)
+    while solve_cbc(*lp)[0] != 'Optimal':
+        lp = random_lp(rng, 4, 4)
+    prob = build(*lp)
+    prob.solve(dense_lp.DenseLP())
+    assert LpStatus[prob.status] == 'Optimal'
+    assert value(prob.objective) == pytest.approx(solve_cbc(*lp)[1], rel=1e-6, abs=1e-6)
+    assert prob.dense_result['status'] == 'Optimal'
+
+
+def test_dense_lp_options():
+    dense_lp.DenseLP(msg=False, logPath='ignored.log', warmStart=True)
+    with pytest.raises(TypeError, match='timelimit'):
+        dense_lp.DenseLP(timelimit=10)
+
+
+def test_dense_backend_is_opt_in(monkeypatch):
+    prob = build(*edge_case([40, 35], [[2, 4], [3, 2]], [50, 30], ['<=', '<='], True))
+    monkeypatch.delenv('PL_BACKEND', raising=False)
+    assert not isinstance(backends.get_solver(portfolio=False, problem=prob), dense_lp.DenseLP)
+    monkeypatch.setenv('PL_BACKEND', 'dense')
+    assert isinstance(backends.get_solver(portfolio=False, problem=prob), dense_lp.DenseLP)
+    prob.variables()[0].cat = 'Integer'
+    assert not isinstance(backends.get_solver(portfolio=False, problem=prob), dense_lp.DenseLP)
@@ -0,0 +1,25 @@
+import pytest
+from pulp import PULP_CBC_CMD, value
+
+import question3
+from formulations import FORMULATIONS, separate
+from instances import generate_instance
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_formulations_same_optimum(seed):
+    p, c, d, l = (x.tolist() for x in generate_instance(8, 6, seed=seed)[:4])
+    objectives = []
+    for formulation in FORMULATIONS:
+        if formulation == 'lazy':
+            prob = separate(p, c, d, l)[0]
+        else:
+            prob = question3.set_model(p, c, d, l, formulation=formulation)[0]
+        prob.solve(PULP_CBC_CMD(msg=False))
+        objectives.append(value(prob.objective))
+    assert objectives == pytest.approx([objectives[0]] * len(FORMULATIONS))
+
+
+def test_unknown_formulation():
+    with pytest.raises(ValueError, match='strog'):
+        question3.set_model(formulation='strog')
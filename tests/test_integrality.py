@@ -0,0 +1,65 @@
+import pytest
+from pulp import PULP_CBC_CMD, LpMinimize, LpProblem, LpVariable, lpSum, value
+
+import question3
+from common import integrality
+from instances import generate_instance
+
+
+def integer_problem(columns, rhs):
+    """min sum x subject to rows >= rhs; `columns` gives the rows and
+    coefficients of each integer variable x_k: [(row, coefficient)]."""
+    prob = LpProblem('block', LpMinimize)
+    x = [LpVariable(f'x_{k}', lowBound=0, cat='Integer') for k in range(len(columns))]
+    prob += lpSum(x)
+    for r, b in enumerate(rhs):
+        prob += lpSum(a * x[k] for k, column in enumerate(columns) for row, a in column if row == r) >= b, f'row_{r}'
+    return prob
+
+
+def test_transport_block_is_relaxed():
+    prob, E, c_ij = question3.set_model(*(x.tolist() for x in generate_instance(6, 4, seed=0)[:4]))
+    variables, reason = integrality.relaxable_variables(prob)
+    assert reason is None
+    assert {var.name for var in variables} == {var.name for row in c_ij for var in row}
+
+
+def test_network_matrix_is_relaxed():
+    # Edges of a bipartite graph: each column +1 in two rows of different sides
+    prob = integer_problem([[(0, 1), (2, 1)], [(0, 1), (3, 1)], [(1, 1), (2, 1)]], [1, 1, 1, 1])
+    assert len(integrality.relaxable_variables(prob)[0]) == 3
+
+
+@pytest.mark.parametrize('columns, reason', [
+    ([[(0, 2)], [(1, 1)]], None),  # x_0 has a coefficient 2: only x_1
+    ([[(0, 1), (1, 1)], [(1, 1), (2, 1)], [(0, 1), (2, 1)]], 'block rows cannot be split into two groups'),
+    ([[(0, 1), (1, 1), (2, 1)]], 'no totally unimodular block'),
+])
+def test_not_totally_unimodular(columns, reason):
+    prob = integer_problem(columns, [1, 1, 1])
+    variables, found = integrality.relaxable_variables(prob)
+    assert found == reason
+    if reason is None:
+        assert [var.name for var in variables] == ['x_1']
+
+
+def test_fractional_right_hand_side():
+    prob = integer_problem([[(0, 1)]], [0.5])
+    assert integrality.relaxable_variables(prob) == ([], 'no totally unimodular block')
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_same_optimum_as_the_mip(seed):
+    data = [x.tolist() for x in generate_instance(10, 8, seed=seed)[:4]]
+    relaxed, _, c_ij = question3.set_model(*data)
+    integrality.solve(relaxed, PULP_CBC_CMD(msg=False), mode='auto', cache_mode='off')
+    mip = question3.set_model(*data)[0]
+    integrality.solve(mip, PULP_CBC_CMD(msg=False), mode='off', cache_mode='off')
+
+    assert value(relaxed.objective) == pytest.approx(value(mip.objective))
+    assert relaxed.integrality['relaxed'] == len(data[0]) * len(data[2])
+    assert relaxed.integrality['integral'] and not relaxed.integrality['fallback']
+    assert all(var.varValue == round(var.varValue) for row in c_ij for var in row)
+    # The variables are integer again after the solve
+    assert all(var.cat == 'Integer' for row in c_ij for var in row)
+    assert mip.integrality['reason'] == 'disabled'
@@ -0,0 +1,65 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from pulp import PULP_CBC_CMD, value
+
+import lagrangian
+import question3
+from instances import default_instance, generate_instance, generate_instance_to, load_instance
+
+
+def cbc_optimum(p, c, d, l, C):
+    prob = question3.set_model(*(np.asarray(x).tolist() for x in (p, c, d, l)))[0]
+    prob.solve(PULP_CBC_CMD(msg=False))
+    return value(prob.objective)
+
+
+def check_solution(result, p, c, d, l, C):
+    E, trucks, lower_bound, upper_bound, history = result
+    cap, dem = np.asarray(c) // C, np.asarray(d) // C
+    assert (trucks >= 0).all()
+    assert (trucks.sum(axis=1) <= cap * E).all()
+    assert (trucks.sum(axis=0) >= dem).all()
+    assert np.asarray(p) @ E + (np.asarray(l) * trucks).sum() == pytest.approx(upper_bound)
+    # The bounds only improve
+    assert all(a[1] <= b[1] and a[2] >= b[2] for a, b in zip(history, history[1:]))
+
+
+@pytest.mark.parametrize('instance', [default_instance()] + [generate_instance(8, 6, seed=seed) for seed in range(4)])
+def test_bounds_around_the_optimum(instance):
+    result = lagrangian.solve(*instance, verbose=False)
+    check_solution(result, *instance)
+    optimum = cbc_optimum(*instance)
+    assert result[2] <= optimum + 1e-6 <= result[3] + 2e-6
+
+
+def test_memmap_instance(tmp_path):
+    generate_instance_to(tmp_path / 'instance', 40, 30, seed=3, chunk_rows=7)
+    instance = load_instance(tmp_path / 'instance')
+    assert isinstance(instance[3], np.memmap)
+    assert all((np.asarray(a) == b).all() for a, b in zip(instance[:4], generate_instance(40, 30, seed=3)[:4]))
+
+    result = lagrangian.solve(*instance, max_iter=50, verbose=False)
+    check_solution(result, *instance)
+    # Same run as on the arrays in memory
+    expected = lagrangian.solve(*generate_instance(40, 30, seed=3), max_iter=50, verbose=False)
+    assert result[2:4] == pytest.approx(expected[2:4])
+    assert (result[0] == expected[0]).all() and (result[1] == expected[1]).all()
+
+def test_blocks_in_parallel():
+    p, c, d, l, C = generate_instance(30, 10, seed=1)
+    cap, dem = c // C, d // C
+    u = np.random.default_rng(0).uniform(0, 200, size=len(d))
+    E, trucks, bound = lagrangian.solve_relaxation(p.astype(float), cap, dem, l, u)
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        E_blocks, trucks_blocks, bound_blocks = lagrangian.solve_relaxation(p.astype(float), cap, dem, l, u,
+                                                                            pool, block_size=4)
+    assert (E == E_blocks).all() and (trucks == trucks_blocks).all()
+    assert bound == pytest.approx(bound_blocks)
+
+
+def test_not_enough_capacity():
+    p, c, d, l, C = default_instance()
+    with pytest.raises(ValueError):
+        lagrangian.solve(p, np.asarray(c) // 10, d, l, C, verbose=False)
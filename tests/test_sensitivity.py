@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+from pulp import LpMaximize, LpProblem, LpVariable
+
+import exercice1
+import sensitivity
+from common import dense_lp
+
+
+@pytest.fixture
+def model():
+    prob = exercice1.set_model()[0]
+    prob.solve(dense_lp.DenseLP())
+    return sensitivity.analyse(prob)
+
+
+def resolve(model, b=None, c=None):
+    return dense_lp.solve(model['c'] if c is None else c, model['A'], model['b'] if b is None else b,
+                          model['senses'], model['lower'], model['upper'], maximize=model['maximize'])
+
+
+def test_report(model):
+    rows, columns = sensitivity.ranges(model)
+    assert model['constraints'] == ['Constraint_1', 'Constraint_2']
+    assert [row[1] for row in rows] == pytest.approx([3.125, 11.25])
+    assert [row[2] for row in rows] == pytest.approx([0, 0])
+    assert [column[1] for column in columns] == pytest.approx([2.5, 11.25])
+    assert rows[0][4:] == pytest.approx((20, 60))
+    assert columns[0][4:] == pytest.approx((17.5, 52.5))
+
+
+def test_analysis_after_another_solver():
+    prob = exercice1.set_model()[0]
+    assert getattr(prob, 'dense_result', None) is None
+    rows, _ = sensitivity.ranges(sensitivity.analyse(prob))
+    assert [row[1] for row in rows] == pytest.approx([3.125, 11.25])
+
+
+def test_rhs_ranges_match_solves(model):
+    objective = model['result']['objective']
+    for name, dual, _, rhs, lo, hi in sensitivity.ranges(model)[0]:
+        r = model['constraints'].index(name)
+        for target in (lo, (lo + rhs) / 2, (rhs + hi) / 2, hi):
+            b = model['b'].copy()
+            b[r] = target
+            assert resolve(model, b=b)['objective'] == pytest.approx(objective + dual * (target - rhs))
+        # Past the range, the dual changes
+        b = model['b'].copy()
+        b[r] = hi + 1
+        assert resolve(model, b=b)['objective'] < objective + dual * (hi + 1 - rhs) - 1e-6
+
+
+def test_cost_ranges_match_solves(model):
+    x = model['result']['x']
+    for j, (_, _, _, cost, lo, hi) in enumerate(sensitivity.ranges(model)[1]):
+        for target in ((lo + cost) / 2, (cost + hi) / 2):
+            c = model['c'].copy()
+            c[j] = target
+            assert resolve(model, c=c)['x'] == pytest.approx(x)
+        c = model['c'].copy()
+        c[j] = hi + 1
+        assert resolve(model, c=c)['x'] != pytest.approx(x)
+
+
+def test_parametric_matches_point_solves(model):
+    sweep = sensitivity.parametric(model, 0, 0.0, 100.0)
+    assert sweep['status'] == 'Optimal'
+    assert sweep['pieces'][0][0] == 0 and sweep['pieces'][-1][1] == 100
+    # Pieces are contiguous and the slopes decrease (concave in a maximisation)
+    assert all(a[1] == pytest.approx(b[0], abs=1e-3) for a, b in zip(sweep['pieces'], sweep['pieces'][1:]))
+    assert all(a[3] > b[3] for a, b in zip(sweep['pieces'], sweep['pieces'][1:]))
+    assert sweep['solves'] == len(sweep['pieces'])
+    for begin, end, value, slope in sweep['pieces']:
+        for at in np.linspace(begin, end, 4):
+            b = model['b'].copy()
+            b[0] = at
+            assert resolve(model, b=b)['objective'] == pytest.approx(value + slope * (at - begin), abs=1e-4)
+
+
+def test_parametric_starts_at_first_feasible():
+    prob = LpProblem('floor', LpMaximize)
+    x = LpVariable('x', lowBound=0, upBound=10)
+    prob += -x
+    prob += x >= 4, 'floor'
+    prob += x <= 8, 'ceiling'
+    model = sensitivity.analyse(prob)
+    row = model['constraints'].index('ceiling')
+
+    sweep = sensitivity.parametric(model, row, 0.0, 20.0)
+    assert sweep['pieces'][0][0] == pytest.approx(4)
+    assert sweep['pieces'][0][2] == pytest.approx(-4)
+    assert sweep['status'] == 'Optimal'
+    assert sensitivity._first_feasible(model, row, 0.0, 3.0) is None
@@ -0,0 +1,108 @@
+import pytest
+from pulp import LpMaximize, LpProblem, LpStatus, LpVariable, value
+
+from common import backends, dense_lp, solution_cache
+
+
+def product_mix(resource=50):
+    """Product-mix model of tp1/exercice1.py, the first resource given."""
+    prob = LpProblem('product_mix', LpMaximize)
+    a = LpVariable('A', lowBound=0)
+    b = LpVariable('B', lowBound=0)
+    prob += 40 * a + 35 * b
+    prob += 2 * a + 4 * b <= resource, 'resource_1'
+    prob += 3 * a + 2 * b <= 30, 'resource_2'
+    return prob
+
+
+@pytest.fixture
+def cache(tmp_path):
+    store = solution_cache.SolutionCache(tmp_path / 'solutions.sqlite')
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def solves(monkeypatch):
+    """Number of solver runs (cache misses)."""
+    calls = []
+    actual_solve = dense_lp.DenseLP.actualSolve
+
+    def counting(self, lp):
+        calls.append(lp.name)
+        return actual_solve(self, lp)
+
+    monkeypatch.setattr(dense_lp.DenseLP, 'actualSolve', counting)
+    return calls
+
+
+def cached_solve(prob, cache, mode='on'):
+    return solution_cache.solve(prob, dense_lp.DenseLP(), mode=mode, cache=cache)
+
+
+def test_miss_then_hit(cache, solves):
+    first = product_mix()
+    cached_solve(first, cache)
+    second = product_mix()
+    status = cached_solve(second, cache)
+
+    assert len(solves) == 1
+    assert LpStatus[status] == 'Optimal'
+    assert value(second.objective) == pytest.approx(value(first.objective))
+    assert {var.name: var.varValue for var in second.variables()} == \
+        {var.name: var.varValue for var in first.variables()}
+
+
+def test_model_change_is_a_miss(cache, solves):
+    cached_solve(product_mix(50), cache)
+    changed = product_mix(40)
+    cached_solve(changed, cache)
+
+    assert len(solves) == 2
+    expected = product_mix(40)
+    expected.solve(dense_lp.DenseLP())
+    assert value(changed.objective) == pytest.approx(value(expected.objective))
+
+
+def test_solver_options_change_the_key():
+    prob = product_mix()
+    assert (solution_cache.problem_key(prob, dense_lp.DenseLP(timeLimit=1))
+            != solution_cache.problem_key(prob, dense_lp.DenseLP(timeLimit=2)))
+    # Log and console options do not change the result
+    assert (solution_cache.problem_key(prob, dense_lp.DenseLP(msg=True))
+            == solution_cache.problem_key(prob, dense_lp.DenseLP(msg=False)))
+
+
+def test_portfolio_key_ignores_racer_logs():
+    prob = product_mix()
+    configs = [{'seed': 0}, {'seed': 1}]
+    first = backends.Portfolio(configs, 'cbc', msg=False, logPath='first.log', warmStart=True)
+    second = backends.Portfolio(configs, 'cbc', msg=True, logPath='second.log')
+    other = backends.Portfolio([{'seed': 2}], 'cbc', msg=False, logPath='first.log')
+    assert solution_cache.problem_key(prob, first) == solution_cache.problem_key(prob, second)
+    assert solution_cache.problem_key(prob, first) != solution_cache.problem_key(prob, other)
+
+
+def test_invalidate(cache, solves):
+    cached_solve(product_mix(), cache)
+    cache.invalidate(solution_cache.problem_key(product_mix(), dense_lp.DenseLP()))
+    cached_solve(product_mix(), cache)
+    cache.invalidate()
+    cached_solve(product_mix(), cache)
+    assert len(solves) == 3
+
+
+def test_refresh_and_off(cache, solves):
+    cached_solve(product_mix(), cache)
+    cached_solve(product_mix(), cache, mode='refresh')
+    cached_solve(product_mix(), cache, mode='off')
+    assert len(solves) == 3
+    cached_solve(product_mix(), cache)
+    assert len(solves) == 3
+
+
+def test_off_by_default(cache, solves, monkeypatch):
+    monkeypatch.delenv('PL_CACHE', raising=False)
+    cached_solve(product_mix(), cache, mode=None)
+    cached_solve(product_mix(), cache, mode=None)
+    assert len(solves) == 2
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from instances import generate_instance
+from transport import solve_transport, solve_with_cbc
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_same_cost_as_cbc(seed):
+    rng = np.random.default_rng(seed)
+    n, m = rng.integers(1, 10, size=2)
+    _, c, d, l, C = generate_instance(n, m, tightness=rng.uniform(0.8, 2.0), seed=seed)
+    cap, dem = c // C, d // C
+
+    status, cost, x, u, w = solve_transport(cap, dem, l)
+    status_cbc, cost_cbc = solve_with_cbc(cap, dem, l)
+
+    assert status == status_cbc
+    if status == 'Optimal':
+        assert cost == pytest.approx(cost_cbc, abs=1e-6)
+        assert (x.sum(axis=1) <= cap).all() and (x.sum(axis=0) >= dem).all()
+        assert (x * l).sum() == pytest.approx(cost)
+        # Duals: feasible and without duality gap
+        assert (u[None, :] - w[:, None] <= l + 1e-9).all()
+        assert dem @ u - cap @ w == pytest.approx(cost)
+
+
+def test_capacity_equal_to_demand():
+    cap = np.array([3, 2])
+    dem = np.array([1, 4])
+    l = np.array([[1.0, 5.0], [2.0, 1.0]])
+    status, cost, x, _, _ = solve_transport(cap, dem, l)
+    assert status == 'Optimal'
+    assert cost == solve_with_cbc(cap, dem, l)[1] == 1 * 1 + 5 * 2 + 1 * 2
+    assert x.tolist() == [[1, 2], [0, 2]]
+
+
+def test_infeasible():
+    status, cost, x, _, _ = solve_transport([1, 1], [3], np.ones((2, 1)))
+    assert status == 'Infeasible' and cost is None
+    assert not x.any()
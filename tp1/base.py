@@ -4,8 +4,12 @@
 """Structure of the code used to solve a linear programming problem with PuLP."""
 
 
+import sys
 from pathlib import Path  # built-in usefull Path class
-from pulp import PULP_CBC_CMD, LpMaximize, LpProblem, LpStatus, LpVariable, lpSum
+from pulp import LpMaximize, LpProblem, LpStatus, LpVariable, lpSum
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common import backends, instrumentation, solution_cache
 
 
 # ============================================================================ #
@@ -22,8 +26,9 @@ def set_model():
     # ------------------------------------------------------------------------ #
     # The variables
     # ------------------------------------------------------------------------ #
-    x_1 = LpVariable('x_1', lowBound=0)
-    x_2 = LpVariable('x_2', lowBound=0)
+    with instrumentation.phase('variables'):
+        x_1 = LpVariable('x_1', lowBound=0)
+        x_2 = LpVariable('x_2', lowBound=0)
 
     # List format: 
     # x = [LpVariable(f'x_{i}', lowBound=0) for i in range(2)]
@@ -31,7 +36,8 @@ def set_model():
     # ------------------------------------------------------------------------ #
     # The objective function
     # ------------------------------------------------------------------------ #
-    prob += x_1 + 3 * x_2, "Objective"
+    with instrumentation.phase('objective'):
+        prob += x_1 + 3 * x_2, "Objective"
 
     # List format: 
     # w = [1, 3]
@@ -40,8 +46,9 @@ def set_model():
     # ------------------------------------------------------------------------ #
     # The constraints
     # ------------------------------------------------------------------------ #
-    prob += x_1 + x_2 <= 2, "Constraint 1"
-    prob += x_2 <= 1, "Constraint 2"
+    with instrumentation.phase('constraints'):
+        prob += x_1 + x_2 <= 2, "Constraint 1"
+        prob += x_2 <= 1, "Constraint 2"
 
     # List format:
     # c_1 = [1, 1]
@@ -67,14 +74,22 @@ def solve():
     # ------------------------------------------------------------------------ #
     # Solve the problem using the model
     # ------------------------------------------------------------------------ #
-    prob, x_1, x_2 = set_model()
-    # After solving, a `.log` file is written.
-    prob.solve(PULP_CBC_CMD(msg=False, logPath=Path('./base.log')))
+    with instrumentation.phase('build'):
+        prob, x_1, x_2 = set_model()
+    # After solving, a `.log` file is written (unless the solution is cached or
+    # PL_BACKEND=dense selects the in-process dense simplex).
+    with instrumentation.phase('solve'):
+        solver = backends.get_solver(msg=False, logPath=Path('./base.log'), problem=prob)
+        solution_cache.solve(prob, instrumentation.instrument(prob, solver))
 
     # ------------------------------------------------------------------------ #
     # Print the solver output
     # ------------------------------------------------------------------------ #
-    print_log_output(prob, x_1, x_2)
+    with instrumentation.phase('report'):
+        print_log_output(prob, x_1, x_2)
+    # Once the report phase is closed, so that its time is printed
+    instrumentation.print_stats()
+    instrumentation.export(model='base')
 
 
 # ============================================================================ #
@@ -94,7 +109,6 @@ def print_log_output(prob, x_1, x_2):
     print(f'- (real) {prob.solutionTime}')
     print(f'- (CPU) {prob.solutionCpuTime}')
     print()
-
     print(f'Solve status: {LpStatus[prob.status]}')
     print(f'Objective value: {prob.objective.value()}')
 
@@ -4,8 +4,13 @@
 """Structure of the code used to solve a linear programming problem with PuLP."""
 
 
+import sys
 from pathlib import Path  # built-in usefull Path class
-from pulp import PULP_CBC_CMD, LpMaximize, LpProblem, LpStatus, LpVariable, lpSum
+from pulp import LpMaximize, LpProblem, LpStatus, LpVariable, lpSum
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common import backends, instrumentation, solution_cache
+from sensitivity import print_report
 
 
 # ============================================================================ #
@@ -22,8 +27,9 @@ def set_model():
     # ------------------------------------------------------------------------ #
     # The variables
     # ------------------------------------------------------------------------ #
-    A = LpVariable('A', lowBound=0)
-    B = LpVariable('B', lowBound=0)
+    with instrumentation.phase('variables'):
+        A = LpVariable('A', lowBound=0)
+        B = LpVariable('B', lowBound=0)
 
     # List format: 
     # x = [LpVariable(f'x_{i}', lowBound=0) for i in range(2)]
@@ -31,7 +37,8 @@ def set_model():
     # ------------------------------------------------------------------------ #
     # The objective function
     # ------------------------------------------------------------------------ #
-    prob += 40 * A + 35 * B, "Objective"
+    with instrumentation.phase('objective'):
+        prob += 40 * A + 35 * B, "Objective"
 
     # List format: 
     # w = [1, 3]
@@ -40,8 +47,9 @@ def set_model():
     # ------------------------------------------------------------------------ #
     # The constraints
     # ------------------------------------------------------------------------ #
-    prob += 2 * A + 4 * B <= 50, "Constraint 1"
-    prob += 3 * A + 2 * B <= 30, "Constraint 2"
+    with instrumentation.phase('constraints'):
+        prob += 2 * A + 4 * B <= 50, "Constraint 1"
+        prob += 3 * A + 2 * B <= 30, "Constraint 2"
 
     # List format:
     # c_1 = [1, 1]
@@ -67,14 +75,22 @@ def solve():
     # ------------------------------------------------------------------------ #
     # Solve the problem using the model
     # ------------------------------------------------------------------------ #
-    prob, A, B = set_model()
-    # After solving, a `.log` file is written.
-    prob.solve(PULP_CBC_CMD(msg=False, logPath=Path('./base.log')))
+    with instrumentation.phase('build'):
+        prob, A, B = set_model()
+    # After solving, a `.log` file is written (unless the solution is cached or
+    # PL_BACKEND=dense selects the in-process dense simplex).
+    with instrumentation.phase('solve'):
+        solver = backends.get_solver(msg=False, logPath=Path('./base.log'), problem=prob)
+        solution_cache.solve(prob, instrumentation.instrument(prob, solver))
 
     # ------------------------------------------------------------------------ #
     # Print the solver output
     # ------------------------------------------------------------------------ #
-    print_log_output(prob, A, B)
+    with instrumentation.phase('report'):
+        print_log_output(prob, A, B)
+    # Once the report phase is closed, so that its time is printed
+    instrumentation.print_stats()
+    instrumentation.export(model='exercice1')
 
 
 # ============================================================================ #
@@ -94,7 +110,6 @@ def print_log_output(prob, A, B):
     print(f'- (real) {prob.solutionTime}')
     print(f'- (CPU) {prob.solutionCpuTime}')
     print()
-
     print(f'Solve status: {LpStatus[prob.status]}')
     print(f'Objective value: {prob.objective.value()}')
 
@@ -106,6 +121,10 @@ def print_log_output(prob, A, B):
     print(f'{A.name}\t\t{A.varValue}')
     print(f'{B.name}\t\t{B.varValue}')
 
+    # Duals, slacks, reduced costs and ranges from the optimal basis
+    if LpStatus[prob.status] == 'Optimal':
+        print_report(prob)
+
 
 if __name__ == '__main__':
     solve()
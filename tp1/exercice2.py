@@ -4,8 +4,12 @@
 """Structure of the code used to solve a linear programming problem with PuLP."""
 
 
+import sys
 from pathlib import Path  # built-in usefull Path class
-from pulp import PULP_CBC_CMD, LpMaximize, LpMinimize, LpProblem, LpStatus, LpVariable, lpSum
+from pulp import LpMaximize, LpMinimize, LpProblem, LpStatus, LpVariable, lpSum
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common import backends, instrumentation, solution_cache
 
 
 # ============================================================================ #
@@ -22,10 +26,11 @@ def set_model():
     # ------------------------------------------------------------------------ #
     # The variables
     # ------------------------------------------------------------------------ #
-    x_1 = LpVariable('x_1', lowBound=0)
-    x_2 = LpVariable('x_2', lowBound=0)
-    x_3 = LpVariable('x_3', lowBound=0)
-    x_4 = LpVariable('x_4', lowBound=0)
+    with instrumentation.phase('variables'):
+        x_1 = LpVariable('x_1', lowBound=0)
+        x_2 = LpVariable('x_2', lowBound=0)
+        x_3 = LpVariable('x_3', lowBound=0)
+        x_4 = LpVariable('x_4', lowBound=0)
 
     # List format: 
     # x = [LpVariable(f'x_{i}', lowBound=0) for i in range(2)]
@@ -33,7 +38,8 @@ def set_model():
     # ------------------------------------------------------------------------ #
     # The objective function
     # ------------------------------------------------------------------------ #
-    prob += 4 * x_1 + 8 * x_2 + 6 * x_3 + 3 * x_4, "Objective"
+    with instrumentation.phase('objective'):
+        prob += 4 * x_1 + 8 * x_2 + 6 * x_3 + 3 * x_4, "Objective"
 
     # List format: 
     # w = [1, 3]
@@ -42,10 +48,11 @@ def set_model():
     # ------------------------------------------------------------------------ #
     # The constraints
     # ------------------------------------------------------------------------ #
-    prob += x_1 + x_2 == 25, "Constraint 1"
-    prob += x_3 + x_4 == 25, "Constraint 2"
-    prob +=  x_1 + x_3 <= 30, "Constraint 3"
-    prob +=  x_2 + x_4 <= 20, "Constraint 4"
+    with instrumentation.phase('constraints'):
+        prob += x_1 + x_2 == 25, "Constraint 1"
+        prob += x_3 + x_4 == 25, "Constraint 2"
+        prob +=  x_1 + x_3 <= 30, "Constraint 3"
+        prob +=  x_2 + x_4 <= 20, "Constraint 4"
 
     # List format:
     # c_1 = [1, 1]
@@ -71,14 +78,22 @@ def solve():
     # ------------------------------------------------------------------------ #
     # Solve the problem using the model
     # ------------------------------------------------------------------------ #
-    prob, x_1, x_2, x_3, x_4 = set_model()
-    # After solving, a `.log` file is written.
-    prob.solve(PULP_CBC_CMD(msg=False, logPath=Path('./base.log')))
+    with instrumentation.phase('build'):
+        prob, x_1, x_2, x_3, x_4 = set_model()
+    # After solving, a `.log` file is written (unless the solution is cached or
+    # PL_BACKEND=dense selects the in-process dense simplex).
+    with instrumentation.phase('solve'):
+        solver = backends.get_solver(msg=False, logPath=Path('./base.log'), problem=prob)
+        solution_cache.solve(prob, instrumentation.instrument(prob, solver))
 
     # ------------------------------------------------------------------------ #
     # Print the solver output
     # ------------------------------------------------------------------------ #
-    print_log_output(prob, x_1, x_2, x_3, x_4)
+    with instrumentation.phase('report'):
+        print_log_output(prob, x_1, x_2, x_3, x_4)
+    # Once the report phase is closed, so that its time is printed
+    instrumentation.print_stats()
+    instrumentation.export(model='exercice2')
 
 
 # ============================================================================ #
@@ -98,7 +113,6 @@ def print_log_output(prob, x_1, x_2, x_3, x_4):
     print(f'- (real) {prob.solutionTime}')
     print(f'- (CPU) {prob.solutionCpuTime}')
     print()
-
     print(f'Solve status: {LpStatus[prob.status]}')
     print(f'Objective value: {prob.objective.value()}')
 
@@ -0,0 +1,245 @@
+# -*- coding=utf-8 -*-
+
+
+"""Sensitivity analysis of the tp1 models from the optimal basis.
+
+After a solve, the optimal basis of the dense simplex (`common.dense_lp`)
+gives, without solving again:
+
+    - the duals, slacks and reduced costs;
+    - the range of each right-hand side over which the basis stays feasible
+      (the objective moves by dual * change inside it);
+    - the range of each objective coefficient over which the basis stays
+      optimal (the values do not move inside it).
+
+`parametric` traces the optimal value as one right-hand side sweeps an
+interval: the value is linear on each range of a basis, so the problem is
+only solved again past each breakpoint.
+
+Usage: python sensitivity.py --model exercice1 --row "Constraint 1" --start 0 --stop 100
+"""
+
+
+import argparse
+import importlib
+import sys
+from pathlib import Path  # built-in usefull Path class
+
+import numpy as np
+from pulp import LpMaximize
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common import dense_lp
+
+MODELS = ('base', 'exercice', 'exercice1', 'exercice2')
+
+
+# ============================================================================ #
+#                                    BASIS                                     #
+# ============================================================================ #
+def analyse(prob):
+    """Matrix form of `prob` and its optimal dense simplex result.
+
+    The result stored by `DenseLP` is used when there is one; otherwise (for
+    instance after a cached or CBC solve) the problem is solved once with
+    `dense_lp`.
+    """
+    variables, constraints, c, A, b, senses, lower, upper, constant = dense_lp.to_dense(prob)
+    model = {
+        'variables': [var.name for var in variables],
+        'constraints': [constraint.name for constraint in constraints],
+        'c': c, 'A': A, 'b': b, 'senses': senses, 'lower': lower, 'upper': upper,
+        'maximize': prob.sense == LpMaximize,
+        'constant': constant,
+    }
+    result = getattr(prob, 'dense_result', None)
+    if result is None or result['status'] != 'Optimal':
+        result = _solve(model, b)
+    model['result'] = result
+    return model
+
+
+def _solve(model, b):
+    return dense_lp.solve(model['c'], model['A'], b, model['senses'], model['lower'], model['upper'],
+                          maximize=model['maximize'])
+
+
+def _interval(base, direction, tolerance=1e-9):
+    """Interval of t such that base + t * direction >= 0."""
+    lo, hi = -np.inf, np.inf
+    positive, negative = direction > tolerance, direction < -tolerance
+    if positive.any():
+        lo = max(lo, float(np.max(-base[positive] / direction[positive])))
+    if negative.any():
+        hi = min(hi, float(np.min(-base[negative] / direction[negative])))
+    return lo, hi
+
+
+# ============================================================================ #
+#                                    RANGES                                    #
+# ============================================================================ #
+def rhs_range(result, row):
+    """Changes (lo, hi) of the right-hand side of `row` keeping the basis
+    feasible, or None when the row was found redundant."""
+    _, _, b_s, flip, _, _ = result['standard']
+    kept = result['kept_rows']
+    if row not in kept:
+        return None
+    B_inv = result['B_inv']
+    values = B_inv @ b_s[kept]
+    return _interval(values, flip[row] * B_inv[:, kept.index(row)])
+
+
+def cost_range(result, column, maximize):
+    """Changes (lo, hi) of the objective coefficient of `column` keeping the
+    basis optimal."""
+    c_s, A_s, _, _, T, _ = result['standard']
+    A_kept = A_s[result['kept_rows']]
+    basis, B_inv = result['basis'], result['B_inv']
+    nonbasic = np.setdiff1d(np.arange(len(c_s)), basis)
+
+    change = np.zeros(len(c_s))
+    change[:T.shape[1]] = (-1.0 if maximize else 1.0) * T[column]
+    reduced = c_s - (c_s[basis] @ B_inv) @ A_kept
+    direction = change - (change[basis] @ B_inv) @ A_kept
+    return _interval(reduced[nonbasic], direction[nonbasic])
+
+
+def ranges(model):
+    """Rows and columns of the sensitivity report.
+
+    Each row: (name, dual, slack, rhs, rhs low, rhs high); each column:
+    (name, value, reduced cost, cost, cost low, cost high).
+    """
+    result = model['result']
+    rows = []
+    for r, name in enumerate(model['constraints']):
+        interval = rhs_range(result, r) or (np.nan, np.nan)
+        rows.append((name, result['duals'][r] + 0.0, result['slacks'][r] + 0.0, model['b'][r],
+                     model['b'][r] + interval[0], model['b'][r] + interval[1]))
+    columns = []
+    for j, name in enumerate(model['variables']):
+        lo, hi = cost_range(result, j, model['maximize'])
+        columns.append((name, result['x'][j] + 0.0, result['dj'][j] + 0.0, model['c'][j],
+                        model['c'][j] + lo, model['c'][j] + hi))
+    return rows, columns
+
+
+# ============================================================================ #
+#                                  PARAMETRIC                                  #
+# ============================================================================ #
+def _first_feasible(model, row, start, stop):
+    """Smallest right-hand side of `row` in [start, stop] for which the
+    problem is feasible, or None: one LP where the right-hand side is a
+    variable t, minimised."""
+    m, n = model['A'].shape
+    A = np.hstack([model['A'], np.zeros((m, 1))])
+    A[row, n] = -1.0
+    b = model['b'].copy()
+    b[row] = 0.0
+    c = np.zeros(n + 1)
+    c[n] = 1.0
+    result = dense_lp.solve(c, A, b, model['senses'], np.append(model['lower'], start),
+                            np.append(model['upper'], stop))
+    return result['objective'] if result['status'] == 'Optimal' else None
+
+
+def parametric(model, row, start, stop):
+    """Optimal value as the right-hand side of `row` goes from `start` to
+    `stop` (start < stop).
+
+    Returns a dict: `start`, `pieces` [(from, to, value at from, slope)] on
+    which the optimal value is linear, `solves` and `status` ('Optimal', or the status
+    met past the last piece: 'Infeasible' or 'Unbounded'). When the
+    problem is infeasible at `start`, the sweep begins at the first feasible
+    right-hand side.
+    """
+    b = model['b'].copy()
+    step = 1e-6 * max(1.0, stop - start)
+    pieces, solves, status = [], 0, 'Optimal'
+    begin = at = start
+    while True:
+        b[row] = at
+        result = _solve(model, b)
+        solves += 1
+        if result['status'] == 'Infeasible' and at == start:
+            first = _first_feasible(model, row, start, stop)
+            solves += 1
+            if first is not None and first > start:
+                begin = at = first
+                continue
+        if result['status'] != 'Optimal':
+            status = result['status']
+            break
+        # Redundant row: no range, the next solve is one step further
+        interval = rhs_range(result, row)
+        slope = result['duals'][row] + 0.0
+        end = at if interval is None else min(at + interval[1], stop)
+        value = result['objective'] + model['constant'] + slope * (begin - at)
+        if pieces and abs(pieces[-1][3] - slope) <= 1e-9:
+            pieces[-1] = (pieces[-1][0], end, pieces[-1][2], slope)
+        else:
+            pieces.append((begin, end, value, slope))
+        if end >= stop:
+            break
+        begin, at = end, end + step
+    return {'start': start, 'pieces': pieces, 'solves': solves, 'status': status}
+
+
+# ============================================================================ #
+#                                   UTILITIES                                  #
+# ============================================================================ #
+def print_report(prob):
+    """Print the duals, slacks, reduced costs and ranges of `prob`."""
+    rows, columns = ranges(analyse(prob))
+    print()
+    print('-' * 40)
+    print('Sensitivity')
+    print('-' * 40)
+    print()
+    print('Constraints (dual, slack, right-hand side and its range):')
+    for name, dual, slack, rhs, lo, hi in rows:
+        print(f'- {name}: dual {dual:g}, slack {slack:g}, rhs {rhs:g} in [{lo:g}, {hi:g}]')
+    print()
+    print('Variables (value, reduced cost, objective coefficient and its range):')
+    for name, x, dj, cost, lo, hi in columns:
+        print(f'- {name}: value {x:g}, reduced cost {dj:g}, cost {cost:g} in [{lo:g}, {hi:g}]')
+
+
+def print_parametric(sweep, name):
+    """Print the pieces of a parametric sweep of the row `name`."""
+    print()
+    print('-' * 40)
+    print(f'Optimal value as the rhs of {name} varies')
+    print('-' * 40)
+    print()
+    if sweep['pieces'] and sweep['pieces'][0][0] > sweep['start']:
+        print(f'- [{sweep["start"]:g}, {sweep["pieces"][0][0]:g}[: Infeasible')
+    for begin, end, value, slope in sweep['pieces']:
+        print(f'- [{begin:g}, {end:g}]: {value:g} + {slope:g} * (rhs - {begin:g})')
+    if sweep['status'] != 'Optimal':
+        end = sweep['pieces'][-1][1] if sweep['pieces'] else None
+        print(f'- beyond {end:g}: {sweep["status"]}' if end is not None else f'- {sweep["status"]}')
+    print()
+    print(f'Solves: {sweep["solves"]}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Sensitivity analysis of a tp1 model.')
+    parser.add_argument('--model', choices=MODELS, default='exercice1')
+    parser.add_argument('--row', help='constraint whose right-hand side is swept')
+    parser.add_argument('--start', type=float, help='first value of the right-hand side')
+    parser.add_argument('--stop', type=float, help='last value of the right-hand side')
+    args = parser.parse_args()
+
+    prob = importlib.import_module(args.model).set_model()[0]
+    prob.solve(dense_lp.DenseLP())
+    print_report(prob)
+
+    if args.row is not None:
+        model = analyse(prob)
+        name = args.row.replace(' ', '_')
+        row = model['constraints'].index(name)
+        start = model['b'][row] if args.start is None else args.start
+        stop = 2 * start if args.stop is None else args.stop
+        print_parametric(parametric(model, row, start, stop), args.row)
@@ -0,0 +1,210 @@
+# -*- coding=utf-8 -*-
+
+
+"""Data-driven personnel planning model for any number of levels and years.
+
+The evolution matrix is sparse: `{(to, from): rate}` with only the nonzero
+transitions, the same keys as `EVOLUTION_MATRIX`. Levels are the keys of
+`initial_staff`; recruitment is allowed in the levels of `recruitment_costs`
+and, by default, a recruit only feeds the level it is recruited into.
+Every row is written directly as a coefficient dict, so the build time is
+proportional to the number of nonzeros.
+"""
+
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+from pulp import (LpAffineExpression, LpConstraint, LpConstraintEQ,
+                  LpConstraintGE, LpMinimize, LpProblem, LpStatus, LpVariable)
+
+from tp2 import (EVOLUTION_MATRIX, INITIAL_STAFF, LAYOFF_COSTS, NEEDS,
+                 RECRUITMENT_COSTS, SALARY_COSTS)
+from tp2 import set_model as set_model_3_levels
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common import backends, solve_config
+
+# Lignes alimentées par chaque recrutement dans `tp2.set_model` :
+# {(niveau alimenté, niveau recruté): coefficient}. R_i2 y apparaît aussi dans
+# la ligne de N1, seul moyen de tenir les besoins de N1 dans le cas de base.
+TP2_RECRUITMENT = {
+    (1, 2): 1,
+    (2, 2): 1,
+    (3, 3): 1,
+}
+
+
+# ============================================================================ #
+#                                     DATA                                     #
+# ============================================================================ #
+def generate_org(levels, years, seed=0):
+    """Return the data of a random org chart with `levels` grades.
+
+    Staff stays in its grade or is promoted one or two grades up; every grade
+    can be recruited into.
+    """
+    rng = random.Random(seed)
+    evolution = {}
+    for j in range(1, levels + 1):
+        evolution[(j, j)] = round(rng.uniform(0.75, 0.95), 2)
+        if j + 1 <= levels:
+            evolution[(j + 1, j)] = round(rng.uniform(0.02, 0.10), 2)
+        if j + 2 <= levels and rng.random() < 0.3:
+            evolution[(j + 2, j)] = 0.01
+
+    initial_staff = {j: rng.randint(50, 3000) for j in range(1, levels + 1)}
+    needs = {
+        (i, j): round(initial_staff[j] * rng.uniform(0.8, 1.2))
+        for i in range(1, years + 1) for j in range(1, levels + 1)
+    }
+    return {
+        'needs': needs,
+        'evolution': evolution,
+        'salary_costs': {j: rng.randint(40, 120) for j in range(1, levels + 1)},
+        'recruitment_costs': {j: rng.randint(5, 20) for j in range(1, levels + 1)},
+        'layoff_costs': {j: rng.randint(20, 60) for j in range(1, levels + 1)},
+        'initial_staff': initial_staff,
+    }
+
+
+# ============================================================================ #
+#                                  SET MODEL                                   #
+# ============================================================================ #
+def set_model(needs=NEEDS, evolution=EVOLUTION_MATRIX, salary_costs=SALARY_COSTS,
+              recruitment_costs=RECRUITMENT_COSTS, layoff_costs=LAYOFF_COSTS,
+              initial_staff=INITIAL_STAFF, recruitment=None, cat='Integer'):
+    """Minimisation problem for personnel planning.
+
+    `recruitment` maps `(fed level, recruited level)` to a coefficient; with
+    `TP2_RECRUITMENT` the model is the one of `tp2.set_model`. The initial
+    staff is a constant moved to the right-hand side of the first-year rows.
+    """
+    if recruitment is None:
+        recruitment = {(j, j): 1 for j in recruitment_costs}
+
+    levels = sorted(initial_staff)
+    years = sorted({i for i, _ in needs})
+    start = years[0] - 1
+
+    # Transitions entrantes de chaque niveau : {niveau: [(origine, taux), ...]}
+    incoming = {j: [] for j in levels}
+    for (to, origin), rate in evolution.items():
+        if rate:
+            incoming[to].append((origin, rate))
+    recruits = {j: [] for j in levels}
+    for (to, recruited), coefficient in recruitment.items():
+        recruits[to].append((recruited, coefficient))
+
+    prob = LpProblem(name='personnel_planning', sense=LpMinimize)
+
+    # ------------------------------------------------------------------------ #
+    # The variables
+    # ------------------------------------------------------------------------ #
+    R = {(i, j): LpVariable(f'R_{i}_{j}', lowBound=0, cat=cat)
+         for i in years for j in levels if j in recruitment_costs}
+    L = {(i, j): LpVariable(f'L_{i}_{j}', lowBound=0, cat=cat) for i in years for j in levels}
+    S = {(i, j): LpVariable(f'S_{i}_{j}', lowBound=0, cat=cat) for i in years for j in levels}
+
+    # ------------------------------------------------------------------------ #
+    # The objective function
+    # ------------------------------------------------------------------------ #
+    objective = {}
+    for (i, j), var in S.items():
+        objective[var] = salary_costs[j]
+    for (i, j), var in R.items():
+        objective[var] = recruitment_costs[j]
+    for (i, j), var in L.items():
+        objective[var] = layoff_costs[j]
+    prob.setObjective(LpAffineExpression(objective, name='Total_Cost'))
+
+    # ------------------------------------------------------------------------ #
+    # The constraints
+    # ------------------------------------------------------------------------ #
+    # Évolution : S_ij - somme_k taux_jk * S_(i-1)k - R_ij + L_ij = 0, les
+    # effectifs initiaux passant au second membre
+    for i in years:
+        for j in levels:
+            row = {S[i, j]: 1, L[i, j]: 1}
+            for recruited, coefficient in recruits[j]:
+                row[R[i, recruited]] = -coefficient
+            rhs = 0
+            for origin, rate in incoming[j]:
+                if i == start + 1:
+                    rhs += rate * initial_staff[origin]
+                else:
+                    row[S[i - 1, origin]] = row.get(S[i - 1, origin], 0) - rate
+            prob.addConstraint(LpConstraint(LpAffineExpression(row), LpConstraintEQ, f'Evolution_{i}_{j}', rhs))
+
+    # Besoins en effectifs
+    for (i, j), need in needs.items():
+        prob.addConstraint(LpConstraint(LpAffineExpression({S[i, j]: 1}), LpConstraintGE, f'Besoin_{i}_{j}', need))
+
+    return prob, R, L, S
+
+
+# ============================================================================ #
+#                                  BENCHMARK                                   #
+# ============================================================================ #
+def benchmark(sizes, seed=0, log_path=Path('./generic_model.log')):
+    """Build and solve (as LPs) random org charts of `(levels, years)` sizes."""
+    rows = []
+    for levels, years in sizes:
+        data = generate_org(levels, years, seed=seed)
+        start = time.perf_counter()
+        prob, _, _, _ = set_model(**data, cat='Continuous')
+        built = time.perf_counter()
+        prob.solve(backends.get_solver(msg=False, logPath=log_path))
+        solved = time.perf_counter()
+
+        rows.append({
+            'levels': levels,
+            'years': years,
+            'variables': prob.numVariables(),
+            'constraints': prob.numConstraints(),
+            'nonzeros': sum(len(constraint) for constraint in prob.constraints()),
+            'status': LpStatus[prob.status],
+            'build_time': built - start,
+            'solve_time': solved - built,
+        })
+    print_table(rows)
+    return rows
+
+
+def compare_builders(years=30, repeat=20):
+    """Build time of `tp2.set_model` and of this builder on the three-level data."""
+    needs = {(i, j): NEEDS[(1 + (i - 1) % 3, j)] for i in range(1, years + 1) for j in range(1, 4)}
+    builders = (
+        ('tp2.set_model', set_model_3_levels, {}),
+        ('generic_model.set_model', set_model, {'recruitment': TP2_RECRUITMENT}),
+    )
+    for name, builder, options in builders:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            builder(needs=needs, **options)
+        print(f'{name}: {1000 * (time.perf_counter() - start) / repeat:.2f} ms per build ({years} years)')
+
+
+# ============================================================================ #
+#                                   UTILITIES                                  #
+# ============================================================================ #
+def print_table(rows):
+    """Print the benchmark results."""
+    columns = list(rows[0])
+    print('\t'.join(columns))
+    for row in rows:
+        print('\t'.join(f'{row[key]:.4f}' if isinstance(row[key], float) else str(row[key]) for key in columns))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seed', type=int, default=0, help='seed of the generated org charts')
+    solve_config.add_arguments(parser)
+    args = parser.parse_args()
+
+    compare_builders()
+    print()
+    benchmark([(3, 3), (10, 10), (20, 20), (50, 30), (100, 40)], seed=args.seed)
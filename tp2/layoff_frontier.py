@@ -0,0 +1,240 @@
+# -*- coding=utf-8 -*-
+
+
+"""Frontière coût / plafond de licenciements (Q5b).
+
+La question Q5a ajoute la contrainte somme_ij L_ij <= L au modèle de la
+question 2 ; la frontière donne le coût optimal en fonction de L, de 0 au
+nombre de licenciements de la solution sans plafond.
+
+Un seul modèle est construit : seul le second membre de la ligne du plafond
+change d'une résolution à l'autre, et chaque résolution part de la solution
+d'un plafond plus petit (réalisable pour le nouveau plafond, MIP start).
+
+- Modèle continu (par défaut) : le coût est convexe et linéaire par morceaux
+  en L. Le dual de la ligne du plafond donne une tangente en chaque point ;
+  l'intervalle [a, b] est coupé à l'intersection des tangentes de a et b.
+  Si le coût y vaut la tangente (points alignés), le coût est linéaire sur
+  [a, x] et [x, b] et x est un point de rupture ; sinon les deux moitiés
+  sont traitées à leur tour.
+- Modèle entier (--integer) : bisection sur les plafonds entiers. Le plan
+  est le même sur [a, b] quand le plan de b licencie au plus a personnes ou
+  quand les coûts de a et b sont égaux ; sinon [a, b] est coupé au milieu.
+  Chaque plafond entier peut être un point de rupture : c'est exact, mais
+  coûteux quand le coût diminue à chaque licenciement autorisé.
+
+--compare résout aussi le modèle une fois par plafond entier, comme des
+appels successifs à `solve()`, pour comparer les temps.
+"""
+
+
+import argparse
+import sys
+import time
+from pathlib import Path  # built-in usefull Path class
+from pulp import LpSolutionIntegerFeasible, LpSolutionOptimal, LpStatus, lpSum, value
+
+from tp2 import set_model
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common import backends, solve_config
+
+CAP_NAME = 'Plafond_licenciements'
+# Second membre d'un plafond inactif
+NO_CAP = 10**7
+TOLERANCE = 1e-6
+# Écart relatif de deux pentes distinctes (valeurs relues du fichier de CBC)
+SLOPE_TOLERANCE = 1e-4
+
+
+# ============================================================================ #
+#                                    MODÈLE                                    #
+# ============================================================================ #
+class CapModel:
+    """Modèle de la question 2 avec la ligne du plafond, gardé entre les
+    résolutions."""
+
+    def __init__(self, cat='Continuous', log_path=Path('./layoff_frontier.log')):
+        self.prob, self.R, self.L, self.S = set_model(cat=cat)
+        self.cap_row = lpSum(self.L.values()) <= NO_CAP
+        self.prob += self.cap_row, CAP_NAME
+        self.variables = [*self.R.values(), *self.L.values(),
+                          *(var for (i, _), var in self.S.items() if i in self.years)]
+        self.log_path = log_path
+        self.solves = 0
+
+    @property
+    def years(self):
+        return sorted({i for i, _ in self.R})
+
+    def solve(self, cap, start=None):
+        """Résoudre pour le plafond `cap`, à partir du point `start`.
+
+        Retourne un point : plafond, statut, solution trouvée (éventuellement
+        non prouvée optimale, limite de temps), coût, pente (dual du plafond),
+        licenciements utilisés, plan {nom: valeur} et temps de résolution.
+        """
+        self.cap_row.constant = -cap
+        if start is not None:
+            for var in self.variables:
+                var.setInitialValue(start['plan'][var.name])
+
+        begin = time.perf_counter()
+        solver = backends.get_solver(msg=False, logPath=self.log_path, warmStart=start is not None)
+        self.prob.solve(solver)
+        self.solves += 1
+        return {
+            'cap': cap,
+            'status': LpStatus[self.prob.status],
+            'feasible': self.prob.sol_status in (LpSolutionOptimal, LpSolutionIntegerFeasible),
+            'cost': value(self.prob.objective),
+            'slope': self.cap_row.pi or 0.0,
+            'used': sum(var.varValue or 0.0 for var in self.L.values()),
+            'plan': {var.name: var.varValue or 0.0 for var in self.variables},
+            'time': time.perf_counter() - begin,
+        }
+
+
+# ============================================================================ #
+#                                   FRONTIÈRE                                  #
+# ============================================================================ #
+def _line(a, cap):
+    """Valeur en `cap` de la tangente au point `a`."""
+    return a['cost'] + a['slope'] * (cap - a['cap'])
+
+
+def _continuous(model, a, b, points):
+    """Points de rupture du coût (convexe) entre les points a et b."""
+    scale = TOLERANCE * max(1.0, abs(a['cost']))
+    if abs(b['cost'] - _line(a, b['cap'])) <= scale or abs(a['slope'] - b['slope']) <= TOLERANCE:
+        return
+    # Intersection des tangentes en a et b
+    cap = (b['cost'] - a['cost'] + a['slope'] * a['cap'] - b['slope'] * b['cap']) / (a['slope'] - b['slope'])
+    if not a['cap'] + TOLERANCE < cap < b['cap'] - TOLERANCE:
+        return
+    point = model.solve(cap, start=a)
+    points.append(point)
+    if not point['feasible'] or abs(point['cost'] - _line(a, cap)) <= scale:
+        return
+    _continuous(model, a, point, points)
+    _continuous(model, point, b, points)
+
+
+def _integer(model, a, b, points):
+    """Plafonds entiers où le plan change entre les points a et b."""
+    if (b['cap'] - a['cap'] <= 1 or b['used'] <= a['cap'] + TOLERANCE
+            or abs(a['cost'] - b['cost']) <= TOLERANCE * max(1.0, abs(a['cost']))):
+        return
+    point = model.solve((a['cap'] + b['cap']) // 2, start=a)
+    points.append(point)
+    if not point['feasible']:
+        return
+    _integer(model, a, point, points)
+    _integer(model, point, b, points)
+
+
+def frontier(model, integer=False, low=0):
+    """Points résolus de la frontière, triés par plafond, et points de rupture.
+
+    Les plafonds vont de `low` aux licenciements de la solution sans
+    plafond, dont le coût vaut pour tout plafond plus grand.
+    """
+    free = model.solve(NO_CAP)
+    if not free['feasible']:
+        return [free], []
+    high = round(free['used']) if integer else free['used']
+    top = model.solve(high)
+    bottom = model.solve(low)
+    points = [bottom, top]
+    if bottom['feasible'] and top['feasible'] and low < high:
+        (_integer if integer else _continuous)(model, bottom, top, points)
+    points.sort(key=lambda point: point['cap'])
+    return points, breakpoints(points, integer)
+
+
+def breakpoints(points, integer=False):
+    """Points où la pente (continu) ou le plan (entier) change."""
+    points = [point for point in points if point['feasible']]
+    found = points[:1]
+    for previous, point, following in zip(points, points[1:], points[2:] + [None]):
+        if integer:
+            changed = any(abs(point['plan'][name] - previous['plan'][name]) > TOLERANCE for name in point['plan'])
+        elif following is None:
+            changed = True
+        else:
+            left = (point['cost'] - previous['cost']) / (point['cap'] - previous['cap'])
+            right = (following['cost'] - point['cost']) / (following['cap'] - point['cap'])
+            changed = abs(left - right) > SLOPE_TOLERANCE * max(1.0, abs(left))
+        if changed:
+            found.append(point)
+    return found
+
+
+def one_solve_per_cap(low, high, cat='Continuous', log_path=Path('./layoff_frontier_naive.log')):
+    """Référence : un modèle construit et résolu par plafond entier de `low` à `high`."""
+    costs = []
+    for cap in range(int(low), int(high) + 1):
+        prob, R, L, S = set_model(cat=cat)
+        prob += lpSum(L.values()) <= cap, CAP_NAME
+        prob.solve(backends.get_solver(msg=False, logPath=log_path))
+        costs.append(value(prob.objective))
+    return costs
+
+
+# ============================================================================ #
+#                                   UTILITIES                                  #
+# ============================================================================ #
+def print_frontier(points, found, solves, elapsed):
+    """Afficher la frontière et les plans aux points de rupture."""
+    print()
+    print('-' * 40)
+    print('Frontière coût / plafond de licenciements')
+    print('-' * 40)
+    print()
+    print(f'Résolutions: {solves} ({elapsed:.3f} s)')
+    print()
+    breaks = {id(point) for point in found}
+    print(f"{'plafond':>10} {'coût':>14} {'licenciés':>10} {'pente':>10}  statut")
+    for point in points:
+        mark = '*' if id(point) in breaks else ' '
+        cost = f"{point['cost']:14.2f}" if point['cost'] is not None else f"{'-':>14}"
+        print(f"{point['cap']:10.2f} {cost} {point['used']:10.2f} {point['slope']:10.3f}  "
+              f"{point['status']} {mark}")
+    print('(* point de rupture ; au-delà du dernier plafond le coût ne change plus)')
+
+    print()
+    print('-' * 40)
+    print('Plans aux points de rupture')
+    print('-' * 40)
+    for point in found:
+        print()
+        print(f"Plafond {point['cap']:.2f} : coût {point['cost']:.2f}, {point['used']:.2f} licenciements")
+        for prefix, title in (('R_', 'Recrutements'), ('L_', 'Licenciements'), ('S_', 'Effectifs')):
+            values = ', '.join(f'{name}={val:g}' for name, val in point['plan'].items()
+                               if name.startswith(prefix) and abs(val) > TOLERANCE)
+            print(f'- {title}: {values or "aucun"}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Frontière coût / plafond de licenciements (Q5b).')
+    parser.add_argument('--integer', action='store_true', help='effectifs entiers (bisection sur les plafonds entiers)')
+    parser.add_argument('--low', type=float, default=0, help='plus petit plafond (défaut 0)')
+    parser.add_argument('--compare', action='store_true', help='comparer à une résolution par plafond entier')
+    solve_config.add_arguments(parser)
+    args = parser.parse_args()
+
+    cat = 'Integer' if args.integer else 'Continuous'
+    start = time.perf_counter()
+    model = CapModel(cat=cat)
+    points, found = frontier(model, integer=args.integer, low=args.low)
+    elapsed = time.perf_counter() - start
+    print_frontier(points, found, model.solves, elapsed)
+
+    if args.compare:
+        high = points[-1]['cap']
+        start = time.perf_counter()
+        costs = one_solve_per_cap(args.low, high, cat=cat)
+        naive = time.perf_counter() - start
+        print()
+        print(f'Une résolution par plafond entier: {len(costs)} résolutions ({naive:.3f} s), '
+              f'frontière: {model.solves} résolutions ({elapsed:.3f} s)')
@@ -0,0 +1,194 @@
+# -*- coding=utf-8 -*-
+
+
+"""Rolling-horizon resolution of long personnel planning horizons.
+
+The horizon is cut into windows of `window` years. Each window is solved
+with `set_model`, the decisions of its first `step` years are fixed, and the
+headcounts of the last fixed year become the initial staff of the next
+window, the same way `S[0, j]` is seeded in the base model.
+"""
+
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+from pulp import LpSolutionOptimal, LpStatus
+
+from tp2 import (EVOLUTION_MATRIX, INITIAL_STAFF, LAYOFF_COSTS, NEEDS,
+                 RECRUITMENT_COSTS, SALARY_COSTS, set_model)
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common import backends, solve_config
+
+
+# ============================================================================ #
+#                                     DATA                                     #
+# ============================================================================ #
+def generate_needs(years, seed=0, drift=0.1):
+    """Return a needs table over `years` years.
+
+    Each level starts from the first-year needs of the base case and drifts
+    by at most `drift` (relative) from one year to the next.
+    """
+    rng = random.Random(seed)
+    needs = {}
+    for j in range(1, 4):
+        level = NEEDS[(1, j)]
+        for i in range(1, years + 1):
+            needs[(i, j)] = round(level)
+            level *= 1 + rng.uniform(-drift, drift)
+    return needs
+
+
+# ============================================================================ #
+#                               SOLVE WITH DATA                                #
+# ============================================================================ #
+def plan_cost(R, L, S, salary_costs=SALARY_COSTS, recruitment_costs=RECRUITMENT_COSTS,
+              layoff_costs=LAYOFF_COSTS):
+    """Total cost of fixed decisions given as `{(year, level): value}` dicts."""
+    return (sum(salary_costs[j] * value for (_, j), value in S.items())
+            + sum(recruitment_costs[j] * value for (_, j), value in R.items())
+            + sum(layoff_costs[j] * value for (_, j), value in L.items()))
+
+
+def solve_rolling(needs, window, step, evolution_matrix=EVOLUTION_MATRIX,
+                  salary_costs=SALARY_COSTS, recruitment_costs=RECRUITMENT_COSTS,
+                  layoff_costs=LAYOFF_COSTS, initial_staff=INITIAL_STAFF, cat='Integer',
+                  time_limit=None, log_path=Path('./rolling_horizon.log')):
+    """Solve the planning problem window by window.
+
+    The last window keeps all its years and `time_limit` applies to each
+    window (its best integer solution is kept). Returns a dict with the
+    status, the cost of the fixed decisions, the total solve time, one
+    `(first year, last year, solve time)` entry per window and the fixed R, L
+    and S values.
+    """
+    if not 1 <= step <= window:
+        raise ValueError(f'Pas {step} incompatible avec une fenêtre de {window} ans')
+
+    years = sorted({i for i, _ in needs})
+    staff = dict(initial_staff)
+    R_fixed, L_fixed, S_fixed = {}, {}, {}
+    windows = []
+    status = 'Optimal'
+
+    position = 0
+    while position < len(years):
+        current = years[position:position + window]
+        last_window = position + window >= len(years)
+        fixed = current if last_window else current[:step]
+
+        prob, R, L, S = set_model(
+            needs={key: need for key, need in needs.items() if key[0] in current},
+            evolution_matrix=evolution_matrix, salary_costs=salary_costs,
+            recruitment_costs=recruitment_costs, layoff_costs=layoff_costs,
+            initial_staff=staff, cat=cat,
+        )
+        start = time.perf_counter()
+        prob.solve(backends.get_solver(msg=False, logPath=log_path, timeLimit=time_limit))
+        windows.append((current[0], current[-1], time.perf_counter() - start))
+
+        # Une fenêtre sans solution arrête le plan (effectifs reportés non
+        # compatibles avec les taux d'évolution, par exemple)
+        if LpStatus[prob.status] != 'Optimal':
+            status = LpStatus[prob.status]
+            break
+
+        # Décisions des premières années fixées
+        for i in fixed:
+            R_fixed.update({key: var.varValue for key, var in R.items() if key[0] == i})
+            L_fixed.update({key: var.varValue for key, var in L.items() if key[0] == i})
+            S_fixed.update({key: var.varValue for key, var in S.items() if key[0] == i})
+
+        # Effectifs reportés comme effectifs initiaux de la fenêtre suivante
+        staff = {j: S[fixed[-1], j].varValue for j in initial_staff}
+        position += len(fixed)
+
+    return {
+        'status': status,
+        'objective': plan_cost(R_fixed, L_fixed, S_fixed, salary_costs,
+                               recruitment_costs, layoff_costs),
+        'solve_time': sum(elapsed for *_, elapsed in windows),
+        'windows': windows,
+        'R': R_fixed,
+        'L': L_fixed,
+        'S': S_fixed,
+    }
+
+
+def solve_full(needs, time_limit=None, log_path=Path('./rolling_horizon_full.log'), **data):
+    """Solve the monolithic model over the whole horizon.
+
+    Returns the status, the objective (None unless proven optimal within
+    `time_limit` seconds) and the solve time.
+    """
+    prob, _, _, _ = set_model(needs=needs, **data)
+    start = time.perf_counter()
+    prob.solve(backends.get_solver(msg=False, logPath=log_path, timeLimit=time_limit))
+    elapsed = time.perf_counter() - start
+
+    proven = LpStatus[prob.status] == 'Optimal' and prob.sol_status == LpSolutionOptimal
+    return LpStatus[prob.status], prob.objective.value() if proven else None, elapsed
+
+
+def compare(needs, configurations, time_limit=60, cat='Integer'):
+    """Compare rolling-horizon runs `[(window, step), ...]` with the full model."""
+    status, full_objective, full_time = solve_full(needs, time_limit=time_limit, cat=cat)
+    rows = []
+    for window, step in configurations:
+        result = solve_rolling(needs, window, step, cat=cat, time_limit=time_limit)
+        gap = None
+        if full_objective is not None and result['status'] == 'Optimal':
+            gap = (result['objective'] - full_objective) / full_objective
+        rows.append({'window': window, 'step': step, 'status': result['status'],
+                     'objective': result['objective'], 'solve_time': result['solve_time'],
+                     'windows': len(result['windows']), 'gap': gap})
+    print_log_output(status, full_objective, full_time, rows)
+    return rows
+
+
+# ============================================================================ #
+#                                   UTILITIES                                  #
+# ============================================================================ #
+def print_log_output(status, full_objective, full_time, rows):
+    """Print the full model result and one line per rolling-horizon run."""
+    print()
+    print('-' * 40)
+    print('Full model')
+    print('-' * 40)
+    print()
+    print(f'Solve status: {status}')
+    print(f'Objective value: {full_objective if full_objective is not None else "not proven optimal"}')
+    print(f'Solve time: {full_time:.3f} s')
+
+    print()
+    print('-' * 40)
+    print('Rolling horizon')
+    print('-' * 40)
+    print()
+    print(f'{"window":>6}  {"step":>4}  {"status":>10}  {"objective":>12}  {"windows":>7}  {"time (s)":>9}  {"gap":>8}')
+    for row in rows:
+        gap = f'{100 * row["gap"]:.3f} %' if row['gap'] is not None else '-'
+        print(f'{row["window"]:>6}  {row["step"]:>4}  {row["status"]:>10}  {row["objective"]:>12.0f}  '
+              f'{row["windows"]:>7}  {row["solve_time"]:>9.3f}  {gap:>8}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--years', type=int, default=30, help='planning horizon')
+    parser.add_argument('--window', type=int, nargs='+', default=[3, 5, 8], help='window lengths')
+    parser.add_argument('--step', type=int, default=1, help='years fixed per window')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the generated needs')
+    parser.add_argument('--time-limit', type=float, default=60, help='time limit per model (s)')
+    parser.add_argument('--integer', action='store_true',
+                        help='integer headcounts (hard for CBC beyond a few years)')
+    solve_config.add_arguments(parser)
+    args = parser.parse_args()
+
+    compare(generate_needs(args.years, seed=args.seed),
+            [(window, args.step) for window in args.window],
+            time_limit=args.time_limit, cat='Integer' if args.integer else 'Continuous')
@@ -0,0 +1,148 @@
+# -*- coding=utf-8 -*-
+
+
+"""Parallel scenario sweep for the personnel planning problem."""
+
+
+import argparse
+import csv
+import itertools
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from pulp import LpStatus
+
+from tp2 import (EVOLUTION_MATRIX, INITIAL_STAFF, LAYOFF_COSTS, NEEDS,
+                 RECRUITMENT_COSTS, SALARY_COSTS, set_model)
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common import backends, solve_config
+
+
+# Paramètres de `set_model` pouvant être modifiés par un scénario
+PARAMETERS = {
+    'needs': NEEDS,
+    'evolution_matrix': EVOLUTION_MATRIX,
+    'salary_costs': SALARY_COSTS,
+    'recruitment_costs': RECRUITMENT_COSTS,
+    'layoff_costs': LAYOFF_COSTS,
+    'initial_staff': INITIAL_STAFF,
+}
+
+
+# ============================================================================ #
+#                                  SCENARIOS                                   #
+# ============================================================================ #
+def apply_overrides(overrides):
+    """Return the `set_model` arguments of a scenario.
+
+    A key is either a parameter name (the whole dict is replaced) or a
+    `(parameter, entry)` pair, e.g. `('evolution_matrix', (3, 3))`.
+    """
+    data = {name: dict(values) for name, values in PARAMETERS.items()}
+    for key, value in overrides.items():
+        if isinstance(key, tuple):
+            name, entry = key
+            data[name][entry] = value
+        else:
+            data[key] = dict(value)
+    return data
+
+
+def expand_grid(grid):
+    """Return the cartesian product of a `{key: [values]}` grid as scenarios."""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*grid.values())]
+
+
+def label(key):
+    """Column name of an override key in the result table."""
+    if isinstance(key, tuple):
+        name, entry = key
+        entry = ','.join(map(str, entry)) if isinstance(entry, tuple) else entry
+        return f'{name}[{entry}]'
+    return key
+
+
+# ============================================================================ #
+#                                    SWEEP                                     #
+# ============================================================================ #
+def run_scenario(index, overrides, log_dir):
+    """Build and solve one scenario, with its own CBC log file."""
+    start = time.perf_counter()
+    prob, R, L, S = set_model(**apply_overrides(overrides))
+    built = time.perf_counter()
+
+    log_path = Path(log_dir) / f'scenario_{index}.log'
+    prob.solve(backends.get_solver(msg=False, logPath=log_path))
+    solved = time.perf_counter()
+
+    row = {'scenario': index}
+    row.update({label(key): value for key, value in overrides.items()})
+    row.update({
+        'status': LpStatus[prob.status],
+        'objective': prob.objective.value(),
+        'total_layoffs': sum(var.varValue or 0 for var in L.values()),
+        'build_time': built - start,
+        'solve_time': solved - built,
+        'solver_time': prob.solutionTime,
+        'log_path': str(log_path),
+    })
+    return row
+
+
+def sweep(scenarios, workers=None, log_dir=Path('./sweep_logs')):
+    """Solve every scenario across a pool of `workers` processes.
+
+    Returns one row per scenario, in the order of `scenarios`.
+    """
+    Path(log_dir).mkdir(parents=True, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(run_scenario, index, overrides, log_dir)
+            for index, overrides in enumerate(scenarios)
+        ]
+        return [future.result() for future in futures]
+
+
+# ============================================================================ #
+#                                   UTILITIES                                  #
+# ============================================================================ #
+def write_table(rows, path):
+    """Write the sweep results to a CSV file."""
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def print_table(rows):
+    """Print the sweep results."""
+    columns = [key for key in dict.fromkeys(k for row in rows for k in row) if key != 'log_path']
+    print('\t'.join(columns))
+    for row in rows:
+        print('\t'.join(
+            f'{row.get(key):.4f}' if isinstance(row.get(key), float) else str(row.get(key, ''))
+            for key in columns
+        ))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes')
+    parser.add_argument('--log-dir', type=Path, default=Path('./sweep_logs'))
+    parser.add_argument('--output', type=Path, default=Path('./sweep.csv'))
+    solve_config.add_arguments(parser)
+    args = parser.parse_args()
+
+    # Exemple : taux de maintien en N3 et coût de licenciement en N3
+    grid = {
+        ('evolution_matrix', (3, 3)): [0.70, 0.75, 0.80, 0.85],
+        ('layoff_costs', 3): [15, 25, 35],
+    }
+    rows = sweep(expand_grid(grid), workers=args.workers, log_dir=args.log_dir)
+    write_table(rows, args.output)
+    print_table(rows)
@@ -41,18 +41,89 @@ Q5b :
 """Structure of the code used to solve a linear programming problem with """
 
 
+import sys
 from pathlib import Path  # built-in usefull Path class
-from pulp import PULP_CBC_CMD, LpMinimize, LpProblem, LpStatus, LpVariable, lpSum
+from pulp import LpMinimize, LpProblem, LpStatus, LpVariable, lpSum
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common import backends, instrumentation, integrality, solution_export
+
+
+# ============================================================================ #
+#                                     DATA                                     #
+# ============================================================================ #
+# Coûts salariaux
+SALARY_COSTS = {
+    1: 100,  # N1
+    2: 70,   # N2
+    3: 50    # N3
+}
+
+# Coûts de recrutement
+RECRUITMENT_COSTS = {
+    2: 10,  # N2
+    3: 5    # N3
+}
+
+# Coûts de licenciement
+LAYOFF_COSTS = {
+    1: 50,  # N1
+    2: 35,  # N2
+    3: 25   # N3
+}
+
+# Effectifs initiaux
+INITIAL_STAFF = {
+    1: 200,  # N1
+    2: 500,  # N2
+    3: 3000  # N3
+}
+
+# Matrice d'évolution
+EVOLUTION_MATRIX = {
+    (1, 1): 0.95,  # N1 -> N1
+    (2, 1): 0.02,  # N1 -> N2
+    (3, 1): 0.00,  # N1 -> N3
+    (2, 2): 0.90,  # N2 -> N2
+    (3, 2): 0.01,  # N2 -> N3
+    (3, 3): 0.80   # N3 -> N3
+}
+
+# Besoins en effectifs
+NEEDS = {
+    (1, 1): 150,  # Année 1, N1
+    (1, 2): 700,  # Année 1, N2
+    (1, 3): 2000, # Année 1, N3
+    (2, 1): 200,  # Année 2, N1
+    (2, 2): 500,  # Année 2, N2
+    (2, 3): 3000, # Année 2, N3
+    (3, 1): 200,  # Année 3, N1
+    (3, 2): 500,  # Année 3, N2
+    (3, 3): 3000  # Année 3, N3
+}
 
 
 # ============================================================================ #
 #                                  SET MODEL                                   #
 # ============================================================================ #
-from pulp import PULP_CBC_CMD, LpMinimize, LpProblem, LpStatus, LpVariable, lpSum
+from pulp import LpMinimize, LpProblem, LpStatus, LpVariable, lpSum
 from pathlib import Path
 
-def set_model():
-    """Minimisation problem for personnel planning."""
+def set_model(needs=NEEDS, evolution_matrix=EVOLUTION_MATRIX, salary_costs=SALARY_COSTS,
+              recruitment_costs=RECRUITMENT_COSTS, layoff_costs=LAYOFF_COSTS,
+              initial_staff=INITIAL_STAFF, cat='Integer'):
+    """Minimisation problem for personnel planning.
+
+    The planning years are the years of the `needs` table; the initial staff
+    is the headcount of the year before the first one. With
+    `cat='Continuous'` the headcounts are no longer rounded, which keeps long
+    horizons tractable (integer headcounts must stay compatible with the
+    fractional evolution rates from one year to the next).
+    """
+    with instrumentation.phase('data'):
+        years = sorted({i for i, _ in needs})
+        start = years[0] - 1
+
     # ------------------------------------------------------------------------ #
     # Linear problem with minimisation
     # ------------------------------------------------------------------------ #
@@ -61,117 +132,84 @@ def set_model():
     # ------------------------------------------------------------------------ #
     # The variables
     # ------------------------------------------------------------------------ #
-    # Variables de recrutement
-    R = {
-        (i, j): LpVariable(name=f'R_{i}_{j}', lowBound=0, cat='Integer')
-        for i in range(1, 4) for j in range(2, 4)
-    }
-
-    # Variables de licenciement
-    L = {
-        (i, j): LpVariable(name=f'L_{i}_{j}', lowBound=0, cat='Integer')
-        for i in range(1, 4) for j in range(1, 4)
-    }
-
-    # Variables d'effectif
-    S = {
-        (i, j): LpVariable(name=f'S_{i}_{j}', lowBound=0, cat='Integer')
-        for i in range(1, 4) for j in range(1, 4)
-    }
+    with instrumentation.phase('variables'):
+        # Variables de recrutement
+        R = {
+            (i, j): LpVariable(name=f'R_{i}_{j}', lowBound=0, cat=cat)
+            for i in years for j in range(2, 4)
+        }
+
+        # Variables de licenciement
+        L = {
+            (i, j): LpVariable(name=f'L_{i}_{j}', lowBound=0, cat=cat)
+            for i in years for j in range(1, 4)
+        }
+
+        # Variables d'effectif
+        S = {
+            (i, j): LpVariable(name=f'S_{i}_{j}', lowBound=0, cat=cat)
+            for i in years for j in range(1, 4)
+        }
 
     # ------------------------------------------------------------------------ #
     # The objective function
     # ------------------------------------------------------------------------ #
-    # Coûts salariaux
-    salary_costs = {
-        1: 100,  # N1
-        2: 70,   # N2
-        3: 50    # N3
-    }
-
-    # Coûts de recrutement
-    recruitment_costs = {
-        2: 10,  # N2
-        3: 5    # N3
-    }
-
-    # Coûts de licenciement
-    layoff_costs = {
-        1: 50,  # N1
-        2: 35,  # N2
-        3: 25   # N3
-    }
-
-    # Fonction objectif : minimiser le coût total
-    prob += lpSum(
-        salary_costs[j] * S[i, j] for i in range(1, 4) for j in range(1, 4)
-    ) + lpSum(
-        recruitment_costs[j] * R[i, j] for i in range(1, 4) for j in range(2, 4)
-    ) + lpSum(
-        layoff_costs[j] * L[i, j] for i in range(1, 4) for j in range(1, 4)
-    ), "Total Cost"
+    with instrumentation.phase('objective'):
+        # Fonction objectif : minimiser le coût total
+        prob += lpSum(
+            salary_costs[j] * S[i, j] for i in years for j in range(1, 4)
+        ) + lpSum(
+            recruitment_costs[j] * R[i, j] for i in years for j in range(2, 4)
+        ) + lpSum(
+            layoff_costs[j] * L[i, j] for i in years for j in range(1, 4)
+        ), "Total Cost"
 
     # ------------------------------------------------------------------------ #
     # The constraints
     # ------------------------------------------------------------------------ #
-    # Effectifs initiaux
-    S[0, 1] = LpVariable(name='S_0_1', lowBound=200, upBound=200, cat='Integer') #N1
-    S[0, 2] = LpVariable(name='S_0_2', lowBound=500, upBound=500, cat='Integer') #N2
-    S[0, 3] = LpVariable(name='S_0_3', lowBound=3000, upBound=3000, cat='Integer') #N3
-
-    # Matrice d'évolution
-    evolution_matrix = {
-        (1, 1): 0.95,  # N1 -> N1
-        (2, 1): 0.02,  # N1 -> N2
-        (3, 1): 0.00,  # N1 -> N3
-        (2, 2): 0.90,  # N2 -> N2
-        (3, 2): 0.01,  # N2 -> N3
-        (3, 3): 0.80   # N3 -> N3
-    }
-
-    # Contraintes d'évolution des effectifs
-    for i in range(1, 4):
-        for j in range(1, 4):
-            if j == 1:
-                prob += S[i, 1] == evolution_matrix[(1, 1)] * S[i-1, 1] + R[i, 2] - L[i, 1]
-            elif j == 2:
-                prob += S[i, 2] == evolution_matrix[(2, 1)] * S[i-1, 1] + evolution_matrix[(2, 2)] * S[i-1, 2] + R[i, 2] - L[i, 2]
-            elif j == 3:
-                prob += S[i, 3] == evolution_matrix[(3, 1)] * S[i-1, 1] + evolution_matrix[(3, 2)] * S[i-1, 2] + evolution_matrix[(3, 3)] * S[i-1, 3] + R[i, 3] - L[i, 3]
-
-    # Contraintes de besoins en effectifs
-    needs = {
-        (1, 1): 150,  # Année 1, N1
-        (1, 2): 700,  # Année 1, N2
-        (1, 3): 2000, # Année 1, N3
-        (2, 1): 200,  # Année 2, N1
-        (2, 2): 500,  # Année 2, N2
-        (2, 3): 3000, # Année 2, N3
-        (3, 1): 200,  # Année 3, N1
-        (3, 2): 500,  # Année 3, N2
-        (3, 3): 3000  # Année 3, N3
-    }
-
-    for i in range(1, 4):
-        for j in range(1, 4):
-            prob += S[i, j] >= needs[(i, j)]
+    with instrumentation.phase('constraints'):
+        # Effectifs initiaux
+        for j, staff in initial_staff.items():
+            S[start, j] = LpVariable(name=f'S_{start}_{j}', lowBound=staff, upBound=staff, cat=cat)
+
+        # Contraintes d'évolution des effectifs
+        for i in years:
+            for j in range(1, 4):
+                if j == 1:
+                    prob += S[i, 1] == evolution_matrix[(1, 1)] * S[i-1, 1] + R[i, 2] - L[i, 1]
+                elif j == 2:
+                    prob += S[i, 2] == evolution_matrix[(2, 1)] * S[i-1, 1] + evolution_matrix[(2, 2)] * S[i-1, 2] + R[i, 2] - L[i, 2]
+                elif j == 3:
+                    prob += S[i, 3] == evolution_matrix[(3, 1)] * S[i-1, 1] + evolution_matrix[(3, 2)] * S[i-1, 2] + evolution_matrix[(3, 3)] * S[i-1, 3] + R[i, 3] - L[i, 3]
+
+        # Contraintes de besoins en effectifs
+        for (i, j), need in needs.items():
+            prob += S[i, j] >= need
 
     # Return the problem and the decision variables
     return prob, R, L, S
 
-def solve():
+def solve(log_path=Path('./personnel_planning.log')):
     """Solve the personnel planning problem."""
     # ------------------------------------------------------------------------ #
     # Solve the problem using the model
     # ------------------------------------------------------------------------ #
-    prob, R, L, S = set_model()
-    # After solving, a .log file is written.
-    prob.solve(PULP_CBC_CMD(msg=False, logPath=Path('./personnel_planning.log')))
+    with instrumentation.phase('build'):
+        prob, R, L, S = set_model()
+    # After solving, a .log file is written (unless the solution is cached).
+    with instrumentation.phase('solve'):
+        solver = backends.get_solver(msg=False, logPath=log_path)
+        integrality.solve(prob, instrumentation.instrument(prob, solver))
 
     # ------------------------------------------------------------------------ #
     # Print the solver output
     # ------------------------------------------------------------------------ #
-    print_log_output(prob, R, L, S)
+    with instrumentation.phase('report'):
+        print_log_output(prob, R, L, S)
+    # Une fois la phase 'report' fermée, pour que son temps soit affiché
+    instrumentation.print_stats()
+    solution_export.save(prob)
+    instrumentation.export(model='personnel_planning')
 
 def print_log_output(prob, R, L, S):
     """Print the log output and problem solutions."""
@@ -187,9 +225,18 @@ def print_log_output(prob, R, L, S):
     print(f'- (real) {prob.solutionTime}')
     print(f'- (CPU) {prob.solutionCpuTime}')
     print()
-
+    print(f"Integrality: {integrality.describe(getattr(prob, 'integrality', None))}")
+    print()
     print(f'Solve status: {LpStatus[prob.status]}')
     print(f'Objective value: {prob.objective.value()}')
+    costs = solution_export.breakdown(prob.objective, {'salaries': S, 'recruitments': R, 'layoffs': L})
+    for name, cost in costs.items():
+        print(f'- ({name}) {cost}')
+
+    # Every variable value: small models only (PL_SUMMARY), large ones are
+    # exported with PL_EXPORT
+    if not solution_export.summary_enabled(prob):
+        return
 
     print()
     print('-' * 40)
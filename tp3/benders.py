@@ -0,0 +1,187 @@
+"""Décomposition de Benders du problème de la question 3.
+
+Le maître ne contient que les variables E et les coupes. Pour un ensemble
+d'entrepôts ouverts fixé, le sous-problème est un problème de transport,
+dont le dual
+
+    max  somme_j dem_j * u_j - somme_i cap_i * E_i * w_i
+    s.c. u_j - w_i <= l_ij,  u, w >= 0
+
+fournit la coupe d'optimalité theta >= somme_j dem_j u_j - somme_i cap_i w_i E_i.
+Quand la capacité des entrepôts ouverts ne couvre pas la demande, le dual est
+non borné ; le rayon u = 1, w = 1 donne la coupe de réalisabilité
+somme_i cap_i E_i >= somme_j dem_j.
+
+Le sous-problème et ses duaux sont calculés en mémoire par transport.py ; seul
+le problème de Magnanti-Wong (coupes Pareto-optimales) passe par le solveur
+de `backends.get_solver`, comme le maître.
+"""
+
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from pulp import LpMaximize, LpMinimize, LpProblem, LpStatus, LpVariable, lpSum, value
+
+import question3
+from instances import default_instance, generate_instance
+from transport import solve_transport
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common import backends
+
+
+# ============================================================================ #
+#                                   MAÎTRE                                     #
+# ============================================================================ #
+def set_master(p):
+    """Problème maître : location des entrepôts et estimation theta du transport."""
+    master = LpProblem(name='maitre_benders', sense=LpMinimize)
+    E = [LpVariable(f'E_{i}', cat='Binary') for i in range(len(p))]
+    theta = LpVariable('theta', lowBound=0)
+    master += lpSum(p[i] * E[i] for i in range(len(p))) + theta, 'Coût total'
+    return master, E, theta
+
+
+# ============================================================================ #
+#                               SOUS-PROBLÈME                                  #
+# ============================================================================ #
+def solve_dual(cap, dem, l, E_bar, core=None, target=None, log_path=Path('./benders_sub.log')):
+    """Résoudre le dual du problème de transport pour les entrepôts E_bar.
+
+    Avec `core` et `target`, résoudre le problème de Magnanti-Wong : parmi les
+    solutions duales optimales (de valeur `target`), choisir celle qui donne
+    la coupe la plus forte au point intérieur `core`.
+    """
+    n, m = l.shape
+    dual = LpProblem(name='sous_probleme_dual', sense=LpMaximize)
+    u = [LpVariable(f'u_{j}', lowBound=0) for j in range(m)]
+    w = [LpVariable(f'w_{i}', lowBound=0) for i in range(n)]
+
+    point = E_bar if core is None else core
+    dual += lpSum(dem[j] * u[j] for j in range(m)) - lpSum(cap[i] * point[i] * w[i] for i in range(n))
+    for i in range(n):
+        for j in range(m):
+            dual += u[j] - w[i] <= l[i, j], f'Arc_{i}_{j}'
+    if core is not None:
+        dual += (lpSum(dem[j] * u[j] for j in range(m))
+                 - lpSum(cap[i] * E_bar[i] * w[i] for i in range(n)) == target), 'Optimalite'
+
+    # Un petit LP par itération : pas de portefeuille de processus
+    dual.solve(backends.get_solver(portfolio=False, msg=False, logPath=log_path))
+    u_val = np.array([var.varValue for var in u])
+
+    # Plus petits w compatibles avec u : la coupe ne peut qu'être plus forte
+    w_val = np.maximum(0, (u_val[None, :] - l).max(axis=1))
+    return value(dual.objective), u_val, w_val
+
+
+# ============================================================================ #
+#                               SOLVE WITH DATA                                #
+# ============================================================================ #
+def solve(p, c, d, l, C, pareto=False, max_iter=200, tol=1e-6, verbose=True):
+    """Décomposition de Benders.
+
+    Retourne E, les camions c_ij, la borne inférieure, la borne supérieure et
+    le nombre d'itérations. Avec `pareto=True`, les coupes d'optimalité sont
+    celles de Magnanti-Wong.
+    """
+    p = np.asarray(p)
+    l = np.asarray(l)
+    cap = np.asarray(c) // C
+    dem = np.asarray(d) // C
+    n = len(p)
+
+    master, E, theta = set_master(p.tolist())
+    core = np.full(n, 0.5)
+    lower_bound, upper_bound, best, trucks = -np.inf, np.inf, None, None
+
+    for iteration in range(1, max_iter + 1):
+        master.solve(backends.get_solver(msg=False, logPath=Path('./benders_master.log')))
+        if LpStatus[master.status] != 'Optimal':
+            raise ValueError(f'Maître {LpStatus[master.status]} : instance non réalisable')
+        lower_bound = value(master.objective)
+        E_bar = np.array([round(var.varValue) for var in E])
+
+        if cap @ E_bar < dem.sum():
+            # Capacité insuffisante : coupe de réalisabilité
+            master += lpSum(cap[i] * E[i] for i in range(n)) >= dem.sum(), f'Realisabilite_{iteration}'
+            cut = 'réalisabilité'
+        else:
+            _, z_sub, x, u, w = solve_transport(cap * E_bar, dem, l)
+            if p @ E_bar + z_sub < upper_bound:
+                upper_bound, best, trucks = p @ E_bar + z_sub, E_bar, x
+            if pareto:
+                core = (core + E_bar) / 2
+                _, u, w = solve_dual(cap, dem, l, E_bar, core=core, target=z_sub)
+            master += (theta >= float(dem @ u) - lpSum(float(cap[i] * w[i]) * E[i] for i in range(n)),
+                       f'Optimalite_{iteration}')
+            cut = 'optimalité'
+
+        if verbose:
+            print(f'{iteration:4d}  borne inf. {lower_bound:12.2f}  borne sup. {upper_bound:12.2f}  coupe de {cut}')
+        if best is not None and upper_bound - lower_bound <= tol * max(1.0, abs(upper_bound)):
+            break
+
+    return best, trucks, lower_bound, upper_bound, iteration
+
+
+# ============================================================================ #
+#                                  BENCHMARK                                   #
+# ============================================================================ #
+def benchmark(sizes, seed=0):
+    """Comparer Benders (coupes classiques et Pareto) au modèle monolithique."""
+    rows = []
+    for n, m in sizes:
+        p, c, d, l, C = generate_instance(n, m, seed=seed)
+
+        start = time.perf_counter()
+        prob, _, _ = question3.set_model(p.tolist(), c.tolist(), d.tolist(), l.tolist())
+        prob.solve(backends.get_solver(msg=False, logPath=Path('./benders_monolithique.log')))
+        row = {'n': n, 'm': m, 'monolithique': value(prob.objective),
+               'temps monolithique': time.perf_counter() - start}
+
+        for pareto in (False, True):
+            label = 'pareto' if pareto else 'benders'
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                *_, upper_bound, iterations = solve(p, c, d, l, C, pareto=pareto)
+            row[label] = upper_bound
+            row[f'temps {label}'] = time.perf_counter() - start
+            row[f'itérations {label}'] = iterations
+        rows.append(row)
+        print('  '.join(f'{key}: {val:.2f}' if isinstance(val, float) else f'{key}: {val}'
+                        for key, val in row.items()))
+    return rows
+
+
+# ============================================================================ #
+#                                   UTILITIES                                  #
+# ============================================================================ #
+def print_log_output(E, c_ij, lower_bound, upper_bound, iterations):
+    print()
+    print('-' * 40)
+    print('Statistiques')
+    print('-' * 40)
+    print()
+    print(f'Itérations: {iterations}')
+    print(f'Borne inférieure: {lower_bound}')
+    print(f'Valeur de la fonction objectif: {upper_bound}')
+    print()
+    print('-' * 40)
+    print("Valeurs des variables")
+    print('-' * 40)
+    print()
+    for i in range(len(E)):
+        print(f'Entrepôt {i+1} loué (E_{i+1}): {E[i]}')
+        for j in range(c_ij.shape[1]):
+            print(f'Camions de E{i+1} vers Z{j+1} (c_{i+1}_{j+1}): {c_ij[i, j]}')
+
+
+if __name__ == '__main__':
+    print_log_output(*solve(*default_instance()))
+    print()
+    benchmark([(10, 8), (20, 15), (30, 20), (40, 30)])
@@ -0,0 +1,125 @@
+"""Formulations du modèle de la question 3 et séparation des liens.
+
+La capacité agrégée somme_j c_ij <= cap_i * E_i a une relaxation faible :
+E_i = somme_j c_ij / cap_i suffit, et le loyer n'est payé qu'en partie. Les
+liens c_ij <= min(cap_i, dem_j) * E_i et la couverture
+somme_i cap_i * E_i >= demande totale la resserrent (question3.set_model,
+formulation 'strong'), au prix de n*m lignes de plus.
+
+`separate` n'ajoute que les liens violés : la relaxation est résolue, les
+liens violés par sa solution sont ajoutés, et ainsi de suite jusqu'à ce
+qu'aucun ne le soit ; le problème entier est ensuite résolu avec ces seuls
+liens. La séparation n'a lieu qu'à la racine : CBC n'ajoute aucun lien
+pendant le branch-and-bound.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from pulp import LpStatus, value
+
+import question3
+from instances import generate_instance
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common import backends, cbc_log
+
+FORMULATIONS = question3.FORMULATIONS
+
+
+# ============================================================================ #
+#                                  SÉPARATION                                  #
+# ============================================================================ #
+def separate(p, c, d, l, tol=1e-6, max_rounds=50, max_cuts=None, log_path=Path('./formulations_lp.log')):
+    """Modèle 'lazy' avec les liens violés par les relaxations successives.
+
+    `max_cuts` limite le nombre de liens ajoutés par tour (les plus violés).
+    Retourne le problème, E, c_ij, le nombre de tours et de liens ajoutés.
+    """
+    C = question3.C
+    prob, E, c_ij = question3.set_model(p, c, d, l, formulation='lazy')
+    n, m = len(c), len(d)
+    bound = np.minimum(np.asarray(c)[:, None] // C, np.asarray(d)[None, :] // C)
+    added = np.zeros((n, m), dtype=bool)
+
+    rounds = 0
+    for rounds in range(1, max_rounds + 1):
+        prob.solve(backends.get_solver(portfolio=False, msg=False, mip=False, logPath=log_path))
+        if LpStatus[prob.status] != 'Optimal':
+            break
+
+        # Violation de chaque lien : c_ij - min(cap_i, dem_j) * E_i
+        trucks = np.array([[var.varValue or 0.0 for var in row] for row in c_ij])
+        opened = np.array([var.varValue or 0.0 for var in E])
+        violation = np.where(added, 0.0, trucks - bound * opened[:, None])
+        rows, cols = np.nonzero(violation > tol)
+        if not rows.size:
+            break
+        if max_cuts is not None and rows.size > max_cuts:
+            worst = np.argsort(-violation[rows, cols])[:max_cuts]
+            rows, cols = rows[worst], cols[worst]
+
+        for i, j in zip(rows.tolist(), cols.tolist()):
+            prob += c_ij[i][j] <= int(bound[i, j]) * E[i], f"Lien_{i}_{j}"
+        added[rows, cols] = True
+
+    return prob, E, c_ij, rounds, int(added.sum())
+
+
+# ============================================================================ #
+#                                  COMPARAISON                                 #
+# ============================================================================ #
+def cbc_solver(**options):
+    """Solveur CBC seul (sans portefeuille) configuré par `backends.get_solver` :
+    son journal est lu par `cbc_log`."""
+    return backends.get_solver('cbc', portfolio=False, **options)
+
+
+def compare(sizes, seed=0, time_limit=120):
+    """Nœuds, écart à la racine et temps de chaque formulation.
+
+    L'écart à la racine est (objectif - relaxation) / objectif, la
+    relaxation étant lue dans le journal de CBC (`cbc_log`).
+    """
+    rows = []
+    for n, m in sizes:
+        p, c, d, l = (x.tolist() for x in generate_instance(n, m, seed=seed)[:4])
+        for formulation in FORMULATIONS:
+            start = time.perf_counter()
+            extra = {}
+            if formulation == 'lazy':
+                prob, _, _, rounds, added = separate(p, c, d, l)
+                extra = {'tours': rounds, 'liens': added}
+            else:
+                prob, _, _ = question3.set_model(p, c, d, l, formulation=formulation)
+            _, record = cbc_log.solve_and_parse(prob, cbc_solver, msg=False, timeLimit=time_limit)
+            elapsed = time.perf_counter() - start
+
+            objective = value(prob.objective)
+            root = record['root_lp'] if record else None
+            rows.append({
+                'n': n, 'm': m, 'formulation': formulation,
+                'contraintes': prob.numConstraints(),
+                'statut': record['result'] if record else LpStatus[prob.status],
+                'objectif': objective,
+                'relaxation': root,
+                'écart racine': (objective - root) / objective if objective and root is not None else None,
+                'nœuds': record['nodes'] if record else None,
+                'temps': elapsed,
+                **extra,
+            })
+            print('  '.join(f'{key}: {val:.4f}' if isinstance(val, float) else f'{key}: {val}'
+                            for key, val in rows[-1].items()))
+    return rows
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Comparer les formulations du modèle de la question 3.")
+    parser.add_argument('--seed', type=int, default=0, help='graine des instances')
+    parser.add_argument('--time-limit', type=float, default=120, help='limite de temps de CBC (s)')
+    args = parser.parse_args()
+
+    compare([(5, 3), (20, 15), (40, 30), (60, 40), (100, 60)], seed=args.seed, time_limit=args.time_limit)
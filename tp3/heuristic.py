@@ -0,0 +1,286 @@
+"""Heuristique à tout moment pour la question 3 : relaxation, arrondis,
+réparation par transport, puis recherche locale dans le temps imparti.
+
+1. Relaxation continue (liens c_ij <= min(cap_i, dem_j) E_i séparés à la
+   demande, formulations.separate), dont les E_i fractionnaires guident les
+   arrondis : seuil 1/2, E_i > 0, ouverture par E_i décroissant jusqu'à
+   couvrir la demande, et arrondis aléatoires.
+2. Pour un ensemble d'entrepôts loués, les camions sont ceux du problème de
+   transport exact (transport.py), dont les duaux u_j sont gardés.
+3. Recherche locale (ajout, retrait, échange d'entrepôts). Le gain de chaque
+   mouvement est d'abord estimé sans résolution, à partir de la solution
+   courante : un retrait reporte les camions de i sur le meilleur autre
+   entrepôt loué de chaque zone, un ajout remplit les zones où l_kj < u_j
+   (sac à dos de lagrangian.solve_block). Seuls les mouvements les mieux
+   estimés sont évalués par un transport exact ; les ensembles déjà évalués
+   sont gardés en mémoire. À un optimum local, la recherche repart de la
+   meilleure solution perturbée, tant que le temps le permet.
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from pulp import value
+
+import question3
+from formulations import separate
+from instances import default_instance, generate_instance
+from lagrangian import solve_block
+from transport import solve_transport
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common import backends
+
+
+# ============================================================================ #
+#                                  ÉVALUATION                                  #
+# ============================================================================ #
+class Evaluator:
+    """Coût exact d'un ensemble d'entrepôts loués, avec mémoire."""
+
+    def __init__(self, p, cap, dem, l):
+        self.p, self.cap, self.dem, self.l = p, cap, dem, l
+        self.memory = {}
+        self.calls = 0
+
+    def __call__(self, E):
+        """Retourne (coût, camions, duaux u) ou None si E ne couvre pas la demande."""
+        key = E.tobytes()
+        if key not in self.memory:
+            if self.cap @ E < self.dem.sum():
+                self.memory[key] = None
+            else:
+                self.calls += 1
+                _, cost, x, u, _ = solve_transport(self.cap * E, self.dem, self.l)
+                self.memory[key] = (float(self.p @ E + cost), x, u)
+        return self.memory[key]
+
+
+# ============================================================================ #
+#                                   ARRONDIS                                   #
+# ============================================================================ #
+def relaxation(p, c, d, l):
+    """Valeurs E_i de la relaxation continue et sa valeur (borne inférieure)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        prob, E, _, _, _ = separate(p.tolist(), c.tolist(), d.tolist(), l.tolist(),
+                                    log_path=Path('./heuristic_lp.log'))
+    return np.array([var.varValue or 0.0 for var in E]), value(prob.objective)
+
+
+def roundings(E_lp, p, cap, total, rng, random_rounds=8):
+    """Ensembles d'entrepôts obtenus en arrondissant E_lp de plusieurs façons."""
+    candidates = [E_lp >= 0.5, E_lp > 1e-6]
+
+    # Ouverture par E_lp décroissant (puis loyer par camion) jusqu'à couvrir la demande
+    order = np.lexsort((p / np.maximum(cap, 1), -E_lp))
+    covered = np.cumsum(cap[order])
+    greedy = np.zeros(len(p), dtype=bool)
+    greedy[order[:np.searchsorted(covered, total) + 1]] = True
+    candidates.append(greedy)
+
+    for _ in range(random_rounds):
+        candidates.append(rng.random(len(p)) < E_lp)
+    return [complete(E.astype(np.int64), p, cap, total) for E in candidates]
+
+
+def complete(E, p, cap, total):
+    """Louer les entrepôts de plus petit loyer par camion jusqu'à couvrir la demande."""
+    E = E.copy()
+    if cap @ E >= total:
+        return E
+    closed = np.flatnonzero((E == 0) & (cap > 0))
+    for i in closed[np.argsort(p[closed] / cap[closed])].tolist():
+        E[i] = 1
+        if cap @ E >= total:
+            break
+    return E
+
+
+# ============================================================================ #
+#                                RECHERCHE LOCALE                              #
+# ============================================================================ #
+def estimate_moves(E, x, u, p, cap, dem, l, top=10):
+    """Mouvements estimés améliorants, triés : [(gain estimé, ajout, retrait)].
+
+    `ajout` et `retrait` sont des indices d'entrepôts ou None.
+    """
+    total = dem.sum()
+    opened = np.flatnonzero(E)
+    closed = np.flatnonzero((E == 0) & (cap > 0))
+    moves = []
+
+    # Retraits : camions de i reportés sur le meilleur autre entrepôt loué
+    drop = np.full(len(p), np.inf)
+    if len(opened) > 1:
+        l_open = l[opened]
+        order = np.argsort(l_open, axis=0)
+        best, second = l_open[order[0], np.arange(l.shape[1])], l_open[order[1], np.arange(l.shape[1])]
+        for row, i in enumerate(opened.tolist()):
+            if cap @ E - cap[i] < total:
+                continue
+            alternative = np.where(order[0] == row, second, best)
+            drop[i] = -p[i] + x[i] @ (alternative - l[i])
+
+    # Ajouts : sac à dos des zones où l_kj < u_j (valeur négative : gain)
+    add = np.full(len(p), np.inf)
+    if closed.size:
+        _, _, gain = solve_block(closed, p, cap, dem, l, u)
+        add[closed] = np.where(gain < 0, gain, np.inf)
+
+    moves += [(drop[i], None, i) for i in np.flatnonzero(drop < 0).tolist()]
+    moves += [(add[k], k, None) for k in np.flatnonzero(add < 0).tolist()]
+
+    # Échanges : meilleurs retraits (même non améliorants) et meilleurs ajouts
+    best_drops = [i for i in np.argsort(drop)[:top].tolist() if np.isfinite(drop[i])]
+    for k in np.argsort(add)[:top].tolist():
+        if not np.isfinite(add[k]):
+            break
+        moves += [(drop[i] + add[k], k, i) for i in best_drops if drop[i] + add[k] < 0]
+
+    return sorted(moves, key=lambda move: move[0])
+
+
+def local_search(E, evaluate, p, cap, dem, l, deadline, max_exact=5):
+    """Descente jusqu'à un optimum local ou l'échéance ; retourne E et son coût."""
+    cost, x, u = evaluate(E)
+    while time.perf_counter() < deadline:
+        improved = False
+        for _, k, i in estimate_moves(E, x, u, p, cap, dem, l)[:max_exact]:
+            candidate = E.copy()
+            if k is not None:
+                candidate[k] = 1
+            if i is not None:
+                candidate[i] = 0
+            result = evaluate(candidate)
+            if result is not None and result[0] < cost - 1e-9:
+                E, (cost, x, u) = candidate, result
+                improved = True
+                break
+        if not improved:
+            break
+    return E, cost
+
+
+def perturb(E, p, cap, total, rng, strength=2):
+    """Échanger au hasard `strength` entrepôts loués et non loués."""
+    E = E.copy()
+    for _ in range(strength):
+        opened, closed = np.flatnonzero(E), np.flatnonzero(E == 0)
+        if not opened.size or not closed.size:
+            break
+        E[rng.choice(opened)] = 0
+        E[rng.choice(closed)] = 1
+    return complete(E, p, cap, total)
+
+
+# ============================================================================ #
+#                               SOLVE WITH DATA                                #
+# ============================================================================ #
+def solve(p, c, d, l, C=question3.C, time_budget=5.0, seed=0):
+    """Meilleure solution trouvée dans `time_budget` secondes.
+
+    Retourne un dict : objectif, E (n,), camions (n, m), borne inférieure
+    (relaxation), historique [(temps, objectif)] des améliorations et
+    nombre de transports résolus. Objectif None si l'instance n'est pas
+    réalisable.
+    """
+    start = time.perf_counter()
+    deadline = start + time_budget
+    rng = np.random.default_rng(seed)
+    p, l = np.asarray(p), np.asarray(l)
+    cap, dem = np.asarray(c) // C, np.asarray(d) // C
+    total = dem.sum()
+    evaluate = Evaluator(p, cap, dem, l)
+
+    result = {'objective': None, 'E': None, 'trucks': None, 'bound': None, 'history': [], 'transports': 0}
+    if cap.sum() < total:
+        return result
+
+    def keep(E, cost):
+        if result['objective'] is None or cost < result['objective'] - 1e-9:
+            result['objective'], result['E'] = cost, E
+            result['history'].append((time.perf_counter() - start, cost))
+
+    # ------------------------------------------------------------------------ #
+    # Relaxation et arrondis
+    # ------------------------------------------------------------------------ #
+    E_lp, result['bound'] = relaxation(p, np.asarray(c), np.asarray(d), l)
+    for E in roundings(E_lp, p, cap, total, rng):
+        keep(E, evaluate(E)[0])
+
+    # ------------------------------------------------------------------------ #
+    # Recherche locale itérée
+    # ------------------------------------------------------------------------ #
+    E = result['E']
+    while time.perf_counter() < deadline:
+        E, cost = local_search(E, evaluate, p, cap, dem, l, deadline)
+        keep(E, cost)
+        E = perturb(result['E'], p, cap, total, rng)
+
+    result['trucks'] = evaluate(result['E'])[1]
+    result['transports'] = evaluate.calls
+    return result
+
+
+# ============================================================================ #
+#                                  BENCHMARK                                   #
+# ============================================================================ #
+def benchmark(sizes, time_budget=5.0, seed=0):
+    """Comparer l'heuristique à CBC (question3.set_model) sur des instances aléatoires."""
+    for n, m in sizes:
+        p, c, d, l, C = generate_instance(n, m, seed=seed)
+        result = solve(p, c, d, l, C, time_budget=time_budget, seed=seed)
+
+        start = time.perf_counter()
+        prob, _, _ = question3.set_model(p.tolist(), c.tolist(), d.tolist(), l.tolist())
+        prob.solve(backends.get_solver(msg=False, timeLimit=10 * time_budget, logPath=Path('./heuristic_cbc.log')))
+        print(f'{n} x {m} : heuristique {result["objective"]} ({time_budget} s, {result["transports"]} transports, '
+              f'première solution {result["history"][0][1]} à {result["history"][0][0]:.2f} s), '
+              f'CBC {value(prob.objective)} ({time.perf_counter() - start:.2f} s), borne {result["bound"]:.1f}')
+
+
+# ============================================================================ #
+#                                   UTILITIES                                  #
+# ============================================================================ #
+def print_log_output(result):
+    print()
+    print('-' * 40)
+    print('Statistiques')
+    print('-' * 40)
+    print()
+    print(f'Transports résolus: {result["transports"]}')
+    print(f'Borne inférieure (relaxation): {result["bound"]}')
+    print('Améliorations:')
+    for elapsed, objective in result['history']:
+        print(f'- ({elapsed:.3f} s) {objective}')
+    print()
+    print(f'Valeur de la fonction objectif: {result["objective"]}')
+
+    if result['E'] is None:
+        return
+    print()
+    print('-' * 40)
+    print("Valeurs des variables")
+    print('-' * 40)
+    print()
+    trucks = result['trucks']
+    for i in range(trucks.shape[0]):
+        print(f'Entrepôt {i+1} loué (E_{i+1}): {result["E"][i]}')
+        for j in np.flatnonzero(trucks[i]).tolist():
+            print(f'Camions de E{i+1} vers Z{j+1} (c_{i+1}_{j+1}): {trucks[i, j]}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Heuristique à tout moment pour la question 3.")
+    parser.add_argument('--time-budget', type=float, default=2.0, help='temps imparti (s)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print_log_output(solve(*default_instance(), time_budget=args.time_budget, seed=args.seed))
+    print()
+    benchmark([(20, 15), (60, 40), (150, 100)], time_budget=args.time_budget, seed=args.seed)
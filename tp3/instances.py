@@ -0,0 +1,137 @@
+"""Instances du problème de localisation d'entrepôts sous forme de tableaux NumPy.
+
+Une instance peut être enregistrée dans un répertoire, un fichier `.npy` par
+tableau (`p`, `c`, `d`, `l`) et `instance.json` pour la capacité d'un camion.
+`load_instance` ouvre les tableaux en mémoire projetée (`mmap_mode='r'`) :
+l'ouverture ne lit que les en-têtes, les lignes de `l` sont lues à la demande
+et les tranches restent des vues, sans copie.
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+
+from question3 import C, c, d, l, p
+
+
+# ============================================================================ #
+#                                  INSTANCES                                   #
+# ============================================================================ #
+def default_instance():
+    """Instance de la question 3 (5 entrepôts, 3 zones)."""
+    return np.array(p), np.array(c), np.array(d), np.array(l), C
+
+
+def generate_instance(n, m, tightness=1.5, seed=0, truck=C):
+    """Instance aléatoire avec n entrepôts et m zones.
+
+    `tightness` est le rapport entre la capacité totale des entrepôts et la
+    demande totale : plus il est proche de 1, plus l'instance est contrainte.
+    """
+    p_rand, c_rand, d_rand, sites, zones = _generate_sites(n, m, tightness, seed, truck)
+    return p_rand, c_rand, d_rand, _delivery_costs(sites, zones), truck
+
+
+def _generate_sites(n, m, tightness, seed, truck):
+    """Loyers, capacités, demandes et positions des entrepôts et des zones."""
+    rng = np.random.default_rng(seed)
+
+    # Demandes des zones : multiples de la capacité d'un camion
+    d_rand = truck * rng.integers(5, 50, size=m)
+
+    # Capacités des entrepôts : réparties pour atteindre `tightness` * demande
+    weights = rng.uniform(0.5, 1.5, size=n)
+    trucks = np.maximum(1, np.round(weights / weights.sum() * tightness * d_rand.sum() / truck))
+    c_rand = truck * trucks.astype(np.int64)
+
+    # Loyers : proportionnels à la capacité, avec une part fixe
+    p_rand = np.round(500 + c_rand * rng.uniform(2, 8, size=n)).astype(np.int64)
+
+    # Positions des entrepôts et des zones dans le carré unité
+    sites = rng.uniform(size=(n, 2))
+    zones = rng.uniform(size=(m, 2))
+    return p_rand, c_rand, d_rand, sites, zones
+
+
+def _delivery_costs(sites, zones):
+    """Coûts de livraison : distance entre entrepôts et zones."""
+    dist = np.sqrt(((sites[:, None, :] - zones[None, :, :]) ** 2).sum(axis=2))
+    return np.round(10 + 100 * dist).astype(np.int64)
+
+
+# ============================================================================ #
+#                                   STORAGE                                    #
+# ============================================================================ #
+def save_instance(directory, p, c, d, l, truck=C):
+    """Enregistrer une instance dans `directory` (un `.npy` par tableau)."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, array in (('p', p), ('c', c), ('d', d), ('l', l)):
+        np.save(directory / f'{name}.npy', np.asarray(array))
+    _save_header(directory, truck, len(p), len(d))
+
+
+def generate_instance_to(directory, n, m, tightness=1.5, seed=0, truck=C, chunk_rows=4096):
+    """Générer l'instance de `generate_instance` directement sur disque.
+
+    La matrice `l` est écrite par blocs de `chunk_rows` entrepôts dans un
+    `.npy` projeté en mémoire : la matrice entière n'est jamais en mémoire.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    p_rand, c_rand, d_rand, sites, zones = _generate_sites(n, m, tightness, seed, truck)
+    for name, array in (('p', p_rand), ('c', c_rand), ('d', d_rand)):
+        np.save(directory / f'{name}.npy', array)
+
+    l_file = np.lib.format.open_memmap(directory / 'l.npy', mode='w+', dtype=np.int64, shape=(n, m))
+    for start in range(0, n, chunk_rows):
+        l_file[start:start + chunk_rows] = _delivery_costs(sites[start:start + chunk_rows], zones)
+    l_file.flush()
+    del l_file
+    _save_header(directory, truck, n, m)
+
+
+def _save_header(directory, truck, n, m):
+    with open(directory / 'instance.json', 'w') as f:
+        json.dump({'truck': int(truck), 'n': int(n), 'm': int(m)}, f)
+
+
+def load_instance(directory, mmap=True):
+    """Ouvrir une instance enregistrée ; retourne `(p, c, d, l, C)`.
+
+    Avec `mmap`, les tableaux sont des `np.memmap` en lecture seule : rien
+    n'est lu avant l'accès aux lignes.
+    """
+    directory = Path(directory)
+    with open(directory / 'instance.json') as f:
+        header = json.load(f)
+    mmap_mode = 'r' if mmap else None
+    p_file, c_file, d_file, l_file = (np.load(directory / f'{name}.npy', mmap_mode=mmap_mode)
+                                      for name in ('p', 'c', 'd', 'l'))
+    if l_file.shape != (header['n'], header['m']):
+        raise ValueError(f'{directory}: l has shape {l_file.shape}, expected ({header["n"]}, {header["m"]})')
+    return p_file, c_file, d_file, l_file, header['truck']
+
+
+def iter_rows(l, chunk_rows=4096):
+    """Parcourir `l` par blocs de lignes : `(première ligne, bloc)`.
+
+    Sur une matrice projetée, chaque bloc est une vue lue à la demande.
+    """
+    for start in range(0, l.shape[0], chunk_rows):
+        yield start, l[start:start + chunk_rows]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Générer une instance aléatoire sur disque.")
+    parser.add_argument('directory', type=Path, help="répertoire de l'instance")
+    parser.add_argument('--n', type=int, default=1000, help="nombre d'entrepôts")
+    parser.add_argument('--m', type=int, default=1000, help='nombre de zones')
+    parser.add_argument('--tightness', type=float, default=1.5, help='capacité totale / demande totale')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    generate_instance_to(args.directory, args.n, args.m, tightness=args.tightness, seed=args.seed)
+    print(f'{args.directory}: {args.n} entrepôts, {args.m} zones')
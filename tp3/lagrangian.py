@@ -0,0 +1,227 @@
+"""Relaxation lagrangienne des contraintes de demande de la question 3.
+
+Une fois les lignes `Demande_zone_{j}` relâchées avec des multiplicateurs
+u_j >= 0, le problème se sépare en un sac à dos par entrepôt :
+
+    min  p_i * E_i + somme_j (l_ij - u_j) * c_ij
+    s.c. somme_j c_ij <= cap_i * E_i,  0 <= c_ij <= dem_j
+
+résolu exactement en remplissant les zones de coût réduit négatif, de la
+moins chère à la plus chère. Chaque solution relâchée est rendue réalisable
+par une heuristique primale, ce qui donne une borne supérieure : affectation
+gloutonne des camions, puis problème de transport exact (transport.py) quand
+l'affectation gloutonne améliore la meilleure trouvée jusque-là.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from instances import default_instance, generate_instance
+from transport import solve_transport
+
+
+# ============================================================================ #
+#                              SOUS-PROBLÈMES                                  #
+# ============================================================================ #
+def solve_block(rows, p, cap, dem, l, u):
+    """Résoudre les sous-problèmes des entrepôts `rows` pour les multiplicateurs u.
+
+    Retourne E (ouverture), les camions et la valeur de chaque sous-problème.
+    """
+    reduced = l[rows] - u
+    order = np.argsort(reduced, axis=1)
+    rc = np.take_along_axis(reduced, order, axis=1)
+    dem_sorted = dem[order]
+
+    # Remplissage glouton des zones de coût réduit négatif, dans l'ordre
+    filled_before = np.cumsum(dem_sorted, axis=1) - dem_sorted
+    take = np.clip(cap[rows, None] - filled_before, 0, dem_sorted) * (rc < 0)
+    value = p[rows] + (rc * take).sum(axis=1)
+
+    E = value < 0
+    trucks = np.zeros_like(take)
+    np.put_along_axis(trucks, order, take, axis=1)
+    trucks[~E] = 0
+    return E, trucks, np.minimum(value, 0)
+
+
+def row_blocks(n, block_size=256):
+    """Indices des lignes 0..n-1 par blocs de `block_size`."""
+    return [np.arange(s, min(s + block_size, n)) for s in range(0, n, block_size)]
+
+
+def solve_relaxation(p, cap, dem, l, u, pool=None, block_size=256):
+    """Évaluer la fonction duale L(u), les entrepôts étant traités par blocs
+    en parallèle quand un `pool` est fourni."""
+    blocks = row_blocks(len(p), block_size)
+    if pool is None:
+        results = [solve_block(rows, p, cap, dem, l, u) for rows in blocks]
+    else:
+        results = list(pool.map(lambda rows: solve_block(rows, p, cap, dem, l, u), blocks))
+
+    E = np.concatenate([r[0] for r in results])
+    trucks = np.concatenate([r[1] for r in results])
+    lower_bound = float(u @ dem + sum(r[2].sum() for r in results))
+    return E, trucks, lower_bound
+
+
+# ============================================================================ #
+#                             HEURISTIQUE PRIMALE                              #
+# ============================================================================ #
+def greedy_transport(cap, dem, l):
+    """Affecter les camions par coût de livraison croissant."""
+    spare = cap.tolist()
+    missing = dem.tolist()
+    remaining = sum(missing)
+    m = l.shape[1]
+    trucks = np.zeros(l.shape, dtype=np.int64)
+    for flat in np.argsort(l, axis=None).tolist():
+        if remaining == 0:
+            break
+        i, j = divmod(flat, m)
+        moved = min(spare[i], missing[j])
+        if moved > 0:
+            trucks[i, j] = moved
+            spare[i] -= moved
+            missing[j] -= moved
+            remaining -= moved
+    return trucks, remaining == 0
+
+
+def primal_heuristic(E_relaxed, p, cap, dem, l, score):
+    """Rendre réalisable une solution relâchée.
+
+    Les entrepôts ouverts par la relaxation sont complétés, par `score`
+    croissant, jusqu'à couvrir la demande totale ; les camions sont ensuite
+    affectés et les entrepôts restés vides sont fermés.
+    """
+    E = E_relaxed.copy()
+    for i in np.argsort(score):
+        if cap[E].sum() >= dem.sum():
+            break
+        E[i] = True
+
+    opened = np.flatnonzero(E)
+    trucks_open, feasible = greedy_transport(cap[opened], dem, l[opened])
+    if not feasible:
+        return None, None, np.inf
+
+    trucks = np.zeros(l.shape, dtype=np.int64)
+    trucks[opened] = trucks_open
+    E = trucks.sum(axis=1) > 0
+    return E, trucks, float(p[E].sum() + (l[opened] * trucks_open).sum())
+
+
+def polish(E, p, cap, dem, l):
+    """Réaffecter les camions de façon optimale entre les entrepôts ouverts E."""
+    opened = np.flatnonzero(E)
+    l_open = l[opened]
+    _, _, trucks_open, _, _ = solve_transport(cap[opened], dem, l_open)
+    trucks = np.zeros(l.shape, dtype=np.int64)
+    trucks[opened] = trucks_open
+    E = trucks.sum(axis=1) > 0
+    return E, trucks, float(p[E].sum() + (l_open * trucks_open).sum())
+
+
+# ============================================================================ #
+#                               SOLVE WITH DATA                                #
+# ============================================================================ #
+def solve(p, c, d, l, C, max_iter=300, gap=1e-4, time_limit=None, workers=None, patience=10, verbose=True):
+    """Optimisation sous-gradient des multiplicateurs des lignes de demande.
+
+    Retourne la meilleure solution réalisable (E, c_ij), la borne inférieure,
+    la borne supérieure et l'historique (itération, borne inf., borne sup., écart).
+    """
+    start = time.perf_counter()
+    p = np.asarray(p, dtype=float)
+    # l garde son type (matrice projetée en int64) : pas de copie, les blocs
+    # de lignes sont convertis au fil des calculs
+    l = np.asarray(l)
+    cap = np.asarray(c) // C
+    dem = np.asarray(d) // C
+    blocks = row_blocks(len(p))
+
+    if cap.sum() < dem.sum():
+        raise ValueError('Capacité totale des entrepôts inférieure à la demande totale')
+
+    # Multiplicateurs initiaux : coût d'un camion depuis l'entrepôt le moins cher
+    truck_cost = p / np.maximum(cap, 1)
+    u = np.min([(l[rows] + truck_cost[rows, None]).min(axis=0) for rows in blocks], axis=0)
+    theta = 2.0
+    lower_bound, upper_bound, best_greedy = -np.inf, np.inf, np.inf
+    best_E, best_trucks = None, None
+    history = []
+    stall = 0
+    evaluated = set()  # ensembles ouverts déjà passés à l'heuristique
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for iteration in range(1, max_iter + 1):
+            E_relaxed, trucks_relaxed, value = solve_relaxation(p, cap, dem, l, u, pool)
+
+            # Borne inférieure : les coûts étant entiers, elle peut être arrondie
+            if value > lower_bound + 1e-9:
+                lower_bound, stall = value, 0
+            else:
+                stall += 1
+
+            # Borne supérieure : heuristique primale sur la solution relâchée,
+            # seulement pour un ensemble d'entrepôts ouverts encore jamais vu
+            key = E_relaxed.tobytes()
+            if key not in evaluated:
+                evaluated.add(key)
+                best_reduced = np.concatenate([(l[rows] - u).min(axis=1) for rows in blocks])
+                score = (p + best_reduced.clip(max=0) * cap) / np.maximum(cap, 1)
+                E, trucks, cost = primal_heuristic(E_relaxed, p, cap, dem, l, score)
+                if cost < best_greedy:
+                    best_greedy = cost
+                    E, trucks, cost = polish(E, p, cap, dem, l)
+                    if cost < upper_bound:
+                        upper_bound, best_E, best_trucks = cost, E, trucks
+
+            current_gap = (upper_bound - np.ceil(lower_bound - 1e-6)) / upper_bound
+            history.append((iteration, lower_bound, upper_bound, current_gap))
+            if verbose:
+                print(f'{iteration:5d}  borne inf. {lower_bound:14.2f}  '
+                      f'borne sup. {upper_bound:14.2f}  écart {100 * current_gap:7.3f} %')
+
+            if current_gap <= gap or (time_limit is not None and time.perf_counter() - start > time_limit):
+                break
+
+            # Pas de Polyak, divisé par deux quand la borne stagne
+            if stall >= patience:
+                theta, stall = theta / 2, 0
+                if theta < 1e-4:
+                    break
+            subgradient = dem - trucks_relaxed.sum(axis=0)
+            norm = float(subgradient @ subgradient)
+            if norm == 0:
+                break  # la solution relâchée est réalisable et optimale
+            u = np.maximum(0, u + theta * (upper_bound - value) / norm * subgradient)
+
+    return best_E.astype(np.int64), best_trucks, lower_bound, upper_bound, history
+
+
+# ============================================================================ #
+#                                   UTILITIES                                  #
+# ============================================================================ #
+def print_log_output(E, c_ij, lower_bound, upper_bound, history, elapsed):
+    print()
+    print('-' * 40)
+    print('Statistiques')
+    print('-' * 40)
+    print()
+    print(f'Itérations: {len(history)}')
+    print(f'Temps de résolution: {elapsed:.3f} s')
+    print(f'Borne inférieure: {lower_bound}')
+    print(f'Borne supérieure: {upper_bound}')
+    print(f'Écart: {100 * history[-1][3]:.3f} %')
+    print(f'Entrepôts loués: {int(E.sum())} / {len(E)}')
+
+
+if __name__ == '__main__':
+    for instance in (default_instance(), generate_instance(300, 200, seed=0)):
+        start = time.perf_counter()
+        result = solve(*instance)
+        print_log_output(*result, time.perf_counter() - start)
@@ -0,0 +1,183 @@
+"""Modèle matriciel de la question 3 : le fichier MPS est écrit directement
+depuis les tableaux NumPy, sans créer d'objets `LpVariable`. Les tableaux
+peuvent être projetés en mémoire (`instances.load_instance`) : ils sont lus
+bloc par bloc, sans copie. L'exécutable et les options de CBC viennent de
+`backends.get_solver` (configuration partagée de `solve_config`)."""
+
+import argparse
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from instances import default_instance, load_instance
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common import backends, solve_config
+
+
+# ============================================================================ #
+#                                  SET MODEL                                   #
+# ============================================================================ #
+def write_mps(path, p, c, d, l, C, chunk_size=256):
+    """Écrire le modèle de la question 3 au format MPS, par blocs d'entrepôts.
+
+    Les colonnes sont écrites dans l'ordre E_0, c_0_0, ..., c_0_{m-1}, E_1, ...
+    Seul un bloc de `chunk_size` entrepôts est converti en texte à la fois.
+    """
+    # np.asarray garde les tableaux projetés tels quels (pas de copie)
+    p = np.asarray(p)
+    l = np.asarray(l)
+    cap = np.asarray(c) // C
+    dem = np.asarray(d) // C
+    n, m = l.shape
+
+    with open(path, 'w') as f:
+        # -------------------------------------------------------------------- #
+        # Lignes : objectif, capacités des entrepôts, demandes des zones
+        # -------------------------------------------------------------------- #
+        f.write('NAME          ENTREPOTS\nROWS\n N  COUT\n')
+        f.writelines(f' L  CAP_{i}\n' for i in range(n))
+        f.writelines(f' G  DEM_{j}\n' for j in range(m))
+
+        # -------------------------------------------------------------------- #
+        # Colonnes : toutes entières, écrites bloc par bloc
+        # -------------------------------------------------------------------- #
+        f.write('COLUMNS\n')
+        f.write("    MARKER  'MARKER'  'INTORG'\n")
+        for start in range(0, n, chunk_size):
+            lines = []
+            for i in range(start, min(start + chunk_size, n)):
+                lines.append(f'    E_{i}  COUT  {p[i].item()}  CAP_{i}  {-cap[i].item()}\n')
+                lines.extend(
+                    f'    c_{i}_{j}  COUT  {cost}  CAP_{i}  1\n    c_{i}_{j}  DEM_{j}  1\n'
+                    for j, cost in enumerate(l[i].tolist())
+                )
+            f.writelines(lines)
+        f.write("    MARKER  'MARKER'  'INTEND'\n")
+
+        # -------------------------------------------------------------------- #
+        # Second membre : demandes des zones en camions
+        # -------------------------------------------------------------------- #
+        f.write('RHS\n')
+        f.writelines(f'    RHS  DEM_{j}  {v}\n' for j, v in enumerate(dem.tolist()))
+
+        # -------------------------------------------------------------------- #
+        # Bornes : E binaires, camions entiers positifs sans borne supérieure
+        # -------------------------------------------------------------------- #
+        f.write('BOUNDS\n')
+        for start in range(0, n, chunk_size):
+            lines = []
+            for i in range(start, min(start + chunk_size, n)):
+                lines.append(f' BV BND  E_{i}\n')
+                lines.extend(f' PL BND  c_{i}_{j}\n' for j in range(m))
+            f.writelines(lines)
+        f.write('ENDATA\n')
+
+
+def read_solution(path, n, m):
+    """Lire le fichier solution de CBC et le ramener à des tableaux.
+
+    Retourne le statut, la valeur de l'objectif, le vecteur E (n,) et la
+    matrice des camions (n, m), de même forme que `c_ij` dans question3.py.
+    """
+    E = np.zeros(n, dtype=np.int64)
+    c_ij = np.zeros((n, m), dtype=np.int64)
+
+    with open(path) as f:
+        header = f.readline().split()
+        status = header[0]
+        objective = float(header[-1]) if header[-2:-1] == ['value'] else None
+        for line in f:
+            fields = line.split()
+            if fields[0] == '**':  # solution non réalisable
+                fields = fields[1:]
+            name, value = fields[1], round(float(fields[2]))
+            if name.startswith('E_'):
+                E[int(name[2:])] = value
+            elif name.startswith('c_'):
+                i, j = name[2:].split('_')
+                c_ij[int(i), int(j)] = value
+
+    # Même vocabulaire que LpStatus
+    status = {'Stopped': 'Not Solved', 'Integer': 'Infeasible'}.get(status, status)
+    if header[:2] == ['Stopped', 'on'] and objective is not None:
+        status = 'Optimal'  # meilleure solution entière trouvée avant la limite
+    return status, objective, E, c_ij
+
+
+# ============================================================================ #
+#                               SOLVE WITH DATA                                #
+# ============================================================================ #
+def cbc_options(solver):
+    """Options de la ligne de commande de CBC pour le solveur PuLP `solver`,
+    comme les écrit `PULP_CBC_CMD`."""
+    options = []
+    if solver.timeLimit is not None:
+        options += ['-sec', str(solver.timeLimit)]
+    if solver.optionsDict.get('presolve') is not None:
+        options += ['-presolve', 'on' if solver.optionsDict['presolve'] else 'off']
+    if solver.optionsDict.get('cuts') is not None:
+        options += ['-gomory', 'on', '-knapsack', 'on', '-probing', 'on'] if solver.optionsDict['cuts'] else ['-cuts', 'off']
+    for option in solver.options + solver.getOptions():
+        options += ['-' + option.split()[0], *option.split()[1:]]
+    return options
+
+
+def solve(p, c, d, l, C, log_path=Path('./matrix_model.log'), chunk_size=256, work_dir=None):
+    """Résoudre l'instance avec CBC à partir des tableaux, sans passer par PuLP."""
+    l = np.asarray(l)
+    n, m = l.shape
+
+    with tempfile.TemporaryDirectory(dir=work_dir) as tmp:
+        mps_path = Path(tmp) / 'entrepots.mps'
+        sol_path = Path(tmp) / 'entrepots.sol'
+        write_mps(mps_path, p, c, d, l, C, chunk_size=chunk_size)
+
+        # -printingOptions normal : seules les valeurs non nulles sont écrites
+        solver = backends.get_solver('cbc', portfolio=False, timeMode='elapsed')
+        args = [solver.path, str(mps_path), *cbc_options(solver),
+                '-branch', '-printingOptions', 'normal', '-solution', str(sol_path)]
+        with open(log_path, 'w') as log:
+            subprocess.run(args, stdout=log, stderr=log, stdin=subprocess.DEVNULL, check=True)
+
+        return read_solution(sol_path, n, m)
+
+
+# ============================================================================ #
+#                                   UTILITIES                                  #
+# ============================================================================ #
+def print_log_output(status, objective, E, c_ij):
+    print()
+    print('-' * 40)
+    print('Statistiques')
+    print('-' * 40)
+    print()
+    print(f'Nombre de variables: {E.size + c_ij.size}')
+    print(f'Nombre de contraintes: {c_ij.shape[0] + c_ij.shape[1]}')
+    print()
+
+    print(f'Statut de la solution: {status}')
+    print(f'Valeur de la fonction objectif: {objective}')
+
+    print()
+    print('-' * 40)
+    print("Valeurs des variables")
+    print('-' * 40)
+    print()
+    for i in range(c_ij.shape[0]):
+        print(f'Entrepôt {i+1} loué (E_{i+1}): {E[i]}')
+        for j in np.flatnonzero(c_ij[i]).tolist():
+            print(f'Camions de E{i+1} vers Z{j+1} (c_{i+1}_{j+1}): {c_ij[i, j]}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Résoudre une instance avec le modèle matriciel.")
+    parser.add_argument('--instance', type=Path, help="répertoire d'une instance (défaut : question 3)")
+    solve_config.add_arguments(parser)
+    args = parser.parse_args()
+
+    instance = load_instance(args.instance) if args.instance else default_instance()
+    print_log_output(*solve(*instance))
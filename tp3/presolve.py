@@ -0,0 +1,246 @@
+"""Présolve du modèle de la question 3, avant la construction du modèle.
+
+Réductions, toutes en camions (cap_i = c_i // C, dem_j = d_j // C) :
+    - bornes c_ij <= min(cap_i, dem_j) ;
+    - entrepôts de capacité nulle retirés ;
+    - dominance : k domine i si p_k <= p_i, cap_k >= cap_i et l_kj <= l_ij
+      pour toute zone j (égalités départagées par l'indice). Remplacer i par
+      k ne coûte jamais plus, donc il existe une solution optimale avec
+      E_i <= E_k ; si cap_k couvre à lui seul la demande totale, k peut aussi
+      absorber les livraisons de i déjà ouvert, et i est retiré ;
+    - E_i = 1 quand les autres entrepôts ne couvrent pas la demande totale ;
+    - instance non réalisable si la capacité totale ne couvre pas la demande.
+
+Les variables gardent les indices d'origine (E_i, c_i_j).
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from pulp import LpMinimize, LpProblem, LpStatus, LpVariable, lpSum, value
+
+import question3
+from instances import default_instance, generate_instance
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common import backends, solve_config
+
+
+# ============================================================================ #
+#                                   PRESOLVE                                   #
+# ============================================================================ #
+def presolve(p, c, d, l, C=question3.C):
+    """Réduire l'instance ; retourne un dict décrivant les réductions.
+
+    Clés : `status` ('Infeasible' ou None), `kept` (indices d'origine des
+    entrepôts gardés), `fixed_open`, `implications` [(i, k) : E_i <= E_k],
+    `upper` (bornes des c_ij, lignes de `kept`), `cap`, `dem` et `removed`
+    ({'capacity_zero': [...], 'dominated': [...]}).
+    """
+    p = np.asarray(p)
+    l = np.asarray(l)
+    cap = np.asarray(c) // C
+    dem = np.asarray(d) // C
+    n = len(p)
+    total = dem.sum()
+
+    result = {'status': None, 'cap': cap, 'dem': dem, 'kept': [], 'fixed_open': [],
+              'implications': [], 'upper': None, 'removed': {'capacity_zero': [], 'dominated': []}}
+    if cap.sum() < total:
+        result['status'] = 'Infeasible'
+        return result
+
+    # ------------------------------------------------------------------------ #
+    # Entrepôts inutiles : capacité nulle
+    # ------------------------------------------------------------------------ #
+    alive = cap > 0
+    result['removed']['capacity_zero'] = np.flatnonzero(~alive).tolist()
+
+    # ------------------------------------------------------------------------ #
+    # Dominance
+    # ------------------------------------------------------------------------ #
+    for i in np.flatnonzero(alive).tolist():
+        # Filtre sur le loyer et la capacité avant de comparer les lignes de l
+        candidates = np.flatnonzero(alive & (p <= p[i]) & (cap >= cap[i]))
+        candidates = candidates[candidates != i]
+        if not candidates.size:
+            continue
+        candidates = candidates[(l[candidates] <= l[i]).all(axis=1)]
+        # Entrepôts identiques : seul le plus petit indice domine
+        identical = (p[candidates] == p[i]) & (cap[candidates] == cap[i]) & (l[candidates] == l[i]).all(axis=1)
+        candidates = candidates[~identical | (candidates < i)]
+        if not candidates.size:
+            continue
+
+        if cap[candidates].max() >= total:
+            alive[i] = False
+            result['removed']['dominated'].append(i)
+        else:
+            result['implications'].append((i, int(candidates[cap[candidates].argmax()])))
+
+    # Implications dont i ou k a été retiré comme dominé par un entrepôt de
+    # loyer moindre, de capacité couvrant la demande totale et de coûts
+    # moindres : retirées. Si k est retiré, l'entrepôt qui domine k domine
+    # aussi i (transitivité), et i est retiré lui aussi.
+    kept = np.flatnonzero(alive)
+    result['kept'] = kept.tolist()
+    result['implications'] = [(i, k) for i, k in result['implications'] if alive[i] and alive[k]]
+
+    # ------------------------------------------------------------------------ #
+    # Entrepôts indispensables
+    # ------------------------------------------------------------------------ #
+    kept_capacity = cap[kept].sum()
+    result['fixed_open'] = [i for i in kept.tolist() if kept_capacity - cap[i] < total]
+
+    # ------------------------------------------------------------------------ #
+    # Bornes des livraisons
+    # ------------------------------------------------------------------------ #
+    result['upper'] = np.minimum(cap[kept][:, None], dem[None, :])
+    return result
+
+
+# ============================================================================ #
+#                                  SET MODEL                                   #
+# ============================================================================ #
+def set_model(p, l, reduced):
+    """Modèle de la question 3 sur l'instance réduite par `presolve`."""
+    kept = reduced['kept']
+    cap, dem, upper = reduced['cap'], reduced['dem'], reduced['upper']
+    m = len(dem)
+
+    prob = LpProblem(name='minimisation_probleme', sense=LpMinimize)
+
+    # ------------------------------------------------------------------------ #
+    # Variables de décision
+    # ------------------------------------------------------------------------ #
+    fixed = set(reduced['fixed_open'])
+    E = {i: LpVariable(f'E_{i}', lowBound=int(i in fixed), upBound=1, cat='Integer') for i in kept}
+    c_ij = {
+        i: [LpVariable(f'c_{i}_{j}', lowBound=0, upBound=int(upper[row, j]), cat='Integer') for j in range(m)]
+        for row, i in enumerate(kept)
+    }
+
+    # ------------------------------------------------------------------------ #
+    # Fonction objectif
+    # ------------------------------------------------------------------------ #
+    prob += lpSum(int(p[i]) * E[i] for i in kept) + lpSum(
+        int(l[i][j]) * c_ij[i][j] for i in kept for j in range(m)), "Coût total"
+
+    # ------------------------------------------------------------------------ #
+    # Contraintes
+    # ------------------------------------------------------------------------ #
+    # Contrainte de capacité des entrepôts
+    for i in kept:
+        prob += lpSum(c_ij[i]) <= int(cap[i]) * E[i], f"Capacité_entrepôt_{i}"
+
+    # Contrainte de demande des zones
+    for j in range(m):
+        prob += lpSum(c_ij[i][j] for i in kept) >= int(dem[j]), f"Demande_zone_{j}"
+
+    # Dominance : i n'est loué que si k l'est
+    for i, k in reduced['implications']:
+        prob += E[i] <= E[k], f"Dominance_{i}_{k}"
+
+    return prob, E, c_ij
+
+
+# ============================================================================ #
+#                               SOLVE WITH DATA                                #
+# ============================================================================ #
+def solve(p, c, d, l, C=question3.C, log_path=Path('./presolve.log')):
+    """Présolve puis résolution ; retourne le statut, l'objectif, E (n,),
+    les camions (n, m) et le dict des réductions."""
+    p = np.asarray(p)
+    l = np.asarray(l)
+    n, m = l.shape
+    E_val = np.zeros(n, dtype=np.int64)
+    trucks = np.zeros((n, m), dtype=np.int64)
+
+    reduced = presolve(p, c, d, l, C)
+    if reduced['status'] == 'Infeasible':
+        return 'Infeasible', None, E_val, trucks, reduced
+
+    prob, E, c_ij = set_model(p, l, reduced)
+    prob.solve(backends.get_solver(msg=False, logPath=log_path))
+
+    for i, var in E.items():
+        E_val[i] = round(var.varValue or 0)
+        trucks[i] = [round(x.varValue or 0) for x in c_ij[i]]
+    return LpStatus[prob.status], value(prob.objective), E_val, trucks, reduced
+
+
+# ============================================================================ #
+#                                  BENCHMARK                                   #
+# ============================================================================ #
+def benchmark(sizes, seed=0):
+    """Temps de construction et de résolution avec et sans présolve."""
+    for n, m in sizes:
+        p, c, d, l, C = generate_instance(n, m, seed=seed)
+
+        start = time.perf_counter()
+        prob, _, _ = question3.set_model(p.tolist(), c.tolist(), d.tolist(), l.tolist())
+        built = time.perf_counter()
+        prob.solve(backends.get_solver(msg=False, logPath=Path('./presolve_sans.log')))
+        raw = (built - start, time.perf_counter() - built, value(prob.objective))
+
+        start = time.perf_counter()
+        reduced = presolve(p, c, d, l, C)
+        prob, _, _ = set_model(p, l, reduced)
+        built = time.perf_counter()
+        prob.solve(backends.get_solver(msg=False, logPath=Path('./presolve_avec.log')))
+        presolved = (built - start, time.perf_counter() - built, value(prob.objective))
+
+        print(f'{n} x {m} : {report(reduced, n)}')
+        print(f'    sans présolve : construction {raw[0]:.3f} s, résolution {raw[1]:.3f} s, objectif {raw[2]}')
+        print(f'    avec présolve : construction {presolved[0]:.3f} s, résolution {presolved[1]:.3f} s, '
+              f'objectif {presolved[2]} (accélération x{(raw[0] + raw[1]) / (presolved[0] + presolved[1]):.2f})')
+
+
+# ============================================================================ #
+#                                   UTILITIES                                  #
+# ============================================================================ #
+def report(reduced, n):
+    """Résumé des réductions."""
+    if reduced['status'] == 'Infeasible':
+        return 'non réalisable (capacité totale < demande totale)'
+    removed = reduced['removed']
+    return (f"{len(reduced['kept'])}/{n} entrepôts gardés, "
+            f"{len(removed['capacity_zero'])} de capacité nulle, {len(removed['dominated'])} dominés, "
+            f"{len(reduced['implications'])} implications, {len(reduced['fixed_open'])} loués d'office, "
+            f"{int((reduced['upper'] < reduced['cap'][reduced['kept']][:, None]).sum())} bornes c_ij resserrées")
+
+
+def print_log_output(status, objective, E, c_ij, reduced):
+    print()
+    print('-' * 40)
+    print('Statistiques')
+    print('-' * 40)
+    print()
+    print(f'Présolve: {report(reduced, len(E))}')
+    print()
+    print(f'Statut de la solution: {status}')
+    print(f'Valeur de la fonction objectif: {objective}')
+
+    print()
+    print('-' * 40)
+    print("Valeurs des variables")
+    print('-' * 40)
+    print()
+    for i in range(c_ij.shape[0]):
+        print(f'Entrepôt {i+1} loué (E_{i+1}): {E[i]}')
+        for j in np.flatnonzero(c_ij[i]).tolist():
+            print(f'Camions de E{i+1} vers Z{j+1} (c_{i+1}_{j+1}): {c_ij[i, j]}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Présolve du modèle de la question 3.")
+    parser.add_argument('--seed', type=int, default=0, help='graine des instances du benchmark')
+    solve_config.add_arguments(parser)
+    args = parser.parse_args()
+
+    print_log_output(*solve(*default_instance()))
+    print()
+    benchmark([(20, 15), (40, 30), (60, 40), (100, 60)], seed=args.seed)
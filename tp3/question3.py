@@ -1,5 +1,11 @@
+import re
+import sys
+import time
 from pathlib import Path
-from pulp import PULP_CBC_CMD, LpMinimize, LpProblem, LpStatus, LpVariable, lpSum
+from pulp import LpMinimize, LpProblem, LpStatus, LpVariable, lpSum
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common import backends, instrumentation, integrality, solution_export
 
 # Données du problème
 C = 10  # Capacité d'un camion en m³
@@ -22,6 +28,12 @@ l = [
     [10, 20, 31]
 ]
 
+# Première solution entière trouvée par CBC : "... (0.01 seconds)"
+INCUMBENT = re.compile(r'Cbc0012I Integer solution of \S+ found by .*\(([\d.]+) seconds\)')
+
+# Formulations de set_model
+FORMULATIONS = ('aggregated', 'strong', 'lazy')
+
 # Nombre d'entrepôts et de zones
 n = len(p)  # Nombre d'entrepôts
 p_zones = len(d)  # Nombre de zones
@@ -29,7 +41,30 @@ p_zones = len(d)  # Nombre de zones
 # ============================================================================ #
 #                                  SET MODEL                                   #
 # ============================================================================ #
-def set_model():
+def set_model(p=p, c=c, d=d, l=l, formulation='aggregated'):
+    """Modèle de localisation d'entrepôts.
+
+    `formulation` :
+        'aggregated'  capacité agrégée somme_j c_ij <= cap_i * E_i seulement
+        'strong'      plus les liens c_ij <= min(cap_i, dem_j) * E_i et la
+                      couverture somme_i cap_i * E_i >= demande totale
+        'lazy'        plus la couverture seulement. Les liens sont ajoutés
+                      ensuite par formulations.separate, qui résout la
+                      relaxation à la racine et ajoute les liens violés
+                      jusqu'à ce qu'il n'y en ait plus, avant la résolution
+                      entière : ce n'est pas un rappel de contraintes
+                      paresseuses, aucun lien n'est ajouté pendant le
+                      branch-and-bound.
+
+    Lève ValueError pour une autre valeur de `formulation`.
+    """
+    if formulation not in FORMULATIONS:
+        raise ValueError(f"formulation {formulation!r} inconnue, attendu : {', '.join(FORMULATIONS)}")
+
+    with instrumentation.phase('data'):
+        n = len(p)  # Nombre d'entrepôts
+        p_zones = len(d)  # Nombre de zones
+
     # ------------------------------------------------------------------------ #
     # Problème de minimisation
     # ------------------------------------------------------------------------ #
@@ -38,28 +73,42 @@ def set_model():
     # ------------------------------------------------------------------------ #
     # Variables de décision
     # ------------------------------------------------------------------------ #
-    # Variables binaires pour indiquer si un entrepôt est loué ou non
-    E = [LpVariable(f'E_{i}', cat='Binary') for i in range(n)]
+    with instrumentation.phase('variables'):
+        # Variables binaires pour indiquer si un entrepôt est loué ou non
+        E = [LpVariable(f'E_{i}', cat='Binary') for i in range(n)]
 
-    # Variables entières pour le nombre de camions utilisés pour chaque livraison
-    c_ij = [[LpVariable(f'c_{i}_{j}', lowBound=0, cat='Integer') for j in range(p_zones)] for i in range(n)]
+        # Variables entières pour le nombre de camions utilisés pour chaque livraison
+        c_ij = [[LpVariable(f'c_{i}_{j}', lowBound=0, cat='Integer') for j in range(p_zones)] for i in range(n)]
 
     # ------------------------------------------------------------------------ #
     # Fonction objectif
     # ------------------------------------------------------------------------ #
-    # Minimiser la somme des coûts de location et des coûts de transport
-    prob += lpSum(p[i] * E[i] for i in range(n)) + lpSum(l[i][j] * c_ij[i][j] for i in range(n) for j in range(p_zones)), "Coût total"
+    with instrumentation.phase('objective'):
+        # Minimiser la somme des coûts de location et des coûts de transport
+        prob += lpSum(p[i] * E[i] for i in range(n)) + lpSum(l[i][j] * c_ij[i][j] for i in range(n) for j in range(p_zones)), "Coût total"
 
     # ------------------------------------------------------------------------ #
     # Contraintes
     # ------------------------------------------------------------------------ #
-    # Contrainte de capacité des entrepôts
-    for i in range(n):
-        prob += lpSum(c_ij[i][j] for j in range(p_zones)) <= (c[i] // C) * E[i], f"Capacité_entrepôt_{i}"
+    with instrumentation.phase('constraints'):
+        # Contrainte de capacité des entrepôts
+        for i in range(n):
+            prob += lpSum(c_ij[i][j] for j in range(p_zones)) <= (c[i] // C) * E[i], f"Capacité_entrepôt_{i}"
 
-    # Contrainte de demande des zones
-    for j in range(p_zones):
-        prob += lpSum(c_ij[i][j] for i in range(n)) >= (d[j] // C), f"Demande_zone_{j}"
+        # Contrainte de demande des zones
+        for j in range(p_zones):
+            prob += lpSum(c_ij[i][j] for i in range(n)) >= (d[j] // C), f"Demande_zone_{j}"
+
+        # Formulation forte : couverture de la demande par les entrepôts loués
+        if formulation in ('strong', 'lazy'):
+            total = sum(d[j] // C for j in range(p_zones))
+            prob += lpSum((c[i] // C) * E[i] for i in range(n)) >= total, "Couverture"
+
+        # Formulation forte : liens entre chaque livraison et son entrepôt
+        if formulation == 'strong':
+            for i in range(n):
+                for j in range(p_zones):
+                    prob += c_ij[i][j] <= min(c[i] // C, d[j] // C) * E[i], f"Lien_{i}_{j}"
 
     # Retourner le problème et les variables de décision
     return prob, E, c_ij
@@ -68,22 +117,158 @@ def set_model():
 # ============================================================================ #
 #                               SOLVE WITH DATA                                #
 # ============================================================================ #
-def solve():
+def solve(p=p, c=c, d=d, l=l, previous=None, log_path=Path('./question3.log'), formulation='aggregated',
+          backend=None, cache_mode=None):
+    """Résoudre la question 3, à partir de la solution `previous` (E, c_ij)
+    si elle est donnée.
+
+    `backend` et `cache_mode` sont passés à `backends.get_solver` et au
+    cache de solutions (par défaut : PL_BACKEND et PL_CACHE).
+    `prob.warm_start` donne le coût de la solution de départ réparée (None à
+    froid, si la demande ne peut pas être couverte ou si la réparation
+    échoue), le temps de résolution et le temps de la première solution
+    entière de CBC (None quand CBC n'a pas écrit `log_path` pendant cet
+    appel : solution en cache, autre solveur ou portefeuille).
+    """
     # ------------------------------------------------------------------------ #
     # Résoudre le problème
     # ------------------------------------------------------------------------ #
-    prob, E, c_ij = set_model()
-    prob.solve(PULP_CBC_CMD(msg=False, logPath=Path('./question3.log')))
+    with instrumentation.phase('build'):
+        prob, E, c_ij = set_model(p, c, d, l, formulation)
+
+    # Solution précédente (E, c_ij) : réparée puis donnée à CBC comme MIP start
+    start_cost = None
+    if previous is not None:
+        E_start, c_start = repair_solution(*previous, p, c, d, l)
+        # Une solution réparée non réalisable n'est pas donnée à CBC
+        if is_feasible(E_start, c_start, c, d):
+            start_cost = (sum(p[i] * E_start[i] for i in range(len(p)))
+                          + sum(l[i][j] * c_start[i][j] for i in range(len(p)) for j in range(len(d))))
+            for i, var in enumerate(E):
+                var.setInitialValue(E_start[i])
+                for j, truck_var in enumerate(c_ij[i]):
+                    truck_var.setInitialValue(c_start[i][j])
+
+    # Journal d'un appel précédent : supprimé pour ne pas être relu
+    log_path = Path(log_path)
+    log_path.unlink(missing_ok=True)
+
+    with instrumentation.phase('solve'):
+        solver = backends.get_solver(backend, msg=False, logPath=log_path, warmStart=start_cost is not None)
+        # Les camions forment un bloc de transport : relâchés quand E est entier
+        begin = time.perf_counter()
+        integrality.solve(prob, instrumentation.instrument(prob, solver), cache_mode=cache_mode)
+        elapsed = time.perf_counter() - begin
+
+    prob.warm_start = {'start': start_cost, 'time': elapsed, 'first_solution': first_solution(log_path)}
 
     # ------------------------------------------------------------------------ #
     # Afficher les résultats
     # ------------------------------------------------------------------------ #
-    print_log_output(prob, E, c_ij)
+    with instrumentation.phase('report'):
+        print_log_output(prob, E, c_ij)
+    # Une fois la phase 'report' fermée, pour que son temps soit affiché
+    instrumentation.print_stats()
+    solution_export.save(prob)
+    instrumentation.export(model='question3')
+
+    return prob, E, c_ij
 
 
 # ============================================================================ #
 #                                   UTILITIES                                  #
 # ============================================================================ #
+def repair_solution(E_prev, c_prev, p=p, c=c, d=d, l=l):
+    """Rendre une solution précédente réalisable pour les données actuelles.
+
+    Les camions en trop (capacité ou demande dépassée) sont retirés des
+    livraisons les plus chères, les demandes non couvertes sont complétées
+    depuis les entrepôts les moins chers, en louant un entrepôt si besoin.
+    """
+    n, p_zones = len(p), len(d)
+    cap = [c[i] // C for i in range(n)]
+    dem = [d[j] // C for j in range(p_zones)]
+
+    # Valeurs précédentes, ramenées aux dimensions actuelles
+    trucks = [[0] * p_zones for _ in range(n)]
+    for i in range(min(n, len(c_prev))):
+        for j in range(min(p_zones, len(c_prev[i]))):
+            trucks[i][j] = max(0, round(_value(c_prev[i][j])))
+    E_start = [int(i < len(E_prev) and round(_value(E_prev[i])) == 1) for i in range(n)]
+
+    # Capacités dépassées : retirer les livraisons les plus chères
+    for i in range(n):
+        excess = sum(trucks[i]) - cap[i] * E_start[i]
+        if excess <= 0:
+            continue
+        for j in sorted(range(p_zones), key=lambda j: -l[i][j]):
+            removed = min(excess, trucks[i][j])
+            trucks[i][j] -= removed
+            excess -= removed
+            if excess <= 0:
+                break
+
+    # Demandes dépassées : retirer les livraisons les plus chères
+    for j in range(p_zones):
+        excess = sum(trucks[i][j] for i in range(n)) - dem[j]
+        if excess <= 0:
+            continue
+        for i in sorted(range(n), key=lambda i: -l[i][j]):
+            removed = min(excess, trucks[i][j])
+            trucks[i][j] -= removed
+            excess -= removed
+            if excess <= 0:
+                break
+
+    # Demandes non couvertes : compléter depuis les entrepôts les moins chers
+    spare = [cap[i] * E_start[i] - sum(trucks[i]) for i in range(n)]
+    for j in range(p_zones):
+        missing = dem[j] - sum(trucks[i][j] for i in range(n))
+        while missing > 0:
+            opened = [i for i in range(n) if E_start[i] and spare[i] > 0]
+            if opened:
+                i = min(opened, key=lambda i: l[i][j])
+            else:
+                closed = [i for i in range(n) if not E_start[i] and cap[i] > 0]
+                if not closed:
+                    break  # capacité totale insuffisante
+                i = min(closed, key=lambda i: p[i] / cap[i] + l[i][j])
+                E_start[i] = 1
+                spare[i] = cap[i]
+                continue
+            added = min(missing, spare[i])
+            trucks[i][j] += added
+            spare[i] -= added
+            missing -= added
+
+    # Entrepôts loués sans livraison : ne plus les louer
+    for i in range(n):
+        if E_start[i] and sum(trucks[i]) == 0:
+            E_start[i] = 0
+
+    return E_start, trucks
+
+
+def is_feasible(E, trucks, c=c, d=d):
+    """Vérifier qu'une solution (E, camions) respecte capacités et demandes."""
+    n, p_zones = len(c), len(d)
+    return (all(trucks[i][j] >= 0 for i in range(n) for j in range(p_zones))
+            and all(sum(trucks[i]) <= (c[i] // C) * E[i] for i in range(n))
+            and all(sum(trucks[i][j] for i in range(n)) >= d[j] // C for j in range(p_zones)))
+
+
+def first_solution(log_path):
+    """Temps de la première solution entière dans le journal de CBC, ou None."""
+    log_path = Path(log_path)
+    match = INCUMBENT.search(log_path.read_text()) if log_path.exists() else None
+    return float(match.group(1)) if match else None
+
+
+def _value(x):
+    """Valeur d'une variable PuLP ou d'un nombre."""
+    return (x.varValue or 0) if hasattr(x, 'varValue') else x
+
+
 def print_log_output(prob, E, c_ij):
     print()
     print('-' * 40)
@@ -97,18 +282,31 @@ def print_log_output(prob, E, c_ij):
     print(f'- (réel) {prob.solutionTime}')
     print(f'- (CPU) {prob.solutionCpuTime}')
     print()
-
+    print(f"Intégralité: {integrality.describe(getattr(prob, 'integrality', None))}")
+    warm_start = getattr(prob, 'warm_start', None)
+    if warm_start is not None and warm_start['start'] is not None:
+        print(f"Démarrage à chaud: solution de départ {warm_start['start']}, "
+              f"première solution à {warm_start['first_solution']} s")
+    print()
     print(f'Statut de la solution: {LpStatus[prob.status]}')
     print(f'Valeur de la fonction objectif: {prob.objective.value()}')
+    costs = solution_export.breakdown(prob.objective, {'Location': E, 'Transport': c_ij})
+    for name, cost in costs.items():
+        print(f'- ({name}) {cost}')
+
+    # Valeurs de toutes les variables : seulement pour les petits modèles
+    # (PL_SUMMARY), les grands sont exportés avec PL_EXPORT
+    if not solution_export.summary_enabled(prob):
+        return
 
     print()
     print('-' * 40)
     print("Valeurs des variables")
     print('-' * 40)
     print()
-    for i in range(n):
+    for i in range(len(E)):
         print(f'Entrepôt {i+1} loué (E_{i+1}): {E[i].varValue}')
-        for j in range(p_zones):
+        for j in range(len(c_ij[i])):
             print(f'Camions de E{i+1} vers Z{j+1} (c_{i+1}_{j+1}): {c_ij[i][j].varValue}')
 
 
@@ -1,5 +1,9 @@
+import sys
 from pathlib import Path
-from pulp import PULP_CBC_CMD, LpMinimize, LpProblem, LpStatus, LpVariable, lpSum
+from pulp import LpMinimize, LpProblem, LpStatus, LpVariable, lpSum
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common import backends, solution_cache
 
 # Données du problème
 C = 10  # Capacité d'un camion en m³
@@ -73,7 +77,7 @@ def solve():
     # Résoudre le problème
     # ------------------------------------------------------------------------ #
     prob, E, c_ij = set_model()
-    prob.solve(PULP_CBC_CMD(msg=False, logPath=Path('./question4.log')))
+    solution_cache.solve(prob, backends.get_solver(msg=False, logPath=Path('./question4.log')))
 
     # ------------------------------------------------------------------------ #
     # Afficher les résultats
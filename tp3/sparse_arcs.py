@@ -0,0 +1,303 @@
+"""Modèle de la question 3 restreint à des arcs candidats (réseau creux).
+
+Seuls les arcs entrepôt -> zone candidats ont une variable c_ij : les k
+entrepôts les moins chers de chaque zone, les arcs de coût au plus `threshold`
+et/ou une liste d'arcs autorisés. Le modèle passe de n*m à environ k*m
+variables de transport.
+
+Vérification par les coûts réduits (`pricing=True`) : la relaxation continue
+du modèle restreint (renforcée par les liens c_ij <= min(cap_i, dem_j) E_i)
+est résolue, et les arcs écartés de coût réduit
+rc_ij = l_ij - pi_cap_i - pi_dem_j < 0 sont ajoutés jusqu'à ce qu'il n'y en
+ait plus ; sa valeur z_LP est alors celle de la relaxation du modèle complet,
+donc une borne inférieure. Toute solution entière du modèle complet coûte au
+moins z_LP + somme rc_ij * c_ij : si le modèle restreint vaut z_R et que tous
+les arcs écartés ont rc_ij >= z_R - z_LP, aucune solution utilisant un arc
+écarté n'est meilleure et z_R est optimal. Sinon, ces arcs sont ajoutés et le
+modèle entier est résolu à nouveau (`prove=True`). Sans preuve, la
+tolérance retournée, max(0, z_R - z_LP - min rc_ij), majore le gain possible
+avec les arcs écartés.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from pulp import LpMinimize, LpProblem, LpStatus, LpVariable, lpSum, value
+
+import question3
+from instances import default_instance, generate_instance
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common import backends, solve_config
+
+
+# ============================================================================ #
+#                                ARCS CANDIDATS                                #
+# ============================================================================ #
+def select_arcs(l, k=None, threshold=None, allowed=None):
+    """Masque (n, m) des arcs candidats.
+
+    Union des k entrepôts les moins chers de chaque zone, des arcs de coût
+    <= `threshold` et des arcs `(i, j)` de `allowed`. Sans critère, k = 5.
+    """
+    l = np.asarray(l)
+    n, m = l.shape
+    if k is None and threshold is None and allowed is None:
+        k = 5
+
+    arcs = np.zeros((n, m), dtype=bool)
+    if k is not None:
+        if k >= n:
+            arcs[:] = True
+        elif k > 0:
+            cheapest = np.argpartition(l, k - 1, axis=0)[:k]
+            arcs[cheapest, np.arange(m)] = True
+    if threshold is not None:
+        arcs |= l <= threshold
+    if allowed is not None:
+        allowed = np.asarray(list(allowed), dtype=np.int64).reshape(-1, 2)
+        arcs[allowed[:, 0], allowed[:, 1]] = True
+    return arcs
+
+
+# ============================================================================ #
+#                                  SET MODEL                                   #
+# ============================================================================ #
+def set_model(p, c, d, l, arcs, C=question3.C, relax=False):
+    """Modèle de la question 3 avec les seules variables c_ij des `arcs`.
+
+    `c_ij` est un dict {(i, j): variable}. Avec `relax`, E et c_ij sont
+    continues (relaxation linéaire) et les contraintes gardent leurs duaux.
+    Les lignes de capacité et de demande sont gardées dans
+    `prob.capacity_rows` et `prob.demand_rows`.
+    """
+    n, m = arcs.shape
+    cap = np.asarray(c) // C
+    dem = np.asarray(d) // C
+
+    prob = LpProblem(name='minimisation_probleme_creux', sense=LpMinimize)
+
+    # ------------------------------------------------------------------------ #
+    # Variables de décision
+    # ------------------------------------------------------------------------ #
+    if relax:
+        E = [LpVariable(f'E_{i}', lowBound=0, upBound=1) for i in range(n)]
+    else:
+        E = [LpVariable(f'E_{i}', cat='Binary') for i in range(n)]
+    cat = 'Continuous' if relax else 'Integer'
+    rows, cols = np.nonzero(arcs)
+    c_ij = {(i, j): LpVariable(f'c_{i}_{j}', lowBound=0, cat=cat) for i, j in zip(rows.tolist(), cols.tolist())}
+
+    # ------------------------------------------------------------------------ #
+    # Fonction objectif
+    # ------------------------------------------------------------------------ #
+    prob += (lpSum(int(p[i]) * E[i] for i in range(n))
+             + lpSum(int(l[i][j]) * var for (i, j), var in c_ij.items())), "Coût total"
+
+    # ------------------------------------------------------------------------ #
+    # Contraintes
+    # ------------------------------------------------------------------------ #
+    by_warehouse = [[] for _ in range(n)]
+    by_zone = [[] for _ in range(m)]
+    for (i, j), var in c_ij.items():
+        by_warehouse[i].append(var)
+        by_zone[j].append(var)
+
+    # Contrainte de capacité des entrepôts
+    prob.capacity_rows = [lpSum(by_warehouse[i]) <= int(cap[i]) * E[i] for i in range(n)]
+    for i, row in enumerate(prob.capacity_rows):
+        prob += row, f"Capacité_entrepôt_{i}"
+
+    # Contrainte de demande des zones
+    prob.demand_rows = [lpSum(by_zone[j]) >= int(dem[j]) for j in range(m)]
+    for j, row in enumerate(prob.demand_rows):
+        prob += row, f"Demande_zone_{j}"
+
+    # Relaxation : liens c_ij <= min(cap_i, dem_j) * E_i, valides pour le
+    # modèle entier et bien plus serrés que la seule capacité
+    if relax:
+        for (i, j), var in c_ij.items():
+            prob += var <= int(min(cap[i], dem[j])) * E[i], f"Lien_{i}_{j}"
+
+    return prob, E, c_ij
+
+
+# ============================================================================ #
+#                               SOLVE WITH DATA                                #
+# ============================================================================ #
+def reduced_costs(prob, l):
+    """Coûts réduits de tous les arcs aux duaux de la relaxation `prob`.
+
+    Les liens des arcs écartés n'existent pas : leur dual vaut 0, et le coût
+    réduit d'un arc écarté ne dépend que des capacités et des demandes. Pour
+    un arc candidat, c'est une borne inférieure (le dual du lien est <= 0).
+    """
+    l = np.asarray(l, dtype=float)
+    pi_cap = np.array([row.pi or 0.0 for row in prob.capacity_rows])
+    pi_dem = np.array([row.pi or 0.0 for row in prob.demand_rows])
+    return l - pi_cap[:, None] - pi_dem[None, :]
+
+
+def solve(p, c, d, l, C=question3.C, k=None, threshold=None, allowed=None, pricing=True,
+          prove=True, tol=1e-6, max_rounds=50, log_path=Path('./sparse_arcs.log')):
+    """Résoudre le modèle restreint aux arcs candidats.
+
+    Avec `prove`, les arcs écartés qui pourraient encore améliorer la
+    solution sont ajoutés jusqu'à la preuve d'optimalité ; sinon, le modèle
+    entier n'est résolu qu'une fois.
+
+    Retourne un dict : statut, objectif, borne inférieure `bound` (avec
+    `pricing`), écart `gap` = objectif - borne, `tolerance` (amélioration
+    maximale possible avec les arcs écartés), `proven`, nombre d'arcs, E (n,)
+    et camions (n, m).
+    """
+    l = np.asarray(l)
+    n, m = l.shape
+    arcs = select_arcs(l, k, threshold, allowed)
+    k_now = k or 5
+    solver = backends.get_solver(msg=False, logPath=log_path)
+
+    def expand():
+        # Modèle restreint non réalisable : plus d'entrepôts par zone
+        nonlocal arcs, k_now
+        k_now *= 2
+        arcs |= select_arcs(l, k=k_now)
+
+    # ------------------------------------------------------------------------ #
+    # Relaxation : ajouter les arcs de coût réduit négatif
+    # ------------------------------------------------------------------------ #
+    bound, rc = None, None
+    rounds = 0
+    while pricing and rounds < max_rounds:
+        rounds += 1
+        relaxed, _, _ = set_model(p, c, d, l, arcs, C, relax=True)
+        relaxed.solve(solver)
+        if LpStatus[relaxed.status] != 'Optimal':
+            if arcs.all():
+                return _result(LpStatus[relaxed.status], None, None, None, arcs, None, None, rounds)
+            expand()
+            continue
+        rc = reduced_costs(relaxed, l)
+        attractive = ~arcs & (rc < -tol)
+        if not attractive.any():
+            bound = value(relaxed.objective)
+            break
+        arcs |= attractive
+
+    # ------------------------------------------------------------------------ #
+    # Modèle entier restreint, puis arcs écartés de coût réduit < écart
+    # ------------------------------------------------------------------------ #
+    while True:
+        rounds += 1
+        prob, E, c_ij = set_model(p, c, d, l, arcs, C)
+        prob.solve(solver)
+        status = LpStatus[prob.status]
+        if status != 'Optimal':
+            if arcs.all():
+                return _result(status, None, bound, None, arcs, None, None, rounds)
+            expand()
+            continue
+
+        objective = value(prob.objective)
+        if bound is None:
+            return _result(status, objective, None, None, arcs, E, c_ij, rounds)
+
+        # Meilleure solution possible avec un arc écarté : z_LP + min rc
+        pruned = rc[~arcs]
+        tolerance = max(0.0, objective - bound - pruned.min()) if pruned.size else 0.0
+        candidates = ~arcs & (rc < objective - bound - tol)
+        if not prove or not candidates.any() or rounds >= max_rounds:
+            return _result(status, objective, bound, tolerance, arcs, E, c_ij, rounds)
+        arcs |= candidates
+
+
+def _result(status, objective, bound, tolerance, arcs, E, c_ij, rounds):
+    n, m = arcs.shape
+    trucks = np.zeros((n, m), dtype=np.int64)
+    for (i, j), var in (c_ij or {}).items():
+        trucks[i, j] = round(var.varValue or 0)
+    return {
+        'status': status,
+        'objective': objective,
+        'bound': bound,
+        'gap': objective - bound if objective is not None and bound is not None else None,
+        'tolerance': tolerance,
+        'proven': tolerance is not None and tolerance <= 1e-6,
+        'arcs': int(arcs.sum()),
+        'rounds': rounds,
+        'E': np.array([round(var.varValue or 0) for var in E]) if E else None,
+        'trucks': trucks,
+    }
+
+
+# ============================================================================ #
+#                                  BENCHMARK                                   #
+# ============================================================================ #
+def benchmark(sizes, k=3, seed=0):
+    """Comparer le modèle creux (k arcs par zone) au modèle complet."""
+    for n, m in sizes:
+        p, c, d, l, C = generate_instance(n, m, seed=seed)
+
+        start = time.perf_counter()
+        prob, _, _ = question3.set_model(p.tolist(), c.tolist(), d.tolist(), l.tolist())
+        prob.solve(backends.get_solver(msg=False, logPath=Path('./sparse_arcs_complet.log')))
+        print(f'{n} x {m} : complet {value(prob.objective)} ({n * m} arcs, '
+              f'{time.perf_counter() - start:.2f} s)')
+
+        for prove in (False, True):
+            start = time.perf_counter()
+            result = solve(p, c, d, l, C, k=k, prove=prove)
+            print(f'{n} x {m} : creux{" prouvé" if prove else ""} {result["objective"]} '
+                  f'({result["arcs"]} arcs, {time.perf_counter() - start:.2f} s, '
+                  f'tolérance {result["tolerance"]:.2f})')
+
+
+# ============================================================================ #
+#                                   UTILITIES                                  #
+# ============================================================================ #
+def print_log_output(result):
+    print()
+    print('-' * 40)
+    print('Statistiques')
+    print('-' * 40)
+    print()
+    print(f'Arcs candidats: {result["arcs"]}')
+    print(f'Résolutions: {result["rounds"]}')
+    print()
+    print(f'Statut de la solution: {result["status"]}')
+    print(f'Valeur de la fonction objectif: {result["objective"]}')
+    print(f'Borne inférieure: {result["bound"]}')
+    print(f'Écart: {result["gap"]}')
+    print(f'Tolérance (arcs écartés): {result["tolerance"]}')
+    print(f'Optimalité prouvée: {result["proven"]}')
+
+    if result['E'] is None:
+        return
+    print()
+    print('-' * 40)
+    print("Valeurs des variables")
+    print('-' * 40)
+    print()
+    trucks = result['trucks']
+    for i in range(trucks.shape[0]):
+        print(f'Entrepôt {i+1} loué (E_{i+1}): {result["E"][i]}')
+        for j in np.flatnonzero(trucks[i]).tolist():
+            print(f'Camions de E{i+1} vers Z{j+1} (c_{i+1}_{j+1}): {trucks[i, j]}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Modèle de la question 3 sur un réseau creux.")
+    parser.add_argument('--k', type=int, default=2, help='entrepôts candidats par zone')
+    parser.add_argument('--threshold', type=float, help='coût de livraison maximal des arcs candidats')
+    parser.add_argument('--no-pricing', action='store_true', help='sans vérification par les coûts réduits')
+    parser.add_argument('--no-proof', action='store_true', help="tolérance seulement, sans preuve d'optimalité")
+    solve_config.add_arguments(parser)
+    args = parser.parse_args()
+
+    print_log_output(solve(*default_instance(), k=args.k, threshold=args.threshold,
+                           pricing=not args.no_pricing, prove=not args.no_proof))
+    print()
+    benchmark([(20, 15), (40, 30), (60, 40)], k=args.k)
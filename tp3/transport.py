@@ -0,0 +1,207 @@
+"""Problème de transport à entrepôts fixés, résolu en mémoire par plus courts
+chemins successifs (flot de coût minimum), sans fichier ni processus CBC.
+
+    min  somme_ij l_ij * x_ij
+    s.c. somme_j x_ij <= cap_i,  somme_i x_ij >= dem_j,  x_ij >= 0
+
+Les capacités et demandes étant entières, chaque augmentation est entière et
+les camions obtenus le sont aussi. Les potentiels duaux (u, w) vérifient
+u_j - w_i <= l_ij, u, w >= 0, et somme dem_j u_j - somme cap_i w_i = coût.
+"""
+
+import time
+from pathlib import Path
+
+import numpy as np
+from pulp import PULP_CBC_CMD, LpMinimize, LpProblem, LpStatus, LpVariable, lpSum, value
+
+from instances import generate_instance
+
+INF = np.inf
+
+
+# ============================================================================ #
+#                               SOLVE WITH DATA                                #
+# ============================================================================ #
+def solve_transport(cap, dem, l):
+    """Résoudre le problème de transport pour des tableaux cap (n,), dem (m,), l (n, m).
+
+    Retourne le statut, le coût, les camions x (n, m) et les duaux u (m,), w (n,).
+    """
+    cap = np.asarray(cap, dtype=np.int64)
+    dem = np.asarray(dem, dtype=np.int64)
+    l = np.asarray(l, dtype=float)
+    n, m = l.shape
+
+    x = np.zeros((n, m), dtype=np.int64)
+    if cap.sum() < dem.sum():
+        return 'Infeasible', None, x, None, None
+
+    supply_left = cap.copy()
+    demand_left = dem.copy()
+
+    # Potentiels (coût réduit c + pi(amont) - pi(aval) >= 0 sur le graphe résiduel)
+    pi_w = np.zeros(n)
+    pi_z = l.min(axis=0) if n else np.zeros(m)
+    pi_t = pi_z.min() if m else 0.0
+
+    # Départ glouton : chaque zone est servie par son entrepôt le moins cher
+    # (coût réduit nul), ce qui conserve l'optimalité des coûts réduits
+    if n:
+        for j, i in enumerate(l.argmin(axis=0).tolist()):
+            moved = min(supply_left[i], demand_left[j])
+            x[i, j] += moved
+            supply_left[i] -= moved
+            demand_left[j] -= moved
+
+    while demand_left.sum() > 0:
+        # -------------------------------------------------------------------- #
+        # Dijkstra dense depuis la source, arrêté quand le puits est atteint.
+        # Les n premiers noeuds sont les entrepôts, les m suivants les zones ;
+        # `key` vaut l'infini pour les noeuds déjà fixés.
+        # -------------------------------------------------------------------- #
+        dist = np.full(n + m, INF)
+        dist[:n] = np.where(supply_left > 0, -pi_w, INF)
+        key = dist.copy()
+        dist_w, dist_z = dist[:n], dist[n:]
+        key_w, key_z = key[:n], key[n:]
+        pred_w = np.full(n, -1)  # -1 : arc depuis la source, sinon zone (arc inverse)
+        pred_z = np.full(m, -1)  # entrepôt
+        dist_t, pred_t = INF, -1
+
+        while True:
+            k = int(key.argmin())
+            d_k = key[k]
+            if d_k >= dist_t:
+                break
+            key[k] = INF
+            if k < n:
+                # Arcs entrepôt -> zone
+                cand = d_k + l[k] + (pi_w[k] - pi_z)
+                better = cand < dist_z
+                dist_z[better] = key_z[better] = cand[better]
+                pred_z[better] = k
+            else:
+                # Arc zone -> puits, et arcs inverses zone -> entrepôt (x_ij > 0)
+                j = k - n
+                if demand_left[j] > 0 and d_k + pi_z[j] - pi_t < dist_t:
+                    dist_t, pred_t = d_k + pi_z[j] - pi_t, j
+                cand = d_k - l[:, j] + (pi_z[j] - pi_w)
+                better = (cand < dist_w) & (x[:, j] > 0)
+                dist_w[better] = key_w[better] = cand[better]
+                pred_w[better] = j
+
+        pi_w += np.minimum(dist_w, dist_t)
+        pi_z += np.minimum(dist_z, dist_t)
+        pi_t += dist_t
+
+        # -------------------------------------------------------------------- #
+        # Chemin augmentant et quantité transportable
+        # -------------------------------------------------------------------- #
+        forward, backward = [], []
+        j = pred_t
+        delta = demand_left[j]
+        while True:
+            i = pred_z[j]
+            forward.append((i, j))
+            if pred_w[i] == -1:
+                source = i
+                delta = min(delta, supply_left[i])
+                break
+            j = pred_w[i]
+            backward.append((i, j))
+            delta = min(delta, x[i, j])
+
+        for i, j in forward:
+            x[i, j] += delta
+        for i, j in backward:
+            x[i, j] -= delta
+        supply_left[source] -= delta
+        demand_left[pred_t] -= delta
+
+    u, w = dual_potentials(x, supply_left, l)
+    return 'Optimal', float((l * x).sum()), x, u, w
+
+
+def dual_potentials(x, supply_left, l):
+    """Duaux optimaux : plus courtes distances depuis la source dans le graphe
+    résiduel de la solution optimale (Bellman-Ford dense).
+
+    Si aucun entrepôt n'a de capacité restante, la source n'atteint rien : les
+    distances sont alors prises depuis tous les entrepôts puis décalées pour
+    être positives, ce qui ne change pas le coût dual (capacité = demande).
+    """
+    base_w = np.where(supply_left > 0, 0.0, INF)
+    if not (supply_left > 0).any():
+        base_w[:] = 0.0
+    dist_w = base_w.copy()
+    used = x > 0
+    while True:
+        dist_z = (dist_w[:, None] + l).min(axis=0)
+        back = np.where(used, dist_z[None, :] - l, INF).min(axis=1)
+        new_w = np.minimum(base_w, back)
+        if np.array_equal(new_w, dist_w):
+            break
+        dist_w = new_w
+
+    shift = max(0.0, -dist_w[np.isfinite(dist_w)].min(initial=0.0))
+    dist_w += shift
+    dist_z += shift
+
+    # Entrepôts non atteints (fermés) : plus petit w réalisable
+    unreached = np.isinf(dist_w)
+    dist_w[unreached] = np.maximum(0, (dist_z[None, :] - l[unreached]).max(axis=1, initial=0))
+    return dist_z, dist_w
+
+
+# ============================================================================ #
+#                               CROSS-CHECK CBC                                #
+# ============================================================================ #
+def solve_with_cbc(cap, dem, l):
+    """Même problème de transport, résolu par CBC à travers PuLP."""
+    n, m = l.shape
+    prob = LpProblem(name='transport', sense=LpMinimize)
+    x = [[LpVariable(f'c_{i}_{j}', lowBound=0, cat='Integer') for j in range(m)] for i in range(n)]
+    prob += lpSum(float(l[i, j]) * x[i][j] for i in range(n) for j in range(m))
+    for i in range(n):
+        prob += lpSum(x[i]) <= int(cap[i])
+    for j in range(m):
+        prob += lpSum(x[i][j] for i in range(n)) >= int(dem[j])
+    prob.solve(PULP_CBC_CMD(msg=False, logPath=Path('./transport_cbc.log')))
+    return LpStatus[prob.status], value(prob.objective)
+
+
+def cross_check(trials=50, seed=0):
+    """Comparer les coûts et vérifier les duaux sur des instances aléatoires."""
+    rng = np.random.default_rng(seed)
+    for trial in range(trials):
+        n, m = rng.integers(1, 15), rng.integers(1, 15)
+        p, c, d, l, C = generate_instance(n, m, tightness=rng.uniform(0.8, 2.0), seed=trial)
+        cap, dem = c // C, d // C
+        if trial % 5 == 0:
+            dem[0] += max(0, cap.sum() - dem.sum())  # capacité totale = demande totale
+
+        status, cost, x, u, w = solve_transport(cap, dem, l)
+        status_cbc, cost_cbc = solve_with_cbc(cap, dem, l)
+        assert status == status_cbc, (trial, status, status_cbc)
+        if status != 'Optimal':
+            continue
+        assert abs(cost - cost_cbc) < 1e-6, (trial, cost, cost_cbc)
+        assert (x.sum(axis=1) <= cap).all() and (x.sum(axis=0) >= dem).all()
+        assert (u[None, :] - w[:, None] <= l + 1e-9).all() and (u >= 0).all() and (w >= 0).all()
+        assert abs(dem @ u - cap @ w - cost) < 1e-6, (trial, dem @ u - cap @ w, cost)
+    print(f'{trials} instances : mêmes résultats que CBC')
+
+
+if __name__ == '__main__':
+    cross_check()
+
+    # Temps moyen par résolution
+    for n, m in ((5, 3), (50, 30), (300, 200)):
+        _, c, d, l, C = generate_instance(n, m, seed=0)
+        repeat = max(1, 2000 // (n * m))
+        start = time.perf_counter()
+        for _ in range(repeat):
+            solve_transport(c // C, d // C, l)
+        elapsed = (time.perf_counter() - start) / repeat
+        print(f'{n} x {m} : {1000 * elapsed:.3f} ms par résolution')
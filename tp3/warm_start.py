@@ -0,0 +1,64 @@
+"""Comparaison d'une résolution à froid et d'une résolution avec MIP start
+après une petite modification des données de la question 3."""
+
+import contextlib
+import io
+from pathlib import Path
+
+from question3 import c, d, l, p, solve
+from instances import generate_instance
+
+# Les temps mesurés et le journal analysé sont ceux de CBC, sans le cache de
+# solutions
+SETTINGS = {'backend': 'cbc', 'cache_mode': 'off'}
+
+
+# ============================================================================ #
+#                               SOLVE WITH DATA                                #
+# ============================================================================ #
+def timed_solve(p, c, d, l, previous, log_path):
+    """Résoudre sans affichage ; temps de résolution et de la première
+    solution relevés par `solve` (prob.warm_start)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        prob, E, c_ij = solve(p, c, d, l, previous=previous, log_path=log_path, **SETTINGS)
+    return prob, E, c_ij, prob.warm_start['time'], prob.warm_start['first_solution']
+
+
+def compare_warm_start(p, c, d, l, previous):
+    """Résoudre la nouvelle instance à froid puis à partir de `previous`."""
+    cold = timed_solve(p, c, d, l, None, Path('./warm_start_cold.log'))
+    warm = timed_solve(p, c, d, l, previous, Path('./warm_start_warm.log'))
+    print_log_output(cold, warm)
+    return warm[:3]
+
+
+# ============================================================================ #
+#                                   UTILITIES                                  #
+# ============================================================================ #
+def print_log_output(cold, warm):
+    print()
+    print('-' * 40)
+    print('Démarrage à chaud')
+    print('-' * 40)
+    print()
+    for label, (prob, _, _, total, first) in (('à froid', cold), ('à chaud', warm)):
+        print(f'Résolution {label}: objectif {prob.objective.value()}, '
+              f'temps total {total:.3f} s, première solution {first} s')
+    print()
+    print(f'Temps total gagné: {cold[3] - warm[3]:.3f} s')
+    if cold[4] is not None and warm[4] is not None:
+        print(f'Temps gagné sur la première solution: {cold[4] - warm[4]:.3f} s')
+
+
+if __name__ == '__main__':
+    # Instance de la question 3, puis le loyer du premier entrepôt augmente
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, E, c_ij = solve(log_path=Path('./warm_start_cold.log'), **SETTINGS)
+    compare_warm_start([1200] + p[1:], c, d, l, (E, c_ij))
+
+    # Instance générée, puis une ligne de coûts de livraison change
+    p_gen, c_gen, d_gen, l_gen = (x.tolist() for x in generate_instance(40, 30, seed=3)[:4])
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, E, c_ij = solve(p_gen, c_gen, d_gen, l_gen, log_path=Path('./warm_start_cold.log'), **SETTINGS)
+    l_gen[0] = [cost + 5 for cost in l_gen[0]]
+    compare_warm_start(p_gen, c_gen, d_gen, l_gen, (E, c_ij))